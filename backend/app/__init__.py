@@ -3,19 +3,68 @@ from dotenv import load_dotenv
 load_dotenv()
 import os
 import logging
-from flask import Flask, request, jsonify
+import threading
+import time
+from contextlib import contextmanager
+from flask import Flask, Response, request, jsonify, make_response, url_for
 from flask_cors import CORS
-from .services.gpt_client import parse_outline_with_gpt, analyze_outline_for_questions, pre_process_outline, ANALYSIS_PROMPT, client
+from .json_provider import StudyPlannerJSONProvider
+from .services.gpt_client import parse_outline_with_gpt, analyze_outline_for_questions, analyze_and_parse_outline
+from .services.usage_tracker import BudgetExceeded, usage_summary
+from .services.auth import SignInRequired, bearer_user_id, check_auth_config, require_user_id
+from .services.calendar_feed import calendar_version, calendar_etag, fetch_calendar_window, parse_iso_datetime
+from .services.grade_engine import GradeItem, grade_report, get_course_totals, apply_event_change, course_events_version
+from .services.event_writes import BulkWriteError, apply_bulk_event_writes
+from .services.ics_feed import check_feed_config, feed_cache, feed_token, valid_feed_token, generate_ics, stream_feed_rows, tee_into_cache
+from .services.todos import TodoError, list_todos, add_todo, bulk_update_todos, archive_completed_todos, archive_due
+from .services.profiles import fetch_profile, cached_profile, cache_profile, invalidate_profile
+from .services.dashboard import dashboard_cache, fetch_dashboard, invalidate_dashboard, user_timezone
+from .services.uploads import UploadError, UploadRequest, max_upload_bytes, read_text_upload
+from .services.extraction_pool import ExtractionError
+from .services.parse_artifacts import ParseArtifactError, load_artifact, reparse_outline, save_artifact
+from .services.outline_parser import pattern_cache_stats, technique_stats
+from .services.pdf_tables import table_profile
+from werkzeug.exceptions import RequestEntityTooLarge
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 import uuid
+from dataclasses import asdict
+
+# Largest window /api/calendar serves in one request (a year view plus grid padding)
+MAX_CALENDAR_WINDOW_DAYS = 400
+# Dashboard queries slower than this are logged (DASHBOARD_DB_BUDGET_MS)
+DEFAULT_DASHBOARD_DB_BUDGET_MS = 5.0
 
 def get_db_conn():
     # Use DATABASE_URL from environment (set by Supabase)
     return psycopg2.connect(os.environ["DATABASE_URL"], cursor_factory=psycopg2.extras.RealDictCursor)
 
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+@contextmanager
+def pooled_db_conn():
+    """Connection from a per-process pool (DB_POOL_SIZE, default 5); commits on success, always returned."""
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                _db_pool = psycopg2.pool.ThreadedConnectionPool(
+                    1, int(os.getenv("DB_POOL_SIZE", "5")), os.environ["DATABASE_URL"],
+                    cursor_factory=psycopg2.extras.RealDictCursor
+                )
+    conn = _db_pool.getconn()
+    try:
+        with conn:
+            yield conn
+    finally:
+        _db_pool.putconn(conn, close=bool(conn.closed))
+
 def is_admin(user_id):
     """Check if the user is an admin by looking up profiles table."""
+    if not user_id:
+        return False
     with get_db_conn() as conn:
         with conn.cursor() as cur:
             cur.execute("SELECT is_admin FROM profiles WHERE user_id = %s", (user_id,))
@@ -25,37 +74,67 @@ def is_admin(user_id):
 def create_app():
     """Create and configure the Flask app."""
     app = Flask(__name__)
+    app.json = StudyPlannerJSONProvider(app)
+    # Bounded uploads: oversized bodies are refused before they are read, file parts spool to disk
+    app.request_class = UploadRequest
+    app.config["MAX_CONTENT_LENGTH"] = max_upload_bytes()
     CORS(app, resources={r"/api/*": {"origins": "*"}})
     openai_key = os.getenv("OPENAI_API_KEY")
     if not openai_key:
         app.logger.warning("Missing OPENAI_API_KEY: using mock data for parse-outline endpoint.")
+    # Endpoints that query the DB directly (no Supabase RLS) must know who is asking
+    check_auth_config()
+    check_feed_config()
+
+    # Helper: the signed-in user's id, from the verified Supabase access token (None if missing/invalid)
+    def current_user_id():
+        return bearer_user_id(request.headers.get("Authorization"))
+
+    # Helper: like current_user_id, but answers 401 (via the SignInRequired handler) when nobody is signed in
+    def signed_in_user_id():
+        return require_user_id(request.headers.get("Authorization"))
+
+    @app.errorhandler(SignInRequired)
+    def sign_in_required(e):
+        return jsonify({"error": str(e)}), 401
+
+    @app.errorhandler(BudgetExceeded)
+    def budget_exceeded(e):
+        resp = jsonify({"error": str(e)})
+        resp.status_code = 429
+        resp.headers["Retry-After"] = str(e.retry_after)
+        return resp
+
+    @app.errorhandler(UploadError)
+    def upload_error(e):
+        return jsonify({"error": str(e)}), e.status
+
+    @app.errorhandler(ExtractionError)
+    def extraction_error(e):
+        body = {"error": str(e)}
+        if e.code:
+            body.update(e.details or {}, code=e.code)
+        resp = jsonify(body)
+        resp.status_code = e.status
+        if e.retry_after:
+            resp.headers["Retry-After"] = str(e.retry_after)
+        return resp
+
+    @app.errorhandler(RequestEntityTooLarge)
+    def upload_too_large(e):
+        limit_mb = app.config["MAX_CONTENT_LENGTH"] / (1024 * 1024)
+        return jsonify({"error": f"Upload too large (limit {limit_mb:g} MB)"}), 413
 
     @app.route("/api/debug-analyze", methods=["POST"])
     def debug_analyze():
-        """Debug endpoint to see what GPT is returning."""
+        """Debug endpoint to see what GPT is returning (same single call as /api/analyze-outline)."""
         outline = request.json.get("outlineText", "")
-        result = analyze_outline_for_questions(outline)
-        
-        # Also get the raw GPT response for debugging
-        if outline.strip():
-            outline_text = pre_process_outline(outline)
-            messages = [
-                {"role": "system", "content": ANALYSIS_PROMPT},
-                {"role": "user", "content": outline_text}
-            ]
-            resp = client.chat.completions.create(
-                model="gpt-4o",
-                messages=messages,
-                temperature=0.1
-            )
-            raw_response = resp.choices[0].message.content or ""
-        else:
-            raw_response = "No outline provided"
-        
+        result = analyze_outline_for_questions(outline, current_user_id())
         return jsonify({
-            "result": result,
-            "raw_gpt_response": raw_response,
-            "outline_preprocessed": outline_text if outline.strip() else ""
+            "result": result.data,
+            "raw_gpt_response": result.raw_response if outline.strip() else "No outline provided",
+            "outline_preprocessed": result.preprocessed_text,
+            "timings": result.timings
         })
 
     # --- New conversational parsing endpoints ---
@@ -63,23 +142,31 @@ def create_app():
     def analyze_outline():
         """Analyze outline and return questions if needed."""
         outline = request.json.get("outlineText", "")
-        result = analyze_outline_for_questions(outline)
-        return jsonify(result)
+        result = analyze_outline_for_questions(outline, current_user_id())
+        return jsonify(result.data)
+
+    @app.route("/api/analyze-and-parse", methods=["POST"])
+    def analyze_and_parse():
+        """One GPT call: returns clarifying questions, or the parsed items when none are needed."""
+        outline = request.json.get("outlineText", "")
+        answers = request.json.get("answers", [])
+        result = analyze_and_parse_outline(outline, answers, current_user_id())
+        return jsonify(result.data)
 
     @app.route("/api/parse-outline-with-answers", methods=["POST"])
     def parse_outline_with_answers():
         """Parse outline with clarifying answers."""
         outline = request.json.get("outlineText", "")
         answers = request.json.get("answers", [])
-        items = parse_outline_with_gpt(outline, answers)
-        return jsonify(items)
+        result = parse_outline_with_gpt(outline, answers, current_user_id())
+        return jsonify(result.data)
 
     # --- Existing endpoints ---
     @app.route("/api/parse-outline", methods=["POST"])
     def parse_outline():
         outline = request.json.get("outlineText", "")
-        items = parse_outline_with_gpt(outline)
-        return jsonify(items)
+        result = parse_outline_with_gpt(outline, user_id=current_user_id())
+        return jsonify(result.data)
 
     @app.route("/api/test", methods=["GET"])
     def test():
@@ -96,22 +183,288 @@ def create_app():
         file = request.files['file']
         if file.filename == '':
             return jsonify({'error': 'No selected file'}), 400
+        content = read_text_upload(file)
+        result = parse_outline_with_gpt(content, user_id=current_user_id())
+        return jsonify(result.data)
+
+    # Calendar: events overlapping [start, end) with display fields, ETag/304 when unchanged
+    @app.route("/api/calendar", methods=["GET"])
+    def calendar_window():
+        user_id = signed_in_user_id()
         try:
-            content = file.read().decode('utf-8')
-        except Exception as e:
-            return jsonify({'error': f'Failed to read file: {str(e)}'}), 400
-        items = parse_outline_with_gpt(content)
-        return jsonify(items)
+            start = parse_iso_datetime(request.args["start"])
+            end = parse_iso_datetime(request.args["end"])
+        except (KeyError, ValueError):
+            return jsonify({"error": "start and end must be ISO 8601 dates"}), 400
+        if end <= start or (end - start).days > MAX_CALENDAR_WINDOW_DAYS:
+            return jsonify({"error": f"Window must be positive and at most {MAX_CALENDAR_WINDOW_DAYS} days"}), 400
+        course_id = request.args.get("course_id", type=int)
+        with get_db_conn() as conn:
+            with conn.cursor() as cur:
+                etag = calendar_etag(calendar_version(cur, user_id), user_id, start, end, course_id)
+                if request.if_none_match.contains(etag):
+                    resp = make_response("", 304)
+                else:
+                    events = fetch_calendar_window(cur, user_id, start, end, course_id)
+                    resp = jsonify({"start": start.isoformat(), "end": end.isoformat(), "events": events})
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = "private, no-cache"
+        return resp
 
-    # --- Admin-only endpoints ---
-    # Helper: get user_id from header (in production, use JWT auth)
-    def get_user_id():
-        return request.headers.get("X-User-Id")
+    # Calendar: subscription/download links for the signed-in user's .ics feed
+    @app.route("/api/calendar/feed-url", methods=["GET"])
+    def calendar_feed_url():
+        user_id = signed_in_user_id()
+        args = {"user_id": user_id, "token": feed_token(user_id)}
+        course_id = request.args.get("course_id", type=int)
+        if course_id is not None:
+            args["course_id"] = course_id
+        url = url_for("calendar_ics_feed", _external=True, **args)
+        return jsonify({
+            "url": url,
+            "webcal_url": "webcal://" + url.split("://", 1)[1],
+            "download_url": url_for("calendar_ics_feed", _external=True, download=1, **args),
+        })
+
+    # Calendar: iCalendar feed, streamed and cached per user (the token in the URL stands in for the access token)
+    @app.route("/api/calendar/feed/<user_id>/<token>.ics", methods=["GET"])
+    def calendar_ics_feed(user_id, token):
+        if not valid_feed_token(user_id, token):
+            return jsonify({"error": "Calendar feed not found"}), 404
+        course_id = request.args.get("course_id", type=int)
+        download = request.args.get("download") == "1"
+        # Polls within CALENDAR_FEED_VERSION_TTL reuse the last version and never query;
+        # explicit downloads always check so they include edits made seconds ago
+        version = None if download else feed_cache.get_version(user_id)
+        conn = None
+        if version is None:
+            conn = get_db_conn()
+            with conn.cursor() as cur:
+                version = calendar_version(cur, user_id)
+            feed_cache.put_version(user_id, version)
+        etag = calendar_etag(version, "ics", user_id, course_id)
+        body = None
+        if not request.if_none_match.contains(etag):
+            body = feed_cache.get_feed(user_id, course_id, version)
+            if body is None:
+                if conn is None:
+                    conn = get_db_conn()
+                chunks = generate_ics(stream_feed_rows(conn, user_id, course_id))
+                body = tee_into_cache(chunks, user_id, course_id, version, on_close=conn.close)
+                conn = None  # closed by the stream once the last chunk is sent
+        if conn is not None:
+            conn.close()
+        if body is None:
+            resp = make_response("", 304)
+        else:
+            resp = Response(body, mimetype="text/calendar")
+            if download:
+                resp.headers["Content-Disposition"] = "attachment; filename=study-planner-calendar.ics"
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = "private, no-cache"
+        return resp
+
+    # Grades: current/projected grade and required-score forecasts (?target=85)
+    @app.route("/api/courses/<int:course_id>/grades", methods=["GET"])
+    def course_grades(course_id):
+        user_id = signed_in_user_id()
+        target = request.args.get("target", type=float)
+        with get_db_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT optional_groups FROM courses WHERE id = %s AND user_id = %s", (course_id, user_id))
+                course = cur.fetchone()
+                if not course:
+                    return jsonify({"error": "Course not found"}), 404
+                totals = get_course_totals(cur, course_id, user_id)
+        return jsonify(grade_report(totals, course["optional_groups"], target))
+
+    # Grades: change one event's score/included flag and update the stored course totals incrementally
+    @app.route("/api/events/<int:event_id>/grade", methods=["PATCH"])
+    def update_event_grade(event_id):
+        user_id = signed_in_user_id()
+        data = request.json or {}
+        fields = {k: data[k] for k in ("score_received", "score_total", "included") if k in data}
+        if not fields:
+            return jsonify({"error": "Nothing to update (score_received, score_total, included)"}), 400
+        try:
+            for k in ("score_received", "score_total"):
+                if fields.get(k) is not None:
+                    fields[k] = float(fields[k])
+        except (TypeError, ValueError):
+            return jsonify({"error": "Scores must be numbers"}), 400
+        if "included" in fields and not isinstance(fields["included"], bool):
+            return jsonify({"error": "included must be true or false"}), 400
+        columns = "id, course_id, name, date, percent, score_received, score_total, included"
+        with get_db_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT {columns} FROM events WHERE id = %s AND user_id = %s FOR UPDATE", (event_id, user_id))
+                old_row = cur.fetchone()
+                if not old_row:
+                    return jsonify({"error": "Event not found"}), 404
+                course_id = old_row["course_id"]
+                version_before = course_events_version(cur, course_id) if course_id else None
+                assignments = ", ".join(f"{k} = %s" for k in fields)
+                cur.execute(f"UPDATE events SET {assignments} WHERE id = %s RETURNING {columns}",
+                            list(fields.values()) + [event_id])
+                new_row = cur.fetchone()
+                grades = None
+                if course_id:
+                    totals = apply_event_change(cur, course_id, user_id, GradeItem.from_row(old_row),
+                                                GradeItem.from_row(new_row), version_before)
+                    cur.execute("SELECT optional_groups FROM courses WHERE id = %s", (course_id,))
+                    grades = grade_report(totals, cur.fetchone()["optional_groups"])
+        invalidate_dashboard(user_id)
+        return jsonify({"event": asdict(GradeItem.from_row(new_row)), "grades": grades})
+
+    # Events: batched inserts/updates (optionally creating the course) in one transaction
+    @app.route("/api/events/bulk", methods=["POST"])
+    def bulk_write_events():
+        user_id = signed_in_user_id()
+        conn = get_db_conn()
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    result = apply_bulk_event_writes(cur, user_id, request.json or {})
+        except BulkWriteError as e:
+            return jsonify({"error": str(e), "details": e.details}), e.status
+        finally:
+            conn.close()
+        invalidate_dashboard(user_id)
+        return jsonify(result)
 
+    @app.errorhandler(ParseArtifactError)
+    def parse_artifact_error(e):
+        return jsonify({"error": str(e)}), 400
+
+    # Outline: the stored outline text and the items it was last parsed into
+    @app.route("/api/courses/<int:course_id>/outline", methods=["GET"])
+    def course_outline(course_id):
+        user_id = signed_in_user_id()
+        with get_db_conn() as conn:
+            with conn.cursor() as cur:
+                row = load_artifact(cur, course_id, user_id)
+        if not row:
+            return jsonify({"error": "No outline stored for this course"}), 404
+        return jsonify({
+            "outline_text": row["outline_text"],
+            "answers": row["artifact"].get("answers", []),
+            "items": row["artifact"].get("items", []),
+            "updated_at": row["updated_at"],
+        })
+
+    # Outline: re-parse an edited outline, re-processing only changed sections; returns items + diff
+    @app.route("/api/courses/<int:course_id>/outline/reparse", methods=["POST"])
+    def reparse_course_outline(course_id):
+        user_id = signed_in_user_id()
+        body = request.json or {}
+        text = body.get("outlineText", "")
+        answers = body.get("answers") or []
+        if not isinstance(text, str) or not text.strip():
+            raise ParseArtifactError("outlineText is required")
+        if not isinstance(answers, list) or not all(isinstance(a, str) for a in answers):
+            raise ParseArtifactError("answers must be a list of strings")
+        # Short transactions on either side of the GPT call; nothing is held open while it runs
+        with get_db_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1 FROM courses WHERE id = %s AND user_id = %s", (course_id, user_id))
+                if not cur.fetchone():
+                    return jsonify({"error": "Course not found"}), 404
+                previous = load_artifact(cur, course_id, user_id)
+        result, artifact = reparse_outline(previous, text, answers, user_id, force_full=bool(body.get("full")))
+        with get_db_conn() as conn:
+            with conn.cursor() as cur:
+                save_artifact(cur, course_id, user_id, text, artifact)
+        return jsonify(result)
+
+    # Courses: delete one of the signed-in user's courses (events cascade)
+    @app.route("/api/courses/<int:course_id>", methods=["DELETE"])
+    def delete_course(course_id):
+        user_id = signed_in_user_id()
+        with get_db_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM courses WHERE id = %s AND user_id = %s RETURNING id", (course_id, user_id))
+                deleted = cur.fetchone()
+        if not deleted:
+            return jsonify({"error": "Course not found"}), 404
+        invalidate_dashboard(user_id)
+        return jsonify({"status": "deleted"})
+
+    @app.errorhandler(TodoError)
+    def todo_error(e):
+        return jsonify({"error": str(e)}), 400
+
+    # To-dos: one keyset page (?status=open|completed|all|archived&cursor=...&limit=50)
+    @app.route("/api/todos", methods=["GET"])
+    def todos_page():
+        user_id = signed_in_user_id()
+        with get_db_conn() as conn:
+            with conn.cursor() as cur:
+                # Keep the hot table small: move this user's old completed items to the archive
+                if archive_due(user_id):
+                    archived = archive_completed_todos(cur, user_id)
+                    if archived:
+                        print(f"DEBUG: archived {archived} completed to-dos for user {user_id}")
+                page = list_todos(cur, user_id, request.args.get("status", "open"),
+                                  request.args.get("cursor"), request.args.get("limit", 50, type=int))
+        return jsonify(page)
+
+    # To-dos: add one
+    @app.route("/api/todos", methods=["POST"])
+    def todos_add():
+        user_id = signed_in_user_id()
+        data = request.json or {}
+        with get_db_conn() as conn:
+            with conn.cursor() as cur:
+                todo = add_todo(cur, user_id, data.get("title", ""), data.get("due_date"))
+        invalidate_dashboard(user_id)
+        return jsonify(todo), 201
+
+    # To-dos: complete/reopen/delete many in one transaction
+    @app.route("/api/todos/bulk", methods=["POST"])
+    def todos_bulk():
+        user_id = signed_in_user_id()
+        with get_db_conn() as conn:
+            with conn.cursor() as cur:
+                counts = bulk_update_todos(cur, user_id, request.json or {})
+        invalidate_dashboard(user_id)
+        return jsonify(counts)
+
+    # Dashboard: courses with grade summaries, next open to-dos and the coming week's events
+    # in one query, cached per user (?todos=3&days=7; fresh=1 skips the cache)
+    @app.route("/api/dashboard", methods=["GET"])
+    def dashboard():
+        user_id = signed_in_user_id()
+        todo_limit = max(1, min(request.args.get("todos", 3, type=int), 50))
+        days = max(1, min(request.args.get("days", 7, type=int), 31))
+        tz_name = request.args.get("tz")
+        try:
+            tz = user_timezone(tz_name)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        key = (user_id, todo_limit, days, tz_name)
+        payload = None if request.args.get("fresh") == "1" else dashboard_cache.get(key)
+        timing = "cache;desc=hit"
+        if payload is None:
+            start = time.perf_counter()
+            with pooled_db_conn() as conn:
+                with conn.cursor() as cur:
+                    payload = fetch_dashboard(cur, user_id, todo_limit, days, tz)
+            db_ms = (time.perf_counter() - start) * 1000
+            budget_ms = float(os.getenv("DASHBOARD_DB_BUDGET_MS", DEFAULT_DASHBOARD_DB_BUDGET_MS))
+            if db_ms > budget_ms:
+                app.logger.warning("Dashboard DB time %.1fms over %.1fms budget for user %s", db_ms, budget_ms, user_id)
+            dashboard_cache.put(key, payload)
+            timing = f"db;dur={db_ms:.2f}"
+        resp = jsonify(payload)
+        resp.headers["Server-Timing"] = timing
+        resp.headers["Cache-Control"] = "private, no-store"
+        return resp
+
+    # --- Admin-only endpoints ---
     # User Management: List all users
     @app.route("/api/admin/users", methods=["GET"])
     def admin_list_users():
-        user_id = get_user_id()
+        user_id = current_user_id()
         if not is_admin(user_id):
             return jsonify({"error": "Admin access required"}), 403
         with get_db_conn() as conn:
@@ -128,7 +481,7 @@ def create_app():
     # User Management: Edit user (admin can set is_admin)
     @app.route("/api/admin/users/<uuid:user_id>", methods=["PATCH"])
     def admin_edit_user(user_id):
-        admin_id = get_user_id()
+        admin_id = current_user_id()
         if not is_admin(admin_id):
             return jsonify({"error": "Admin access required"}), 403
         data = request.json
@@ -136,24 +489,26 @@ def create_app():
             with conn.cursor() as cur:
                 cur.execute("UPDATE profiles SET is_admin = %s WHERE user_id = %s RETURNING *", (data.get("is_admin", False), str(user_id)))
                 updated = cur.fetchone()
+        invalidate_profile(user_id)
         return jsonify(updated)
 
     # User Management: Delete user (removes from auth and profiles)
     @app.route("/api/admin/users/<uuid:user_id>", methods=["DELETE"])
     def admin_delete_user(user_id):
-        admin_id = get_user_id()
+        admin_id = current_user_id()
         if not is_admin(admin_id):
             return jsonify({"error": "Admin access required"}), 403
         with get_db_conn() as conn:
             with conn.cursor() as cur:
                 cur.execute("DELETE FROM profiles WHERE user_id = %s", (str(user_id),))
                 cur.execute("DELETE FROM auth.users WHERE id = %s", (str(user_id),))
+        invalidate_profile(user_id)
         return jsonify({"status": "deleted"})
 
     # Course Management: List all courses
     @app.route("/api/admin/courses", methods=["GET"])
     def admin_list_courses():
-        user_id = get_user_id()
+        user_id = current_user_id()
         if not is_admin(user_id):
             return jsonify({"error": "Admin access required"}), 403
         with get_db_conn() as conn:
@@ -165,7 +520,7 @@ def create_app():
     # Course Management: Edit course
     @app.route("/api/admin/courses/<int:course_id>", methods=["PATCH"])
     def admin_edit_course(course_id):
-        admin_id = get_user_id()
+        admin_id = current_user_id()
         if not is_admin(admin_id):
             return jsonify({"error": "Admin access required"}), 403
         data = request.json
@@ -173,23 +528,28 @@ def create_app():
             with conn.cursor() as cur:
                 cur.execute("UPDATE courses SET title = %s WHERE id = %s RETURNING *", (data.get("title"), course_id))
                 updated = cur.fetchone()
+        if updated:
+            invalidate_dashboard(str(updated["user_id"]))
         return jsonify(updated)
 
     # Course Management: Delete course
     @app.route("/api/admin/courses/<int:course_id>", methods=["DELETE"])
     def admin_delete_course(course_id):
-        admin_id = get_user_id()
+        admin_id = current_user_id()
         if not is_admin(admin_id):
             return jsonify({"error": "Admin access required"}), 403
         with get_db_conn() as conn:
             with conn.cursor() as cur:
-                cur.execute("DELETE FROM courses WHERE id = %s", (course_id,))
+                cur.execute("DELETE FROM courses WHERE id = %s RETURNING user_id", (course_id,))
+                deleted = cur.fetchone()
+        if deleted:
+            invalidate_dashboard(str(deleted["user_id"]))
         return jsonify({"status": "deleted"})
 
     # Analytics: Get counts of users, courses, todos
     @app.route("/api/admin/analytics", methods=["GET"])
     def admin_analytics():
-        user_id = get_user_id()
+        user_id = current_user_id()
         if not is_admin(user_id):
             return jsonify({"error": "Admin access required"}), 403
         with get_db_conn() as conn:
@@ -202,10 +562,40 @@ def create_app():
                 todo_count = cur.fetchone()["count"]
         return jsonify({"users": user_count, "courses": course_count, "todos": todo_count})
 
+    # Usage: GPT token and latency accounting (?days=7&user_id=...)
+    @app.route("/api/admin/usage", methods=["GET"])
+    def admin_usage():
+        user_id = current_user_id()
+        if not is_admin(user_id):
+            return jsonify({"error": "Admin access required"}), 403
+        days = request.args.get("days", 7, type=int)
+        return jsonify(usage_summary(days=days, user_id=request.args.get("user_id")))
+
+    # Parser: pattern-registry counters and technique cost/success stats for this worker process
+    # (extraction workers keep their own)
+    @app.route("/api/admin/parser-stats", methods=["GET"])
+    def admin_parser_stats():
+        user_id = current_user_id()
+        if not is_admin(user_id):
+            return jsonify({"error": "Admin access required"}), 403
+        return jsonify({"pid": os.getpid(), "pattern_cache": pattern_cache_stats(), "techniques": technique_stats(),
+                        "table_profile": table_profile()})
+
+    # To-dos: archive old completed items for all users (?days=30; e.g. from a nightly cron)
+    @app.route("/api/admin/todos/archive", methods=["POST"])
+    def admin_archive_todos():
+        user_id = current_user_id()
+        if not is_admin(user_id):
+            return jsonify({"error": "Admin access required"}), 403
+        with get_db_conn() as conn:
+            with conn.cursor() as cur:
+                archived = archive_completed_todos(cur, older_than_days=request.args.get("days", type=int))
+        return jsonify({"archived": archived})
+
     # Moderation: Placeholder endpoint
     @app.route("/api/admin/moderation", methods=["GET"])
     def admin_moderation():
-        user_id = get_user_id()
+        user_id = current_user_id()
         if not is_admin(user_id):
             return jsonify({"error": "Admin access required"}), 403
         # Placeholder: return empty moderation queue
@@ -214,7 +604,7 @@ def create_app():
     # Settings: Placeholder endpoint
     @app.route("/api/admin/settings", methods=["GET", "POST"])
     def admin_settings():
-        user_id = get_user_id()
+        user_id = current_user_id()
         if not is_admin(user_id):
             return jsonify({"error": "Admin access required"}), 403
         # Placeholder: return static settings
@@ -224,31 +614,33 @@ def create_app():
             # Accept and echo settings (not persisted)
             return jsonify(request.json)
 
+    # Profile: the signed-in user's own, cached per user with an ETag, so the per-page is_admin checks usually cost a 304
     @app.route("/api/profiles/<user_id>", methods=["GET"])
     def get_profile(user_id):
         # Remove angle brackets if present
         user_id = user_id.strip('<>')
-        try:
-            with get_db_conn() as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT * FROM profiles WHERE user_id = %s", (user_id,))
-                    profile = cur.fetchone()
-        except Exception as e:
-            app.logger.exception("Profile fetch failed")
-            return jsonify({"error": str(e)}), 500
-        if not profile:
+        signed_in = signed_in_user_id()
+        if user_id != signed_in:
             return jsonify({"error": "Profile not found"}), 404
-        # Convert to plain dict with JSON-serializable types (UUID, datetime, etc.)
-        out = {}
-        for k, v in dict(profile).items():
-            if v is None:
-                out[k] = None
-            elif hasattr(v, 'hex'):  # UUID
-                out[k] = str(v)
-            elif hasattr(v, 'isoformat'):  # date/datetime
-                out[k] = v.isoformat()
-            else:
-                out[k] = v
-        return jsonify(out)
+        entry = cached_profile(user_id)
+        if entry is None:
+            try:
+                with pooled_db_conn() as conn:
+                    with conn.cursor() as cur:
+                        profile = fetch_profile(cur, user_id)
+            except Exception as e:
+                app.logger.exception("Profile fetch failed")
+                return jsonify({"error": str(e)}), 500
+            if not profile:
+                return jsonify({"error": "Profile not found"}), 404
+            entry = cache_profile(user_id, profile)
+        etag, profile = entry
+        if request.if_none_match.contains(etag):
+            resp = make_response("", 304)
+        else:
+            resp = jsonify(profile)
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = "private, no-cache"
+        return resp
 
     return app
@@ -0,0 +1,33 @@
+# json_provider.py - App-wide JSON serialization for database values (UUID, datetime, Decimal)
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider
+
+def _default(value):
+    """Called by json.dumps only for values it cannot encode itself, so plain rows cost nothing extra."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class StudyPlannerJSONProvider(DefaultJSONProvider):
+    """
+    ISO 8601 dates (instead of Flask's HTTP-date strings), UUIDs as strings and NUMERIC
+    columns as numbers, so endpoints can jsonify psycopg2 rows directly.
+    """
+    default = staticmethod(_default)
+    sort_keys = False  # skip sorting every object; key order follows the SELECT list
+
+    def dumps(self, obj, **kwargs):
+        kwargs.setdefault("default", self.default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
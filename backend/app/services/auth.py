@@ -0,0 +1,68 @@
+# auth.py - Verify the Supabase access token (JWT) the front-end sends as "Authorization: Bearer ..."
+import logging
+import os
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Supabase signs user sessions with this audience
+DEFAULT_AUDIENCE = "authenticated"
+# Clock skew tolerated on exp/iat, in seconds
+LEEWAY_SECONDS = 30
+
+class SignInRequired(Exception):
+    """No valid access token on a request that needs a signed-in user (answered with 401)."""
+    def __init__(self, message: str = "Sign-in required (Authorization: Bearer <access token>)"):
+        super().__init__(message)
+
+_jwks_client = None
+_jwks_lock = threading.Lock()
+
+def check_auth_config() -> None:
+    """Fail fast (at app startup) when there is no way to verify access tokens."""
+    if not (os.getenv("SUPABASE_JWT_SECRET") or os.getenv("SUPABASE_URL")):
+        raise RuntimeError("Set SUPABASE_JWT_SECRET (HS256 projects) or SUPABASE_URL (JWT signing keys) "
+                           "so the backend can verify access tokens")
+
+def _signing_key(token: str):
+    """HS256 shared secret when configured, otherwise the project's public key from its JWKS endpoint."""
+    secret = os.getenv("SUPABASE_JWT_SECRET")
+    if secret:
+        return secret, ["HS256"]
+    global _jwks_client
+    if _jwks_client is None:
+        with _jwks_lock:
+            if _jwks_client is None:
+                import jwt  # lazy: keeps PyJWT/cryptography out of cold start
+                url = os.environ["SUPABASE_URL"].rstrip("/") + "/auth/v1/.well-known/jwks.json"
+                _jwks_client = jwt.PyJWKClient(url, cache_keys=True)
+    return _jwks_client.get_signing_key_from_jwt(token).key, ["RS256", "ES256"]
+
+def verify_access_token(token: str) -> str:
+    """The user id (`sub` claim) of a valid, unexpired Supabase access token; raises jwt.PyJWTError otherwise."""
+    import jwt
+    key, algorithms = _signing_key(token)
+    claims = jwt.decode(token, key, algorithms=algorithms, leeway=LEEWAY_SECONDS,
+                        audience=os.getenv("SUPABASE_JWT_AUDIENCE", DEFAULT_AUDIENCE),
+                        options={"require": ["exp", "sub"]})
+    return claims["sub"]
+
+def bearer_user_id(authorization: Optional[str]) -> Optional[str]:
+    """User id from an "Authorization: Bearer <jwt>" header value, or None when it is missing or invalid."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    import jwt
+    try:
+        return verify_access_token(token.strip())
+    except jwt.PyJWTError as e:  # bad signature/claims, expired, or signing keys unavailable
+        logger.info("Rejected access token: %s", e)
+        return None
+
+def require_user_id(authorization: Optional[str]) -> str:
+    """bearer_user_id for endpoints that need a signed-in user; raises SignInRequired instead of returning None."""
+    user_id = bearer_user_id(authorization)
+    if not user_id:
+        raise SignInRequired()
+    return user_id
@@ -0,0 +1,73 @@
+# calendar_feed.py - Windowed calendar queries and version stamps for ETag caching
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+DEFAULT_EVENT_COLOR = "#6c757d"
+
+# Cheap per-user version: inserts/edits bump MAX(updated_at), deletes change COUNT(*).
+# Course title/color edits change the display fields, so courses are part of the version too.
+_VERSION_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM events WHERE user_id = %(user_id)s) AS event_count,
+        (SELECT MAX(updated_at) FROM events WHERE user_id = %(user_id)s) AS events_changed,
+        (SELECT COUNT(*) FROM courses WHERE user_id = %(user_id)s) AS course_count,
+        (SELECT MAX(updated_at) FROM courses WHERE user_id = %(user_id)s) AS courses_changed
+"""
+
+# Events overlapping [start, end): start before the window ends, end (or start) after it begins
+_WINDOW_SQL = """
+    SELECT e.id, e.name, e.description, e.start_time, e.end_time, e.color, e.course_id,
+           c.title AS course_title, c.color AS course_color
+    FROM events e
+    LEFT JOIN courses c ON c.id = e.course_id
+    WHERE e.user_id = %(user_id)s
+      AND e.start_time < %(end)s
+      AND COALESCE(e.end_time, e.start_time) >= %(start)s
+      {course_filter}
+    ORDER BY e.start_time, e.id
+"""
+
+def calendar_version(cur, user_id: str) -> str:
+    """Opaque version string for everything on a user's calendar."""
+    cur.execute(_VERSION_SQL, {"user_id": user_id})
+    row = cur.fetchone()
+    parts = [row["event_count"], row["events_changed"], row["course_count"], row["courses_changed"]]
+    return "|".join("" if p is None else str(p) for p in parts)
+
+def calendar_etag(version: str, *scope) -> str:
+    """Strong ETag value (unquoted) for one view (version + window/course) of the calendar."""
+    key = "|".join([version] + [str(s) for s in scope])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+def parse_iso_datetime(value: str) -> datetime:
+    """ISO 8601 date or datetime from a query string; 'Z' or no offset means UTC."""
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def _display_event(row: Dict) -> Dict:
+    """Title prefix and color resolution done once here instead of in every browser."""
+    title = f"{row['course_title']}: {row['name']}" if row["course_title"] else row["name"]
+    return {
+        "id": row["id"],
+        "title": title,
+        "name": row["name"],
+        "description": row["description"],
+        "start": row["start_time"].isoformat() if row["start_time"] else None,
+        "end": (row["end_time"] or row["start_time"]).isoformat() if row["start_time"] else None,
+        "color": row["course_color"] or row["color"] or DEFAULT_EVENT_COLOR,
+        "course_id": row["course_id"],
+    }
+
+def fetch_calendar_window(cur, user_id: str, start: datetime, end: datetime,
+                          course_id: Optional[int] = None) -> List[Dict]:
+    """Events overlapping [start, end), sorted by start, with display fields precomputed."""
+    params = {"user_id": user_id, "start": start, "end": end}
+    course_filter = ""
+    if course_id is not None:
+        course_filter = "AND e.course_id = %(course_id)s"
+        params["course_id"] = course_id
+    cur.execute(_WINDOW_SQL.format(course_filter=course_filter), params)
+    return [_display_event(row) for row in cur.fetchall()]
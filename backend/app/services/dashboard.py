@@ -0,0 +1,94 @@
+# dashboard.py - Home page aggregate (courses + grades, next to-dos, upcoming events) in one query
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Dict, Optional, Tuple
+
+from .calendar_feed import DEFAULT_EVENT_COLOR
+from .grade_engine import COURSE_EVENTS_VERSION_SQL, GradeTotals, grade_report, recompute_summaries, totals_from_summary
+from .ttl_cache import TTLCache
+
+# One statement, one round trip: every widget is a CTE aggregated to JSON.
+# summary_fresh compares the stored grade summary with the course's current events version.
+_DASHBOARD_SQL = """
+    WITH user_courses AS (
+        SELECT c.id, c.title, c.color, c.inserted_at, c.optional_groups,
+               s.earned, s.graded_weight, s.included_weight, s.graded_count, s.item_count,
+               s.included_by_group,
+               s.events_version IS NOT NULL AND s.events_version = v.version AS summary_fresh
+        FROM courses c
+        LEFT JOIN course_grade_summaries s ON s.course_id = c.id
+        LEFT JOIN LATERAL ({version_sql}) v ON TRUE
+        WHERE c.user_id = %(user_id)s
+    ),
+    next_todos AS (
+        SELECT id, title, due_date, completed
+        FROM todos
+        WHERE user_id = %(user_id)s AND completed = FALSE
+        ORDER BY due_date NULLS LAST, id
+        LIMIT %(todo_limit)s
+    ),
+    upcoming AS (
+        SELECT e.id, e.name, e.description, e.start_time, e.end_time, e.course_id,
+               co.title AS course_title,
+               COALESCE(co.color, e.color, %(default_color)s) AS color
+        FROM events e
+        LEFT JOIN courses co ON co.id = e.course_id
+        WHERE e.user_id = %(user_id)s
+          AND e.start_time >= %(window_start)s
+          AND e.start_time < %(window_end)s
+    )
+    SELECT
+        (SELECT COALESCE(json_agg(user_courses ORDER BY inserted_at DESC), '[]'::json) FROM user_courses) AS courses,
+        (SELECT COALESCE(json_agg(next_todos ORDER BY due_date NULLS LAST, id), '[]'::json) FROM next_todos) AS todos,
+        (SELECT COALESCE(json_agg(upcoming ORDER BY start_time, id), '[]'::json) FROM upcoming) AS upcoming
+""".format(version_sql=COURSE_EVENTS_VERSION_SQL.format(course_id="c.id"))
+
+def user_timezone(name: Optional[str]) -> tzinfo:
+    """The client's IANA time zone (e.g. "America/Edmonton"), UTC when not given; ValueError if unknown."""
+    if not name:
+        return timezone.utc
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone: {name}")
+
+def upcoming_window(today: date, days: int, tz: tzinfo) -> Tuple[datetime, datetime]:
+    """[start of `today`, start of the day after today + days) in the user's time zone."""
+    start = datetime.combine(today, time.min, tzinfo=tz)
+    return start, datetime.combine(today + timedelta(days=days + 1), time.min, tzinfo=tz)
+
+def _course_card(row: Dict, totals: GradeTotals) -> Dict:
+    """Course fields for Home plus its grade summary."""
+    report = grade_report(totals, row["optional_groups"])
+    return {
+        "id": row["id"],
+        "title": row["title"],
+        "color": row["color"],
+        "inserted_at": row["inserted_at"],
+        "grade": {k: report[k] for k in ("current_grade", "earned", "graded_weight", "projected_grade")},
+    }
+
+def fetch_dashboard(cur, user_id: str, todo_limit: int = 3, days: int = 7,
+                    tz: tzinfo = timezone.utc) -> Dict:
+    """Upcoming events run from today through today + days, with day boundaries in `tz`."""
+    window_start, window_end = upcoming_window(datetime.now(tz).date(), days, tz)
+    cur.execute(_DASHBOARD_SQL, {
+        "user_id": user_id, "todo_limit": todo_limit, "window_start": window_start,
+        "window_end": window_end, "default_color": DEFAULT_EVENT_COLOR,
+    })
+    row = cur.fetchone()
+    # Stale summaries (writes made outside the backend) are recomputed together, not one course at a time
+    recomputed = recompute_summaries(cur, (c["id"] for c in row["courses"] if not c["summary_fresh"]), user_id)
+    return {
+        "courses": [_course_card(c, recomputed.get(c["id"]) or totals_from_summary(c)) for c in row["courses"]],
+        "todos": row["todos"],
+        "upcoming": row["upcoming"],
+    }
+
+# Backend write endpoints call invalidate_dashboard(); the TTL bounds staleness from writes
+# made straight to Supabase
+dashboard_cache = TTLCache("DASHBOARD_CACHE_TTL", 15)
+
+def invalidate_dashboard(user_id: Optional[str]) -> None:
+    if user_id:
+        dashboard_cache.invalidate(user_id)
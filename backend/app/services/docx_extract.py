@@ -0,0 +1,97 @@
+# docx_extract.py - Streams paragraphs and tables out of word/document.xml without building a python-docx model
+import zipfile
+from typing import Iterator, List
+from xml.etree.ElementTree import iterparse
+
+from .uploads import UploadError
+
+DOCUMENT_XML = "word/document.xml"
+# Refuse documents whose body inflates past this (zip bombs); real outlines are well under 5 MB
+MAX_DOCUMENT_XML_BYTES = 64 * 1024 * 1024
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+P, R, PPR = _W + "p", _W + "r", _W + "pPr"
+T, TAB, PTAB, BR, CR, HYPHEN = _W + "t", _W + "tab", _W + "ptab", _W + "br", _W + "cr", _W + "noBreakHyphen"
+TBL, TR, TC = _W + "tbl", _W + "tr", _W + "tc"
+BR_TYPE = _W + "type"
+
+def iter_docx_blocks(stream) -> Iterator[str]:
+    """
+    Body paragraphs and tables in document order. A table is one block: "[Table]" followed by a
+    line per row with cells joined by " | " (the format the PDF extractor uses). Nested tables are
+    flattened into their enclosing cell; elements are cleared as soon as they are consumed.
+    Run content maps to text the way python-docx's Run.text does: only inside w:r (tab stops under
+    w:pPr are not tabs) and page/column breaks add nothing.
+    """
+    try:
+        zf = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile:
+        raise UploadError("File content is not a valid DOCX", 415)
+    with zf:
+        try:
+            info = zf.getinfo(DOCUMENT_XML)
+        except KeyError:
+            raise UploadError("File content is not a valid DOCX", 415)
+        if info.file_size > MAX_DOCUMENT_XML_BYTES:
+            raise UploadError("Word document is too large to extract", 413)
+        with zf.open(info) as xml:
+            paragraphs: List[List[str]] = []  # stack: text boxes put paragraphs inside paragraphs
+            table_depth = 0
+            run_depth = 0  # text boxes nest runs inside runs
+            ppr_depth = 0
+            rows: List[str] = []
+            cells: List[str] = []
+            cell_text: List[str] = []
+            for event, el in iterparse(xml, events=("start", "end")):
+                tag = el.tag
+                if event == "start":
+                    if tag == P:
+                        paragraphs.append([])
+                    elif tag == R:
+                        run_depth += 1
+                    elif tag == PPR:
+                        ppr_depth += 1
+                    elif tag == TBL:
+                        table_depth += 1
+                    continue
+                if run_depth and not ppr_depth and tag in (T, TAB, PTAB, BR, CR, HYPHEN):
+                    if tag == T:
+                        if el.text:
+                            paragraphs[-1].append(el.text)
+                    elif tag == TAB or tag == PTAB:
+                        paragraphs[-1].append("\t")
+                    elif tag == HYPHEN:
+                        paragraphs[-1].append("-")
+                    elif tag == CR or el.get(BR_TYPE, "textWrapping") == "textWrapping":
+                        paragraphs[-1].append("\n")
+                elif tag == R:
+                    run_depth -= 1
+                elif tag == PPR:
+                    ppr_depth -= 1
+                elif tag == P:
+                    text = "".join(paragraphs.pop())
+                    if paragraphs:
+                        paragraphs[-1].append(text)
+                    elif table_depth:
+                        cell_text.append(text.strip())
+                    else:
+                        yield text
+                    el.clear()
+                elif table_depth == 1 and tag == TC:
+                    cells.append(" ".join(t for t in cell_text if t))
+                    cell_text = []
+                elif table_depth == 1 and tag == TR:
+                    if any(cells):
+                        rows.append(" | ".join(cells))
+                    cells = []
+                elif tag == TBL:
+                    table_depth -= 1
+                    if not table_depth:
+                        if rows:
+                            yield "[Table]\n" + "\n".join(rows)
+                        rows = []
+                        el.clear()
+
+def extract_docx_text(stream) -> str:
+    """Plain text of a .docx: paragraphs one per line, tables as "[Table]" blocks."""
+    return "\n".join(iter_docx_blocks(stream))
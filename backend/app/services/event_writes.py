@@ -0,0 +1,209 @@
+# event_writes.py - Batched event inserts/updates in one transaction with best-N group validation
+import json
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+from psycopg2.extras import execute_values
+
+from .grade_engine import component_base, fetch_course_items, pick_item_to_exclude, recompute_summary
+from .parse_artifacts import ParseArtifactError, build_artifact, check_outline_payload, save_artifact
+
+# Largest number of inserts + updates accepted in one request
+MAX_BULK_ITEMS = 500
+
+# Writable event columns and the SQL type each VALUES entry is cast to
+EVENT_COLUMN_TYPES = {
+    "course_id": "integer",
+    "name": "text",
+    "date": "date",
+    "percent": "numeric",
+    "score_received": "numeric",
+    "score_total": "numeric",
+    "included": "boolean",
+    "start_time": "timestamptz",
+    "end_time": "timestamptz",
+    "description": "text",
+    "color": "text",
+}
+INSERT_COLUMNS = tuple(EVENT_COLUMN_TYPES)
+UPDATE_COLUMNS = tuple(c for c in EVENT_COLUMN_TYPES if c != "course_id")
+
+class BulkWriteError(Exception):
+    """Invalid bulk payload or violated group constraint; nothing is written."""
+    def __init__(self, message: str, details: Optional[Dict] = None, status: int = 400):
+        super().__init__(message)
+        self.details = details or {}
+        self.status = status
+
+def _is_int(value) -> bool:
+    # bool is an int subclass, but true/false is never a valid id or count
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _check_payload(payload: Dict) -> None:
+    inserts = payload.get("insert", [])
+    updates = payload.get("update", [])
+    if not isinstance(inserts, list) or not isinstance(updates, list):
+        raise BulkWriteError("insert and update must be lists")
+    if len(inserts) + len(updates) > MAX_BULK_ITEMS:
+        raise BulkWriteError(f"At most {MAX_BULK_ITEMS} events per request")
+    for ev in inserts:
+        if not isinstance(ev, dict) or not ev.get("name"):
+            raise BulkWriteError("Every inserted event needs a name")
+        unknown = set(ev) - set(INSERT_COLUMNS)
+        if unknown:
+            raise BulkWriteError(f"Unknown event fields: {sorted(unknown)}")
+    seen: Set[int] = set()
+    for ev in updates:
+        if not isinstance(ev, dict) or not _is_int(ev.get("id")):
+            raise BulkWriteError("Every update needs an integer id")
+        unknown = set(ev) - set(UPDATE_COLUMNS) - {"id"}
+        if unknown:
+            raise BulkWriteError(f"Unknown or read-only event fields: {sorted(unknown)}")
+        if len(ev) == 1:
+            raise BulkWriteError("Update has no fields to change", {"event_id": ev["id"]})
+        if ev["id"] in seen:
+            raise BulkWriteError("Event updated more than once", {"event_id": ev["id"]})
+        seen.add(ev["id"])
+    course = payload.get("course")
+    if course is not None:
+        if not isinstance(course, dict) or not course.get("title"):
+            raise BulkWriteError("course needs a title")
+        groups = course.get("optional_groups") or {}
+        if not isinstance(groups, dict) or not all(_is_int(n) and n > 0 for n in groups.values()):
+            raise BulkWriteError("optional_groups must map component names to positive counts")
+        if course.get("outline") is not None:
+            try:
+                check_outline_payload(course["outline"])
+            except ParseArtifactError as e:
+                raise BulkWriteError(str(e))
+
+def _create_course(cur, user_id: str, course: Dict) -> int:
+    cur.execute(
+        "INSERT INTO courses (user_id, title, color, optional_groups) VALUES (%s, %s, COALESCE(%s, '#3B82F6'), %s) RETURNING id",
+        (user_id, course["title"], course.get("color"), json.dumps(course.get("optional_groups") or {}))
+    )
+    return cur.fetchone()["id"]
+
+def _owned_courses(cur, user_id: str, course_ids: Set[int]) -> Dict[int, Dict]:
+    if not course_ids:
+        return {}
+    cur.execute("SELECT id, optional_groups FROM courses WHERE user_id = %s AND id = ANY(%s)", (user_id, list(course_ids)))
+    return {row["id"]: row["optional_groups"] or {} for row in cur.fetchall()}
+
+def _insert_events(cur, user_id: str, inserts: List[Dict]) -> List[Dict]:
+    if not inserts:
+        return []
+    columns = ("user_id",) + INSERT_COLUMNS
+    template = "(%s::uuid, " + ", ".join(f"%s::{EVENT_COLUMN_TYPES[c]}" for c in INSERT_COLUMNS) + ")"
+    rows = [
+        (user_id,) + tuple(ev.get(c, True if c == "included" else None) for c in INSERT_COLUMNS)
+        for ev in inserts
+    ]
+    return execute_values(
+        cur,
+        f"INSERT INTO events ({', '.join(columns)}) VALUES %s RETURNING id, course_id",
+        rows, template=template, page_size=len(rows), fetch=True
+    )
+
+def _update_events(cur, user_id: str, updates: List[Dict]) -> List[Dict]:
+    """One UPDATE ... FROM (VALUES ...) per distinct set of changed fields."""
+    by_fields: Dict[tuple, List[Dict]] = defaultdict(list)
+    for ev in updates:
+        by_fields[tuple(c for c in UPDATE_COLUMNS if c in ev)].append(ev)
+    updated = []
+    for fields, group in by_fields.items():
+        template = "(%s::integer, " + ", ".join(f"%s::{EVENT_COLUMN_TYPES[c]}" for c in fields) + ")"
+        assignments = ", ".join(f"{c} = v.{c}" for c in fields)
+        # user_id is bound first; %%s survives mogrify as the VALUES placeholder
+        sql = cur.mogrify(
+            f"UPDATE events AS e SET {assignments} FROM (VALUES %%s) AS v(id, {', '.join(fields)}) "
+            f"WHERE e.id = v.id AND e.user_id = %s RETURNING e.id, e.course_id",
+            (user_id,)
+        )
+        rows = [(ev["id"],) + tuple(ev[c] for c in fields) for ev in group]
+        updated += execute_values(cur, sql, rows, template=template, page_size=len(rows), fetch=True)
+    return updated
+
+def _enforce_groups(cur, course_id: int, optional_groups: Dict, pinned: Set[int], rebalance: bool) -> List[int]:
+    """
+    Keep every best-N group at most N included. With rebalance, drop the extra items
+    (ungraded first, then lowest score, never ones the request just included); otherwise fail.
+    """
+    if not optional_groups:
+        return []
+    by_group = defaultdict(list)
+    for item in fetch_course_items(cur, course_id):
+        if item.counts:
+            by_group[component_base(item.name)].append(item)
+    excluded = []
+    for base, max_included in optional_groups.items():
+        included = by_group.get(base, [])
+        if len(included) <= max_included:
+            continue
+        if not rebalance:
+            raise BulkWriteError(
+                f'Only {max_included} "{base}" items can be included',
+                {"course_id": course_id, "group": base, "included": len(included), "max": max_included}
+            )
+        candidates = [i for i in included if i.id not in pinned]
+        while len(included) > max_included:
+            drop = pick_item_to_exclude(candidates)
+            if drop is None:
+                raise BulkWriteError(
+                    f'More than {max_included} "{base}" items were explicitly included',
+                    {"course_id": course_id, "group": base, "max": max_included}
+                )
+            candidates.remove(drop)
+            included.remove(drop)
+            excluded.append(drop.id)
+    if excluded:
+        cur.execute("UPDATE events SET included = FALSE WHERE id = ANY(%s)", (excluded,))
+    return excluded
+
+def apply_bulk_event_writes(cur, user_id: str, payload: Dict) -> Dict:
+    """
+    Apply {"course"?, "insert": [...], "update": [...], "rebalance"?} in the caller's transaction.
+    "course" may carry {"outline": {"text", "answers", "items"}} to store its parse artifact.
+    Raises BulkWriteError (caller rolls back) on bad input, foreign courses/events or group violations.
+    """
+    _check_payload(payload)
+    inserts = [dict(ev) for ev in payload.get("insert", [])]
+    updates = payload.get("update", [])
+
+    new_course_id = None
+    if payload.get("course") is not None:
+        new_course_id = _create_course(cur, user_id, payload["course"])
+        outline = payload["course"].get("outline")
+        if outline is not None:
+            # Keep the outline and its parse so later edits can be re-parsed section by section
+            text, answers, items = check_outline_payload(outline)
+            save_artifact(cur, new_course_id, user_id, text, build_artifact(text, answers, items))
+        for ev in inserts:
+            ev.setdefault("course_id", new_course_id)
+
+    referenced = {ev["course_id"] for ev in inserts if ev.get("course_id") is not None}
+    courses = _owned_courses(cur, user_id, referenced)
+    missing = referenced - set(courses)
+    if missing:
+        raise BulkWriteError("Course not found", {"course_ids": sorted(missing)}, status=404)
+
+    inserted = _insert_events(cur, user_id, inserts)
+    updated = _update_events(cur, user_id, updates)
+    not_found = {ev["id"] for ev in updates} - {row["id"] for row in updated}
+    if not_found:
+        raise BulkWriteError("Event not found", {"event_ids": sorted(not_found)}, status=404)
+
+    affected = {row["course_id"] for row in inserted + updated if row["course_id"] is not None}
+    courses.update(_owned_courses(cur, user_id, affected - set(courses)))
+    pinned = {ev["id"] for ev in updates if ev.get("included") is True}
+    excluded = []
+    for course_id in sorted(affected):
+        excluded += _enforce_groups(cur, course_id, courses.get(course_id), pinned, bool(payload.get("rebalance")))
+        recompute_summary(cur, course_id, user_id)
+
+    return {
+        "course_id": new_course_id,
+        "inserted": [row["id"] for row in inserted],
+        "updated": sorted({row["id"] for row in updated}),
+        "excluded": excluded,
+    }
@@ -0,0 +1,233 @@
+# extraction_pool.py - Isolated worker processes for CPU-heavy PDF extraction (rlimits, timeouts, crash recovery)
+import multiprocessing
+import os
+import queue
+import shutil
+import signal
+import tempfile
+import threading
+from typing import Callable, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, the wall-clock timeout still applies
+    resource = None
+
+from .pdf_extract import MAX_OUTLINE_PAGES, extract_pdf_text
+from .pdf_probe import ScannedPdfError
+from .uploads import mapped_upload
+
+DEFAULT_EXTRACTION_WORKERS = 2         # processes per web worker (0 = extract in-process)
+DEFAULT_EXTRACTION_TIMEOUT = 30        # wall-clock seconds per job, enforced by the web side
+DEFAULT_EXTRACTION_CPU_SECONDS = 20    # CPU seconds per job, enforced in the worker (RLIMIT_CPU)
+DEFAULT_EXTRACTION_MEMORY_MB = 1024    # address-space cap per worker (RLIMIT_AS)
+DEFAULT_EXTRACTION_MAX_JOBS = 50       # recycle a worker after this many jobs
+DEFAULT_EXTRACTION_QUEUE_SECONDS = 10  # wait this long for a free worker before answering 503
+
+class ExtractionError(Exception):
+    """
+    A file could not be extracted (timeout, resource limit, crash, no text layer) or no worker was free.
+    code/details go into the JSON error so clients can tell rejections apart (e.g. "scanned_pdf", "blank_pdf").
+    """
+    def __init__(self, message: str, status: int = 422, retry_after: Optional[int] = None,
+                 code: Optional[str] = None, details: Optional[Dict] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.code = code
+        self.details = details
+
+def scanned_pdf_error(e: ScannedPdfError) -> ExtractionError:
+    return ExtractionError(str(e), 422, code=e.code, details={"pdf": e.probe})
+
+class _CpuLimitExceeded(BaseException):
+    """Raised from SIGXCPU; a BaseException so parsers' `except Exception` wrappers don't swallow it."""
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+def _job_functions() -> Dict[str, Callable]:
+    from .pdf_extract import extract_pdf_file
+    from .outline_parser import parse_outline, parse_outline_file
+    return {"pdf_text": extract_pdf_file, "parse_outline": parse_outline, "parse_outline_file": parse_outline_file}
+
+def _on_sigxcpu(signum, frame):
+    raise _CpuLimitExceeded()
+
+def _set_job_cpu_limit(cpu_seconds: int) -> None:
+    """RLIMIT_CPU counts the whole process lifetime, so each job's soft limit is usage-so-far + budget."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(usage.ru_utime + usage.ru_stime) + cpu_seconds + 1
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+def _worker_main(conn, cpu_seconds: int, memory_mb: int) -> None:
+    """Worker loop: one job at a time. Exits after hitting a limit so the pool replaces it with a clean process."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C is handled by the web process, which stops us
+    if resource is not None:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        signal.signal(signal.SIGXCPU, _on_sigxcpu)
+    jobs = _job_functions()
+    while True:
+        try:
+            kind, args = conn.recv()
+        except EOFError:
+            return  # web process went away
+        if resource is not None:
+            _set_job_cpu_limit(cpu_seconds)
+        try:
+            conn.send(("ok", jobs[kind](*args)))
+        except ScannedPdfError as e:
+            conn.send(("scanned", e.probe))  # rejected by the probe in milliseconds; the worker stays up
+        except _CpuLimitExceeded:
+            conn.send(("limit", f"used more than {cpu_seconds}s of CPU"))
+            return
+        except MemoryError:
+            conn.send(("limit", f"used more than {memory_mb} MB of memory"))
+            return
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+class _Worker:
+    """One spawned extraction process and the pipe to it."""
+    def __init__(self, ctx, cpu_seconds: int, memory_mb: int):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, cpu_seconds, memory_mb),
+                                   name="extraction-worker", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def run(self, kind: str, args: tuple, timeout: float):
+        """(status, value) from the worker. Raises TimeoutError, or EOFError/OSError if it died."""
+        self.jobs += 1
+        self.conn.send((kind, args))
+        if not self.conn.poll(timeout):
+            raise TimeoutError
+        return self.conn.recv()
+
+    def stop(self) -> None:
+        self.conn.close()
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(5)
+
+class ExtractionPool:
+    """
+    Fixed set of long-lived extraction processes owned by one web process. Each job has a wall-clock
+    timeout here plus CPU/memory rlimits in the worker; a worker that times out, crashes or hits a
+    limit is killed and replaced without affecting the others or the web process.
+    """
+    def __init__(self, size: int, timeout: float, cpu_seconds: int, memory_mb: int,
+                 max_jobs: int, queue_seconds: float):
+        # spawn, not fork: web workers run threads, and children shouldn't inherit sockets/DB pools
+        self._ctx = multiprocessing.get_context("spawn")
+        self.size = size
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.max_jobs = max_jobs
+        self.queue_seconds = queue_seconds
+        # Slots hold a _Worker or None (not started yet / replaced after a failure); LIFO reuses warm ones
+        self._idle: "queue.LifoQueue[Optional[_Worker]]" = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put(None)
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self.cpu_seconds, self.memory_mb)
+
+    def start(self) -> None:
+        """Start every worker now instead of on first use (called after gunicorn forks a web worker)."""
+        workers = [self._idle.get() for _ in range(self.size)]
+        for w in workers:
+            self._idle.put(w or self._spawn())
+
+    def stop(self) -> None:
+        """Stop every worker; waits for jobs still running to hand theirs back."""
+        for _ in range(self.size):
+            worker = self._idle.get()
+            if worker is not None:
+                worker.stop()
+
+    def run(self, kind: str, *args):
+        """Run one job on a free worker and return its result; raises ExtractionError."""
+        try:
+            worker = self._idle.get(timeout=self.queue_seconds)
+        except queue.Empty:
+            raise ExtractionError("All extraction workers are busy, try again shortly", 503, retry_after=5)
+        try:
+            if worker is None:
+                worker = self._spawn()
+            try:
+                status, value = worker.run(kind, args, self.timeout)
+            except TimeoutError:
+                worker.stop()
+                worker = None
+                raise ExtractionError(f"Extraction took longer than {self.timeout:g}s")
+            except (EOFError, OSError):
+                worker.stop()
+                worker = None
+                raise ExtractionError("Extraction crashed on this file")
+            if status == "limit":
+                worker.stop()
+                worker = None
+                raise ExtractionError(f"Extraction {value}")
+            if status == "scanned":
+                raise scanned_pdf_error(ScannedPdfError(value))
+            if status == "error":
+                raise ExtractionError(f"Could not extract this file ({value})")
+            if worker.jobs >= self.max_jobs:
+                worker.stop()
+                worker = None
+            return value
+        finally:
+            self._idle.put(worker)
+
+_pool: Optional[ExtractionPool] = None
+_pool_lock = threading.Lock()
+
+def extraction_pool() -> Optional[ExtractionPool]:
+    """This process's pool, configured from EXTRACTION_* env vars; None when EXTRACTION_WORKERS=0."""
+    global _pool
+    size = _env_int("EXTRACTION_WORKERS", DEFAULT_EXTRACTION_WORKERS)
+    if size <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ExtractionPool(
+                    size,
+                    timeout=_env_int("EXTRACTION_TIMEOUT", DEFAULT_EXTRACTION_TIMEOUT),
+                    cpu_seconds=_env_int("EXTRACTION_CPU_SECONDS", DEFAULT_EXTRACTION_CPU_SECONDS),
+                    memory_mb=_env_int("EXTRACTION_MEMORY_MB", DEFAULT_EXTRACTION_MEMORY_MB),
+                    max_jobs=_env_int("EXTRACTION_MAX_JOBS", DEFAULT_EXTRACTION_MAX_JOBS),
+                    queue_seconds=_env_int("EXTRACTION_QUEUE_SECONDS", DEFAULT_EXTRACTION_QUEUE_SECONDS),
+                )
+    return _pool
+
+def extract_pdf_upload(file, max_pages: int = MAX_OUTLINE_PAGES) -> str:
+    """Text of an uploaded PDF, extracted in the worker pool (or in-process when the pool is disabled)."""
+    pool = extraction_pool()
+    if pool is None:
+        with mapped_upload(file) as data:
+            try:
+                return extract_pdf_text(data, max_pages)
+            except ScannedPdfError as e:
+                raise scanned_pdf_error(e)
+            except Exception as e:  # same 422 the pool gives for a parser failure, not a 500
+                raise ExtractionError(f"Could not extract this file ({type(e).__name__}: {e})")
+    # Workers get a path rather than the bytes: the pipe stays small and the worker mmaps the file
+    fd, path = tempfile.mkstemp(suffix=".pdf", prefix="outline-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            file.stream.seek(0)
+            shutil.copyfileobj(file.stream, out)
+        return pool.run("pdf_text", path, max_pages)
+    finally:
+        os.unlink(path)
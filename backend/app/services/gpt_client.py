@@ -1,11 +1,29 @@
 # gpt_client.py - Handles GPT-based outline parsing for course schedules
 import os
 import re
+import json
+import time
 import datetime
-from openai import OpenAI
-
-# Initialize OpenAI client with API key from environment
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Union
+from .prompt_filter import filter_outline_for_prompt, estimate_tokens
+from .usage_tracker import check_budget, record_usage
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """OpenAI client, created on first use (importing openai is most of the app's cold start)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from openai import OpenAI
+                _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
+
+GPT_MODEL = "gpt-4o"
 
 # Use current year in prompts
 current_year = datetime.date.today().year
@@ -259,74 +277,255 @@ Return ONLY the lines in the required format.
 
 """
 
+# Combined single-call mode: analysis rules + parsing rules, answered as JSON
+COMBINED_PROMPT = f"""
+You are a scheduling assistant. In ONE reply, either ask clarifying questions OR return the parsed items.
+
+STEP A - CLARIFY: Apply the ANALYSIS RULES below. If (and only if) information ESSENTIAL for scheduling is
+missing, return status "questions" with the questions and an empty items list.
+If the user message already contains "Answers to clarifying questions", do NOT ask again.
+
+STEP B - PARSE: Otherwise return status "ready" with an empty questions list and one entry in items per graded
+assessment, following the PARSING RULES below. Each item's name, date, percent and explanation use exactly the
+field formats the parsing rules describe for the line format; optional is the Optional flag.
+
+The JSON schema replaces any "Output format" / "Return ONLY the lines" instructions inside the rules.
+
+==================== ANALYSIS RULES ====================
+{ANALYSIS_PROMPT}
+==================== PARSING RULES ====================
+{SCHEDULER_PROMPT}
+"""
+
+COMBINED_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "outline_analysis",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "status": {"type": "string", "enum": ["questions", "ready"]},
+                "questions": {"type": "array", "items": {"type": "string"}},
+                "items": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string"},
+                            "date": {"type": "string"},
+                            "percent": {"type": "string"},
+                            "explanation": {"type": "string"},
+                            "optional": {"type": "boolean"}
+                        },
+                        "required": ["name", "date", "percent", "explanation", "optional"],
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["status", "questions", "items"],
+            "additionalProperties": False
+        }
+    }
+}
+
+# Full month names only; pre_process_outline never rewrites abbreviations.
+_MONTH_NAMES = r"(?:January|February|March|April|May|June|July|August|September|October|November|December)"
+
+# Upper bound on how far a single match may scan within a line. Keeps the lazy
+# ".*?" style prefixes linear on very long pasted lines (no newline for 100s of KB).
+_MAX_LINE_SCAN = 500
+
+# "Assignments are due on Feb 1, Feb 14 and Mar 3."
+_ASSIGNMENT_DUE_LIST_RE = re.compile(
+    rf"Assignments.{{0,{_MAX_LINE_SCAN}}}?due on\s+([^\.]{{1,{_MAX_LINE_SCAN * 4}}})",
+    re.IGNORECASE
+)
+
+# "Quizzes are in Lab during the weeks of Jan 27, Feb 3 and Feb 10."
+_QUIZ_WEEKS_LIST_RE = re.compile(
+    rf"Quizzes.{{0,{_MAX_LINE_SCAN}}}?weeks of\s+([^\.]{{1,{_MAX_LINE_SCAN * 4}}})",
+    re.IGNORECASE
+)
+
+_DATE_LIST_SPLIT_RE = re.compile(r",\s*| and ")
+_HAS_YEAR_RE = re.compile(r"\d{4}")
+
+# Bare "Month DD" with no year after it
+_BARE_DATE_RE = re.compile(rf"\b(?P<month>{_MONTH_NAMES})\s+(?P<day>\d{{1,2}})(?!\s*\d{{4}})\b")
+
+# "X is scheduled for Month DD" -> "X — Month DD YYYY", falling back to a bare date.
+# Only run on lines that contain the phrase (see _date_matches).
+_SCHEDULED_PHRASE = "is scheduled for"
+_SCHEDULED_OR_BARE_DATE_RE = re.compile(
+    rf"(?P<subject>[A-Z][^\n]{{0,{_MAX_LINE_SCAN}}}?)\s+{_SCHEDULED_PHRASE}\s+"
+    rf"(?P<smonth>{_MONTH_NAMES})\s+(?P<sday>\d{{1,2}})(?!\s*\d{{4}})"
+    rf"|\b(?P<month>{_MONTH_NAMES})\s+(?P<day>\d{{1,2}})(?!\s*\d{{4}})\b"
+)
+
+# Up to three tokens past a region boundary: what a date match starting inside the region can still
+# read there (month, day, and the year its "no year follows" lookahead looks for)
+_REGION_TAIL_RE = re.compile(r"(?:\s*\S{1,12}){0,3}")
+
+def _region_limit(text: str, region_end: int) -> int:
+    """End position for scanning a region: matches starting before region_end come out as on the whole text."""
+    return min(len(text), _REGION_TAIL_RE.match(text, region_end).end() + 1)
+
+def _date_matches(text: str):
+    """Yield date rewrite matches left to right in one pass over text."""
+    n = len(text)
+    pos = 0
+    hot = text.find(_SCHEDULED_PHRASE)
+    while hot != -1:
+        # The phrase may wrap: subject on the line before, date on the line after
+        before = hot
+        while before > 0 and text[before - 1].isspace():
+            before -= 1
+        line_start = text.rfind("\n", 0, before) + 1
+        last = hot
+        while True:
+            after = last + len(_SCHEDULED_PHRASE)
+            while after < n and text[after].isspace():
+                after += 1
+            line_end = text.find("\n", after)
+            if line_end == -1:
+                line_end = n
+            # A later phrase joins the region when its subject line (the last non-blank one before it)
+            # is this region's last line
+            nxt = text.find(_SCHEDULED_PHRASE, last + 1)
+            if nxt == -1:
+                break
+            subject_end = nxt
+            while subject_end > 0 and text[subject_end - 1].isspace():
+                subject_end -= 1
+            if subject_end > line_end:
+                break
+            last = nxt
+        for region_end, pattern in ((line_start, _BARE_DATE_RE), (line_end, _SCHEDULED_OR_BARE_DATE_RE)):
+            # Bounded: an unbounded scan runs to the next date, which may be the end of the document
+            for m in pattern.finditer(text, pos, _region_limit(text, region_end)):
+                if m.start() >= region_end:
+                    break
+                yield m
+                pos = m.end()
+            pos = max(pos, region_end)
+        hot = text.find(_SCHEDULED_PHRASE, pos)
+    yield from _BARE_DATE_RE.finditer(text, pos)
+
+def _rewrite_dates(text: str, year: str, out: list) -> None:
+    """Append text to out with years added to bare dates."""
+    pos = 0
+    for m in _date_matches(text):
+        out.append(text[pos:m.start()])
+        if m.re is _SCHEDULED_OR_BARE_DATE_RE and m.group("subject") is not None:
+            # Bare dates inside the subject still get a year (matched in place for correct \b context)
+            sub_pos, sub_end = m.span("subject")
+            for dm in _BARE_DATE_RE.finditer(text, sub_pos, sub_end):
+                out.append(text[sub_pos:dm.start()])
+                out.append(f"{dm.group('month')} {dm.group('day')} {year}")
+                sub_pos = dm.end()
+            out.append(text[sub_pos:sub_end])
+            out.append(f" — {m.group('smonth')} {m.group('sday')} {year}")
+        else:
+            out.append(f"{m.group('month')} {m.group('day')} {year}")
+        pos = m.end()
+    out.append(text[pos:])
+
+def _synthesize_items(label: str, date_list: str, year: str) -> list[str]:
+    """Turn "Feb 1, Feb 14 and Mar 3" into ["<label> 1, Feb 1 YYYY,", ...]."""
+    items = []
+    for i, d in enumerate(_DATE_LIST_SPLIT_RE.split(date_list), start=1):
+        d = d.strip()
+        if not _HAS_YEAR_RE.search(d):
+            d = f"{d} {year}"
+        items.append(f"{label} {i}, {d},")
+    return items
+
 def pre_process_outline(text: str) -> str:
     """Pre-process outline text to make dates explicit for GPT parsing."""
     year = str(datetime.date.today().year)
-    # Handle lines like "Assignments due on Feb 1, Feb 14…"
-    m = re.search(r'Assignments.*?due on\s+([^\.]+)', text, flags=re.IGNORECASE)
-    if m:
-        dates = re.split(r',\s*| and ', m.group(1))
-        items = []
-        for i, d in enumerate(dates, start=1):
-            d = d.strip()
-            if not re.search(r'\d{4}', d):
-                d = f"{d} {year}"
-            items.append(f"Assignment {i}, {d},")
-        text = "\n".join(items) + "\n" + text
-    # Handle "Quizzes are in Lab during the weeks of Jan 27, Feb 3, …"
-    m2 = re.search(r'Quizzes.*?weeks of\s+([^\.]+)', text, flags=re.IGNORECASE)
+    # Synthesized item lines are prepended (quizzes first, then assignments)
+    header: list[str] = []
+    m2 = _QUIZ_WEEKS_LIST_RE.search(text)
     if m2:
-        dates = re.split(r',\s*| and ', m2.group(1))
-        items = []
-        for i, d in enumerate(dates, start=1):
-            d = d.strip()
-            if not re.search(r'\d{4}', d):
-                d = f"{d} {year}"
-            items.append(f"Quiz {i}, {d},")
-        text = "\n".join(items) + "\n" + text
-    # Convert "X is scheduled for Month DD" to explicit date
-    text = re.sub(
-        r'([A-Z][^\n]+?)\s+is scheduled for\s+'
-        r'(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{1,2})(?!\s*\d{4})',
-        lambda m: f"{m.group(1)} — {m.group(2)} {m.group(3)} {year}",
-        text
-    )
-    # Add year to bare Month DD
-    text = re.sub(
-        r'\b(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{1,2})(?!\s*\d{4})\b',
-        rf'\1 \2 {year}',
-        text
-    )
-    # Ensure "Label: Month DD" lines (e.g. Course Progress marking deadlines) have year for GPT
-    def _add_year_to_label_date(match):
-        prefix, month, day = match.group(1), match.group(2), match.group(3)
-        return f"{prefix}{month} {day} {year}"
-    text = re.sub(
-        r'^([^:\n]+:\s*)(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{1,2})(?!\s*\d{4})\b',
-        _add_year_to_label_date,
-        text,
-        flags=re.MULTILINE
+        header.extend(_synthesize_items("Quiz", m2.group(1), year))
+    m = _ASSIGNMENT_DUE_LIST_RE.search(text)
+    if m:
+        header.extend(_synthesize_items("Assignment", m.group(1), year))
+    # Add year to bare Month DD (and rewrite "X is scheduled for Month DD").
+    # "Label: Month DD" lines (Course Progress marking deadlines) are covered by the bare-date rule.
+    out: list[str] = []
+    if header:
+        _rewrite_dates("\n".join(header) + "\n", year, out)
+    _rewrite_dates(text, year, out)
+    return "".join(out)
+
+@dataclass
+class GptOutlineResult:
+    """Outcome of one analyze/parse request, shared by the normal and debug endpoints."""
+    data: Union[dict, list]  # analysis dict or parsed item list (what the endpoints return)
+    raw_response: str = ""  # first GPT response, before cleanup
+    preprocessed_text: str = ""  # outline text as sent to GPT
+    timings: Dict[str, int] = field(default_factory=dict)  # step -> milliseconds
+
+def _ms_since(start: float) -> int:
+    return int((time.perf_counter() - start) * 1000)
+
+def chat_completion(messages: list[dict], kind: str, user_id: str = None, response_format: dict = None) -> str:
+    """Run one chat completion with budget admission and token/latency accounting. Returns the text."""
+    reservation = check_budget(user_id, sum(estimate_tokens(m["content"]) for m in messages))
+    extra = {"response_format": response_format} if response_format else {}
+    start = time.perf_counter()
+    try:
+        resp = get_client().chat.completions.create(
+            model=GPT_MODEL,
+            messages=messages,
+            temperature=0.1,
+            **extra
+        )
+    except Exception:
+        record_usage(user_id, kind, GPT_MODEL, 0, 0, _ms_since(start), status="error", reservation=reservation)
+        raise
+    latency_ms = _ms_since(start)
+    usage = getattr(resp, "usage", None)
+    record_usage(
+        user_id, kind, GPT_MODEL,
+        getattr(usage, "prompt_tokens", 0) or 0,
+        getattr(usage, "completion_tokens", 0) or 0,
+        latency_ms, reservation=reservation
     )
-    return text
+    return resp.choices[0].message.content or ""
+
+def _filter_for_prompt(outline_text: str) -> str:
+    """Drop non-grading sections (office hours, policies) to cut prompt tokens."""
+    f = filter_outline_for_prompt(outline_text)
+    print(f"DEBUG: prompt filter ({f.reason}, confidence={f.confidence:.2f}): "
+          f"~{f.tokens_before} -> ~{f.tokens_after} tokens")
+    return f.text
 
-def analyze_outline_for_questions(outline_text: str) -> dict:
+def analyze_outline_for_questions(outline_text: str, user_id: str = None) -> GptOutlineResult:
     """Analyze outline and return questions if needed, or indicate ready to parse."""
     if not outline_text.strip():
-        return {"status": "ready", "items": []}
+        return GptOutlineResult({"status": "ready", "items": []})
     
-    outline_text = pre_process_outline(outline_text)
+    start = time.perf_counter()
+    outline_text = _filter_for_prompt(pre_process_outline(outline_text))
+    result = GptOutlineResult(None, preprocessed_text=outline_text)
+    result.timings["preprocess_ms"] = _ms_since(start)
     messages = [
         {"role": "system", "content": ANALYSIS_PROMPT},
         {"role": "user", "content": outline_text}
     ]
     
-    resp = client.chat.completions.create(
-        model="gpt-4o",
-        messages=messages,
-        temperature=0.1
-    )
-    
-    raw = resp.choices[0].message.content or ""
+    gpt_start = time.perf_counter()
+    raw = result.raw_response = chat_completion(messages, "analyze", user_id)
+    result.timings["gpt_ms"] = _ms_since(gpt_start)
+    result.data = _parse_analysis_response(raw)
+    result.timings["total_ms"] = _ms_since(start)
+    return result
+
+def _parse_analysis_response(raw: str) -> dict:
+    """Turn the analysis reply (QUESTIONS: ... or READY_TO_PARSE) into the endpoint payload."""
     print(f"DEBUG: GPT raw response: {repr(raw)}")  # Debug line
     
     # Remove markdown code blocks if present
@@ -361,38 +560,73 @@ def analyze_outline_for_questions(outline_text: str) -> dict:
     print(f"DEBUG: Fallback - treating as ready to parse. Raw response: {repr(raw)}")
     return {"status": "ready", "items": []}
 
-def parse_outline_with_gpt(outline_text: str, answers: list = None) -> list[dict]:
-    """Parse a course outline into assessment items using GPT, optionally with clarifying answers."""
+def _user_content(outline_text: str, answers: list = None) -> str:
+    """User message for parsing; includes clarifying answers when provided."""
+    if not answers:
+        return outline_text
+    answers_text = "\n".join([f"Q{i+1}: {answer}" for i, answer in enumerate(answers)])
+    return f"Course Outline:\n{outline_text}\n\nAnswers to clarifying questions:\n{answers_text}"
+
+def analyze_and_parse_outline(outline_text: str, answers: list = None, user_id: str = None) -> GptOutlineResult:
+    """
+    Single GPT call that returns either clarifying questions or the parsed items
+    ({"status": "questions", "questions": [...]} or {"status": "ready", "items": [...]}).
+    Replaces the analyze -> parse round trips for outlines that need no clarification.
+    Falls back to parse_outline_with_gpt if the structured reply cannot be decoded, or if it
+    neither asks usable questions nor is "ready" with items (so the outline is never silently lost).
+    """
     if not outline_text.strip():
-        return []
-    
-    outline_text = pre_process_outline(outline_text)
-    
-    # If answers provided, include them in the prompt
-    if answers:
-        answers_text = "\n".join([f"Q{i+1}: {answer}" for i, answer in enumerate(answers)])
-        user_content = f"Course Outline:\n{outline_text}\n\nAnswers to clarifying questions:\n{answers_text}"
-    else:
-        user_content = outline_text
-    
+        return GptOutlineResult({"status": "ready", "items": []})
+
+    start = time.perf_counter()
+    prompt_text = _filter_for_prompt(pre_process_outline(outline_text))
+    result = GptOutlineResult(None, preprocessed_text=prompt_text)
+    result.timings["preprocess_ms"] = _ms_since(start)
     messages = [
-        {"role": "system", "content": SCHEDULER_PROMPT},
-        {"role": "user", "content": user_content}
+        {"role": "system", "content": COMBINED_PROMPT},
+        {"role": "user", "content": _user_content(prompt_text, answers)}
     ]
-    
-    resp = client.chat.completions.create(
-        model="gpt-4o",
-        messages=messages,
-        temperature=0.1
-    )
-    
-    raw = resp.choices[0].message.content or ""
-    print("[DEBUG] parse_outline_with_gpt — GPT raw response:\n", raw, "\n---")
-    lines = [l.strip() for l in raw.splitlines() if l.strip()]
+
+    gpt_start = time.perf_counter()
+    raw = result.raw_response = chat_completion(messages, "analyze_parse", user_id, response_format=COMBINED_RESPONSE_FORMAT)
+    result.timings["gpt_ms"] = _ms_since(gpt_start)
+    print(f"DEBUG: combined GPT raw response: {repr(raw)}")
+
+    def fall_back(reason: str) -> GptOutlineResult:
+        print(f"DEBUG: combined response {reason}, falling back to parse_outline_with_gpt")
+        fallback = parse_outline_with_gpt(outline_text, answers, user_id)
+        fallback.data = {"status": "ready", "items": fallback.data}
+        return fallback
+
+    try:
+        reply = json.loads(raw)
+    except json.JSONDecodeError:
+        return fall_back("is not JSON")
+
+    questions = [q.strip() for q in reply.get("questions") or [] if q and q.strip()]
+    if reply.get("status") == "questions" and questions and not answers:
+        result.data = {"status": "questions", "questions": questions}
+    else:
+        # "questions" with answers already given or with no usable question, or "ready" with no
+        # items: the model never filled the items, so parse the outline the two-step way
+        if reply.get("status") != "ready" or not reply.get("items"):
+            return fall_back(f"has status {reply.get('status')!r} and no items")
+        items = [{
+            "name": it["name"],
+            "date": it["date"],
+            "percent": it["percent"],
+            "included": not (it.get("optional") or "(opt)" in it["name"].lower() or "(optional)" in it["name"].lower()),
+            "explanation": it.get("explanation", "")
+        } for it in reply["items"]]
+        result.data = {"status": "ready", "items": _dedupe_items(items)}
+    result.timings["total_ms"] = _ms_since(start)
+    return result
+
+def _parse_item_lines(lines: list[str]) -> list[dict]:
+    """Items from "Name, Date, P%, EXPLANATION, Optional" lines (the parse/recheck reply format)."""
     items = []
-    
     for line in lines:
-        parts = [p.strip() for p in line.split(",")]
+        parts = [p.strip() for p in line.strip().split(",")]
         if len(parts) >= 3:
             # Optional is always last field (true/false). Handle commas in Name/Explanation.
             name, date, percent = parts[0], parts[1], parts[2]
@@ -413,20 +647,79 @@ def parse_outline_with_gpt(outline_text: str, answers: list = None) -> list[dict
                 "included": included,
                 "explanation": explanation
             })
+    return items
+
+def _format_item_lines(items: list[dict]) -> str:
+    """Items back in the parse reply format, one line each."""
+    return "\n".join([f"{item['name']}, {item['date']}, {item['percent']}, {item.get('explanation', '')}, {'true' if not item.get('included', True) else 'false'}" for item in items])
+
+def parse_outline_with_gpt(outline_text: str, answers: list = None, user_id: str = None) -> GptOutlineResult:
+    """Parse a course outline into assessment items using GPT, optionally with clarifying answers."""
+    if not outline_text.strip():
+        return GptOutlineResult([])
+    
+    start = time.perf_counter()
+    outline_text = _filter_for_prompt(pre_process_outline(outline_text))
+    result = GptOutlineResult(None, preprocessed_text=outline_text)
+    result.timings["preprocess_ms"] = _ms_since(start)
+    
+    messages = [
+        {"role": "system", "content": SCHEDULER_PROMPT},
+        {"role": "user", "content": _user_content(outline_text, answers)}
+    ]
     
+    gpt_start = time.perf_counter()
+    raw = result.raw_response = chat_completion(messages, "parse", user_id)
+    result.timings["gpt_ms"] = _ms_since(gpt_start)
+    print("[DEBUG] parse_outline_with_gpt — GPT raw response:\n", raw, "\n---")
     # Dedupe before recheck (first parse can also produce dupes)
-    items = _dedupe_items(items)
+    items = _dedupe_items(_parse_item_lines(raw.splitlines()))
     
     # Rechecking step - validate and fix common errors
-    items = recheck_parsed_items(items, outline_text, answers)
-    
-    return items
-
-def recheck_parsed_items(items: list[dict], outline_text: str, answers: list = None) -> list[dict]:
+    recheck_start = time.perf_counter()
+    result.data = recheck_parsed_items(items, outline_text, answers, user_id)
+    result.timings["recheck_ms"] = _ms_since(recheck_start)
+    result.timings["total_ms"] = _ms_since(start)
+    return result
+
+def reparse_changed_sections(items: list[dict], removed_text: str, changed_text: str,
+                             answers: list = None, user_id: str = None) -> GptOutlineResult:
+    """
+    Update a previous parse after an outline edit by sending GPT only the edited sections plus the
+    current item list (instead of the whole outline). One call, no recheck: unaffected items are
+    echoed back as-is, so the prompt is a fraction of a full parse.
+    """
+    start = time.perf_counter()
+    changed_text = pre_process_outline(changed_text)
+    user_content = (
+        "These items were parsed from the previous version of this course outline:\n"
+        f"{_format_item_lines(items)}\n\n"
+        "The outline was then edited. Sections REMOVED or replaced:\n"
+        f"{removed_text or '(none)'}\n\n"
+        "Sections ADDED or edited (new text):\n"
+        f"{changed_text or '(none)'}\n\n"
+        "Apply the edit: return the COMPLETE updated item list using the parsing rules. Copy items the "
+        "edit does not affect exactly as they are; change, add or drop only what the edited sections imply."
+    )
+    result = GptOutlineResult(None, preprocessed_text=changed_text)
+    result.timings["preprocess_ms"] = _ms_since(start)
+    messages = [
+        {"role": "system", "content": SCHEDULER_PROMPT},
+        {"role": "user", "content": _user_content(user_content, answers)}
+    ]
+    gpt_start = time.perf_counter()
+    raw = result.raw_response = chat_completion(messages, "reparse", user_id)
+    result.timings["gpt_ms"] = _ms_since(gpt_start)
+    print("[DEBUG] reparse_changed_sections — GPT raw response:\n", raw, "\n---")
+    result.data = _dedupe_items(_parse_item_lines(raw.splitlines()))
+    result.timings["total_ms"] = _ms_since(start)
+    return result
+
+def recheck_parsed_items(items: list[dict], outline_text: str, answers: list = None, user_id: str = None) -> list[dict]:
     """Recheck parsed items for common errors and fix them."""
     
     # Build rechecking prompt (same format as parse output)
-    items_text = "\n".join([f"{item['name']}, {item['date']}, {item['percent']}, {item.get('explanation', '')}, {'true' if not item.get('included', True) else 'false'}" for item in items])
+    items_text = _format_item_lines(items)
     
     recheck_prompt = f"""
     You are rechecking a parsed course outline. The items below were already produced by a first pass.
@@ -460,13 +753,7 @@ def recheck_parsed_items(items: list[dict], outline_text: str, answers: list = N
 
     messages = [{"role": "user", "content": recheck_prompt}]
     
-    resp = client.chat.completions.create(
-        model="gpt-4o",
-        messages=messages,
-        temperature=0.1
-    )
-    
-    recheck_response = resp.choices[0].message.content or ""
+    recheck_response = chat_completion(messages, "recheck", user_id)
     print("[DEBUG] recheck_parsed_items — GPT recheck response:\n", recheck_response, "\n---")
 
     # If no changes needed, return original items (deduped)
@@ -489,28 +776,7 @@ def recheck_parsed_items(items: list[dict], outline_text: str, answers: list = N
             continue
         corrected_lines.append(line)
     
-    corrected_items = []
-    for line in corrected_lines:
-        parts = [p.strip() for p in line.split(",")]
-        if len(parts) >= 3:
-            name, date, percent = parts[0], parts[1], parts[2]
-            if len(parts) >= 5:
-                explanation = ",".join(parts[3:-1]).strip()
-                opt_val = parts[-1].lower()
-            elif len(parts) == 4:
-                explanation = parts[3]
-                opt_val = ""
-            else:
-                explanation = ""
-                opt_val = ""
-            included = not (opt_val == "true" or "(opt)" in name.lower() or "(optional)" in name.lower())
-            corrected_items.append({
-                "name": name,
-                "date": date,
-                "percent": percent,
-                "included": included,
-                "explanation": explanation
-            })
+    corrected_items = _parse_item_lines(corrected_lines)
     
     result = corrected_items if corrected_items else items
     return _dedupe_items(result)
@@ -0,0 +1,257 @@
+# grade_engine.py - Course grade computation (current, projected, required-score forecasts)
+# with stored per-course summaries that are updated incrementally on single-event changes
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+# Targets reported in every forecast (letter-grade style cut-offs)
+FORECAST_TARGETS = (50, 60, 70, 80, 90)
+
+_OPTIONAL_SUFFIX_RE = re.compile(r"\s*\(opt(?:ional)?\)?\s*$", re.IGNORECASE)
+_TRAILING_NUMBER_RE = re.compile(r"\s+#?\d+\s*$")
+
+def component_base(name: Optional[str]) -> str:
+    """Base component name for grouping ("Pre-Lab Quiz 1" -> "Pre-Lab Quiz"); mirrors gradeUtils.getComponentBase."""
+    if not name or not isinstance(name, str):
+        return str(name or "")
+    base = _OPTIONAL_SUFFIX_RE.sub("", name).strip()
+    base = _TRAILING_NUMBER_RE.sub("", base).strip()
+    return base or name
+
+@dataclass
+class GradeItem:
+    id: int
+    name: str
+    percent: Optional[float] = None
+    score_received: Optional[float] = None
+    score_total: Optional[float] = None
+    included: Optional[bool] = True
+    date: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: Dict) -> "GradeItem":
+        def num(v):
+            return None if v is None else float(v)
+        date = row.get("date")
+        return cls(
+            id=row["id"],
+            name=row["name"],
+            percent=num(row.get("percent")),
+            score_received=num(row.get("score_received")),
+            score_total=num(row.get("score_total")),
+            included=row.get("included"),
+            date=date.isoformat() if hasattr(date, "isoformat") else date,
+        )
+
+    @property
+    def counts(self) -> bool:
+        # NULL included means included (column default TRUE), matching `included !== false`
+        return self.included is not False
+
+    @property
+    def graded(self) -> bool:
+        return self.score_received is not None and bool(self.score_total) and self.score_total > 0
+
+    @property
+    def score_fraction(self) -> Optional[float]:
+        return self.score_received / self.score_total if self.graded else None
+
+@dataclass
+class GradeTotals:
+    """Additive course totals; every field changes by a per-item delta, so updates are O(1)."""
+    earned: float = 0.0           # sum of weight * score fraction over graded, included items
+    graded_weight: float = 0.0    # weight of graded, included items
+    included_weight: float = 0.0  # weight of all included items
+    graded_count: int = 0
+    item_count: int = 0
+    included_by_group: Dict[str, int] = field(default_factory=dict)
+
+    def apply(self, item: GradeItem, sign: int = 1) -> None:
+        """Add (sign=1) or remove (sign=-1) one item's contribution."""
+        self.item_count += sign
+        if not item.counts:
+            return
+        weight = item.percent or 0.0
+        base = component_base(item.name)
+        self.included_by_group[base] = self.included_by_group.get(base, 0) + sign
+        if not self.included_by_group[base]:
+            del self.included_by_group[base]
+        self.included_weight += sign * weight
+        if item.graded:
+            self.earned += sign * item.score_fraction * weight
+            self.graded_weight += sign * weight
+            self.graded_count += sign
+
+    def replace(self, old: GradeItem, new: GradeItem) -> None:
+        self.apply(old, -1)
+        self.apply(new, 1)
+
+    @classmethod
+    def from_items(cls, items: Iterable[GradeItem]) -> "GradeTotals":
+        totals = cls()
+        for item in items:
+            totals.apply(item)
+        return totals
+
+def _rounded(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 4)
+
+def required_average(totals: GradeTotals, target: float) -> Optional[float]:
+    """Average % needed on the remaining weight to finish at `target` (None when nothing remains)."""
+    remaining = max(0.0, 100.0 - totals.graded_weight)
+    if remaining <= 0:
+        return None
+    return (target - totals.earned) / remaining * 100
+
+def grade_report(totals: GradeTotals, optional_groups: Optional[Dict] = None,
+                 target: Optional[float] = None) -> Dict:
+    """Current/projected grade, forecasts and best-N group status from the stored totals."""
+    current = totals.earned / totals.graded_weight * 100 if totals.graded_weight > 0 else 0.0
+    remaining = max(0.0, 100.0 - totals.graded_weight)
+    # Projection assumes the current average holds on everything not graded yet
+    projected = totals.earned + current / 100 * remaining if totals.graded_weight > 0 else None
+    targets = list(FORECAST_TARGETS)
+    if target is not None and target not in targets:
+        targets.append(target)
+    under_min = []
+    for base, required in (optional_groups or {}).items():
+        current_count = totals.included_by_group.get(base, 0)
+        if current_count < required:
+            under_min.append({"base": base, "current": current_count, "required": required})
+    return {
+        "earned": round(totals.earned, 4),
+        "graded_weight": round(totals.graded_weight, 4),
+        "included_weight": round(totals.included_weight, 4),
+        "remaining_weight": round(remaining, 4),
+        "current_grade": round(current, 4),
+        "projected_grade": _rounded(projected),
+        "graded_count": totals.graded_count,
+        "item_count": totals.item_count,
+        "forecasts": [
+            {"target": t, "required_average": _rounded(required_average(totals, t))}
+            for t in targets
+        ],
+        "under_min_groups": under_min,
+    }
+
+# --- Best N of M ---
+
+def pick_item_to_exclude(included: List[GradeItem]) -> Optional[GradeItem]:
+    """
+    Which included item to drop when one more is checked in a full best-N group:
+    an ungraded item first (the latest due), otherwise the lowest score.
+    Deterministic version of CoursePage's old random pick.
+    """
+    if not included:
+        return None
+    ungraded = [i for i in included if not i.graded]
+    if ungraded:
+        return max(ungraded, key=lambda i: (i.date or "", i.id))
+    return min(included, key=lambda i: (i.score_fraction, -i.id))
+
+# --- Stored summaries ---
+
+_ITEM_COLUMNS = "id, name, date, percent, score_received, score_total, included"
+
+# Built in SQL (not Python) so other queries, e.g. the dashboard, can compare against it inline
+COURSE_EVENTS_VERSION_SQL = (
+    "SELECT COUNT(*) || '|' || COALESCE(EXTRACT(EPOCH FROM MAX(updated_at))::text, '') AS version "
+    "FROM events WHERE course_id = {course_id}"
+)
+
+def course_events_version(cur, course_id: int) -> str:
+    cur.execute(COURSE_EVENTS_VERSION_SQL.format(course_id="%s"), (course_id,))
+    return cur.fetchone()["version"]
+
+def _load_summary(cur, course_id: int, lock: bool = False) -> Optional[Dict]:
+    cur.execute("SELECT * FROM course_grade_summaries WHERE course_id = %s" + (" FOR UPDATE" if lock else ""), (course_id,))
+    return cur.fetchone()
+
+def totals_from_summary(row: Dict) -> GradeTotals:
+    groups = row["included_by_group"]
+    return GradeTotals(
+        earned=row["earned"], graded_weight=row["graded_weight"], included_weight=row["included_weight"],
+        graded_count=row["graded_count"], item_count=row["item_count"],
+        included_by_group=dict(json.loads(groups) if isinstance(groups, str) else groups or {}),
+    )
+
+def _store_summaries(cur, user_id: str, summaries: Dict[int, tuple]) -> None:
+    """Upsert {course_id: (totals, version)} in one statement."""
+    from psycopg2.extras import execute_values
+    execute_values(cur, """
+        INSERT INTO course_grade_summaries
+            (course_id, user_id, earned, graded_weight, included_weight, graded_count, item_count,
+             included_by_group, events_version, updated_at)
+        VALUES %s
+        ON CONFLICT (course_id) DO UPDATE SET
+            earned = EXCLUDED.earned, graded_weight = EXCLUDED.graded_weight,
+            included_weight = EXCLUDED.included_weight, graded_count = EXCLUDED.graded_count,
+            item_count = EXCLUDED.item_count, included_by_group = EXCLUDED.included_by_group,
+            events_version = EXCLUDED.events_version, updated_at = NOW()
+    """, [
+        (course_id, user_id, t.earned, t.graded_weight, t.included_weight, t.graded_count, t.item_count,
+         json.dumps(t.included_by_group), version)
+        for course_id, (t, version) in sorted(summaries.items())
+    ], template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())")
+
+def _store_summary(cur, course_id: int, user_id: str, totals: GradeTotals, version: str) -> None:
+    _store_summaries(cur, user_id, {course_id: (totals, version)})
+
+def fetch_course_items(cur, course_id: int) -> List[GradeItem]:
+    cur.execute(f"SELECT {_ITEM_COLUMNS} FROM events WHERE course_id = %s ORDER BY date, id", (course_id,))
+    return [GradeItem.from_row(r) for r in cur.fetchall()]
+
+def recompute_summary(cur, course_id: int, user_id: str, version: Optional[str] = None) -> GradeTotals:
+    """Full recompute from every event of the course (first request, or after outside writes)."""
+    version = version or course_events_version(cur, course_id)
+    totals = GradeTotals.from_items(fetch_course_items(cur, course_id))
+    _store_summary(cur, course_id, user_id, totals, version)
+    return totals
+
+def recompute_summaries(cur, course_ids: Iterable[int], user_id: str) -> Dict[int, GradeTotals]:
+    """
+    recompute_summary for several courses with one read and one write (the dashboard's stale courses).
+    The windowed version expression yields the same text as COURSE_EVENTS_VERSION_SQL per course.
+    """
+    course_ids = sorted(set(course_ids))
+    if not course_ids:
+        return {}
+    cur.execute(f"""
+        SELECT course_id, {_ITEM_COLUMNS},
+               COUNT(*) OVER w || '|' || COALESCE(EXTRACT(EPOCH FROM MAX(updated_at) OVER w)::text, '') AS version
+        FROM events WHERE course_id = ANY(%s)
+        WINDOW w AS (PARTITION BY course_id)
+        ORDER BY course_id, date, id
+    """, (course_ids,))
+    # Courses without events keep the totals and version of an empty course
+    summaries = {course_id: (GradeTotals(), "0|") for course_id in course_ids}
+    for row in cur.fetchall():
+        totals, _ = summaries[row["course_id"]]
+        totals.apply(GradeItem.from_row(row))
+        summaries[row["course_id"]] = (totals, row["version"])
+    _store_summaries(cur, user_id, summaries)
+    return {course_id: totals for course_id, (totals, _) in summaries.items()}
+
+def get_course_totals(cur, course_id: int, user_id: str) -> GradeTotals:
+    """Stored totals when they match the course's events, otherwise a full recompute."""
+    version = course_events_version(cur, course_id)
+    row = _load_summary(cur, course_id)
+    if row and row["events_version"] == version:
+        return totals_from_summary(row)
+    return recompute_summary(cur, course_id, user_id, version)
+
+def apply_event_change(cur, course_id: int, user_id: str, old: GradeItem, new: GradeItem,
+                       version_before: str) -> GradeTotals:
+    """
+    Incremental update after one event changed from `old` to `new` (already written in this
+    transaction). Falls back to a full recompute if the stored summary was stale beforehand.
+    """
+    row = _load_summary(cur, course_id, lock=True)
+    version_after = course_events_version(cur, course_id)
+    if not row or row["events_version"] != version_before:
+        return recompute_summary(cur, course_id, user_id, version_after)
+    totals = totals_from_summary(row)
+    totals.replace(old, new)
+    _store_summary(cur, course_id, user_id, totals, version_after)
+    return totals
@@ -0,0 +1,191 @@
+# ics_feed.py - Streamed iCalendar (RFC 5545) export/subscription feed with a per-user cache
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+# Rows fetched per round trip from the server-side cursor while streaming
+FEED_FETCH_SIZE = 500
+# Feeds larger than this are streamed every time instead of being kept in memory
+MAX_CACHED_FEED_BYTES = 2 * 1024 * 1024
+MAX_CACHED_FEEDS = 256
+
+_FEED_SQL = """
+    SELECT e.id, e.name, e.description, e.start_time, e.end_time, e.updated_at, e.course_id,
+           c.title AS course_title
+    FROM events e
+    LEFT JOIN courses c ON c.id = e.course_id
+    WHERE e.user_id = %(user_id)s AND e.start_time IS NOT NULL
+      {course_filter}
+    ORDER BY e.start_time, e.id
+"""
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+# --- Subscription tokens (calendar apps cannot send an access token, so the URL carries an HMAC) ---
+
+def check_feed_config() -> None:
+    """Fail fast (at app startup) without a dedicated signing key; feed links never expire."""
+    if not os.getenv("CALENDAR_FEED_SECRET"):
+        raise RuntimeError("Set CALENDAR_FEED_SECRET to sign calendar feed links")
+
+def _feed_secret() -> bytes:
+    return os.environ["CALENDAR_FEED_SECRET"].encode("utf-8")
+
+def feed_token(user_id: str) -> str:
+    return hmac.new(_feed_secret(), str(user_id).encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+def valid_feed_token(user_id: str, token: str) -> bool:
+    return hmac.compare_digest(feed_token(user_id), token)
+
+# --- iCalendar formatting ---
+
+def _ics_datetime(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+def _ics_text(value: str) -> str:
+    """Escape a TEXT value (RFC 5545 3.3.11)."""
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n").replace("\r", "\\n"))
+
+def _fold(line: str) -> str:
+    """Fold content lines longer than 75 octets (RFC 5545 3.1)."""
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line + "\r\n"
+    parts = []
+    limit = 75
+    while raw:
+        cut = min(limit, len(raw))
+        while cut < len(raw) and (raw[cut] & 0xC0) == 0x80:  # don't split a UTF-8 sequence
+            cut -= 1
+        parts.append(raw[:cut].decode("utf-8"))
+        raw = raw[cut:]
+        limit = 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+def _vevent(row: Dict, dtstamp: str) -> str:
+    start = row["start_time"]
+    end = row["end_time"] or start
+    title = f"{row['course_title']}: {row['name']}" if row["course_title"] else row["name"]
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:studyplanner-{row['id']}@studyplanner",
+        f"DTSTAMP:{_ics_datetime(row['updated_at']) if row['updated_at'] else dtstamp}",
+        f"DTSTART:{_ics_datetime(start)}",
+        f"DTEND:{_ics_datetime(end)}",
+        f"SUMMARY:{_ics_text(title or 'Event')}",
+    ]
+    if row["description"]:
+        lines.append(f"DESCRIPTION:{_ics_text(row['description'])}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(l) for l in lines)
+
+def generate_ics(rows: Iterable[Dict], name: str = "Study Planner") -> Iterator[str]:
+    """Yield the feed one VEVENT at a time so memory stays flat for any number of events."""
+    dtstamp = _ics_datetime(datetime.now(timezone.utc))
+    refresh = f"PT{max(_env_int('CALENDAR_FEED_REFRESH_MINUTES', 60), 1)}M"
+    yield "".join(_fold(l) for l in [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Study Planner//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_ics_text(name)}",
+        f"REFRESH-INTERVAL;VALUE=DURATION:{refresh}",
+        f"X-PUBLISHED-TTL:{refresh}",
+    ])
+    for row in rows:
+        yield _vevent(row, dtstamp)
+    yield "END:VCALENDAR\r\n"
+
+def stream_feed_rows(conn, user_id: str, course_id: Optional[int] = None) -> Iterator[Dict]:
+    """Rows from a server-side (named) cursor, fetched FEED_FETCH_SIZE at a time."""
+    params = {"user_id": user_id}
+    course_filter = ""
+    if course_id is not None:
+        course_filter = "AND e.course_id = %(course_id)s"
+        params["course_id"] = course_id
+    with conn.cursor(name="ics_feed") as cur:
+        cur.itersize = FEED_FETCH_SIZE
+        cur.execute(_FEED_SQL.format(course_filter=course_filter), params)
+        for row in cur:
+            yield row
+
+# --- Cache: version lookups (short TTL) and rendered feeds (keyed on the version) ---
+
+class FeedCache:
+    """
+    Two layers so frequent polling rarely touches the database:
+    versions: (user_id) -> (expires_at, version); within CALENDAR_FEED_VERSION_TTL seconds a poll
+              is answered from memory (304 or cached body) without any query.
+    feeds:    (user_id, course_id) -> (version, body bytes), LRU-bounded; a changed version
+              means some event/course changed, so the body is rebuilt.
+    """
+    def __init__(self, max_feeds: int = MAX_CACHED_FEEDS):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, Tuple[float, str]] = {}
+        self._feeds: "OrderedDict[Tuple[str, Optional[int]], Tuple[str, bytes]]" = OrderedDict()
+        self._max_feeds = max_feeds
+
+    def get_version(self, user_id: str) -> Optional[str]:
+        with self._lock:
+            hit = self._versions.get(user_id)
+        if hit and hit[0] > time.monotonic():
+            return hit[1]
+        return None
+
+    def put_version(self, user_id: str, version: str) -> None:
+        ttl = _env_int("CALENDAR_FEED_VERSION_TTL", 60)
+        with self._lock:
+            self._versions[user_id] = (time.monotonic() + ttl, version)
+
+    def get_feed(self, user_id: str, course_id: Optional[int], version: str) -> Optional[bytes]:
+        key = (user_id, course_id)
+        with self._lock:
+            hit = self._feeds.get(key)
+            if not hit or hit[0] != version:
+                return None
+            self._feeds.move_to_end(key)
+            return hit[1]
+
+    def put_feed(self, user_id: str, course_id: Optional[int], version: str, body: bytes) -> None:
+        key = (user_id, course_id)
+        with self._lock:
+            self._feeds[key] = (version, body)
+            self._feeds.move_to_end(key)
+            while len(self._feeds) > self._max_feeds:
+                self._feeds.popitem(last=False)
+
+feed_cache = FeedCache()
+
+def tee_into_cache(chunks: Iterable[str], user_id: str, course_id: Optional[int], version: str,
+                   on_close=None) -> Iterator[bytes]:
+    """Stream encoded chunks; keep a copy for the cache unless the feed is too large to hold."""
+    kept = []
+    size = 0
+    complete = False
+    try:
+        for chunk in chunks:
+            data = chunk.encode("utf-8")
+            if kept is not None:
+                size += len(data)
+                if size <= MAX_CACHED_FEED_BYTES:
+                    kept.append(data)
+                else:
+                    kept = None
+            yield data
+        complete = True
+    finally:
+        if on_close:
+            on_close()
+    if complete and kept is not None:
+        feed_cache.put_feed(user_id, course_id, version, b"".join(kept))
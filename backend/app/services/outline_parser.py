@@ -1,8 +1,20 @@
+import json
+import logging
+import os
 import re
-from dataclasses import dataclass, asdict
+import sys
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, Dict, Tuple, Callable
-import pdfplumber
+from functools import lru_cache
+from itertools import chain
+from typing import List, Optional, Dict, Iterable, Iterator, Tuple, Callable
+
+from .pdf_probe import PROBE_PAGES, check_text_layer
+from .pdf_tables import extract_page_tables, table_profile
+
+logger = logging.getLogger(__name__)
 
 # -----------------------------
 # Patterns (tune over time)
@@ -61,21 +73,55 @@ WEIGHT_NEAR_RE = re.compile(
     re.IGNORECASE
 )
 
+# Lowercase keywords that mark a graded component (table cells, prompt filtering)
+CORE_COMPONENT_KEYWORDS = ("quiz", "exam", "midterm", "final", "project", "assignment", "lab", "participation", "attendance", "report")
+COMPONENT_KEYWORDS = CORE_COMPONENT_KEYWORDS + ("progress", "checks", "case", "proposal", "video", "lesson", "reflection", "team")
+
+class _Record:
+    """Base for parser records: fields live in __slots__ (no per-instance __dict__)."""
+    __slots__ = ()
+
+    def to_dict(self) -> Dict:
+        """Field values by name; shallow, unlike dataclasses.asdict which deep-copies every nested value."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    # Pickle by position instead of a {name: value} dict: results cross the extraction-pool pipe
+    def __getstate__(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: Tuple) -> None:
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+# Not frozen: a frozen __init__ goes through object.__setattr__ and roughly doubles construction time
 @dataclass
-class DueItem:
+class DueItem(_Record):
+    __slots__ = ("kind", "number", "due_date_raw", "due_time_raw", "page")
     kind: str
     number: str
     due_date_raw: str
     due_time_raw: str
     page: int
 
+    def __post_init__(self):
+        # A handful of kinds ("Assignment", "Lab") repeat across every outline in a batch
+        self.kind = sys.intern(self.kind)
+
 @dataclass
-class WeightItem:
+class WeightItem(_Record):
+    __slots__ = ("component", "weight", "page", "raw")
     component: str
     weight: float
     page: int
     raw: str
 
+    def __post_init__(self):
+        self.component = sys.intern(self.component)
+
 # Date pattern: "Jan 30, 2026", "Feb 24 2026", "March 15, 2024"
 DATE_RE = re.compile(r"[A-Za-z]{3,9}\s+\d{1,2},?\s*\d{4}")
 # Month names only - for multi-date extraction (avoids "Module 0", "Page 4" false positives)
@@ -85,6 +131,39 @@ DATE_OPTIONAL_YEAR_RE = re.compile(rf"\b{MONTHS}\s+\d{{1,2}}(?:,?\s*\d{{4}})?\b"
 
 NO_DATE_STR = "no date allocated"
 
+# Small static patterns used by the date/section helpers (compiled once here, not per call)
+YEAR_RE = re.compile(r"\d{4}")
+WEIGHT_MARK_RE = re.compile(r"\d+\s*%")  # "30%" right after a component: a grading table, not a date
+NO_DATE_CONTEXT_RE = re.compile(r"registrar\s+scheduled|tba|to\s+be\s+announced")  # matched on lowercased text
+SECTION_STOP_RE = re.compile(r"\n(?:Individual\s+Assignments|Team\s+Activities|Team\s+Grades)\b", re.IGNORECASE)
+OPEN_BETWEEN_RE = re.compile(r"open\s+between", re.IGNORECASE)
+# "Feb 2 and 4" -> Feb 2, Feb 4
+AND_DAY_RE = re.compile(rf"({MONTHS}\s+)(\d{{1,2}})\s+and\s+(\d{{1,2}})", re.IGNORECASE)
+SHORT_MONTH_RE = re.compile(r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\b", re.IGNORECASE)
+LONG_MONTHS = {"jan": "January", "feb": "February", "mar": "March", "apr": "April", "may": "May",
+               "jun": "June", "jul": "July", "aug": "August", "sep": "September", "oct": "October",
+               "nov": "November", "dec": "December"}
+WHITESPACE_RE = re.compile(r"\s+")
+ROMAN_TITLE_RE = re.compile(r"\b(?:Ii|Iii|Iv)\b")
+NEVER_MATCH_RE = re.compile(r"$^")
+NUMBERED_COMPONENT_RE = re.compile(r"^(?:Assignment\s*#\d+|#\d+\s+)", re.IGNORECASE)
+
+# -----------------------------
+# Pattern registry
+# -----------------------------
+# Patterns built from parsed text (component anchors, "between <date>") are compiled once per distinct
+# string here, so they neither recompile per call nor evict entries from re's shared module cache
+PATTERN_CACHE_SIZE = 256
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compiled_pattern(pattern: str, flags: int = 0) -> re.Pattern:
+    return re.compile(pattern, flags)
+
+def pattern_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters of this process's pattern registry."""
+    info = compiled_pattern.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+
 # Time range: "7:00-8:30pm", "7:00-8:30 PM", "11:59pm"
 TIME_RANGE_RE = re.compile(r"(\d{1,2}:\d{2})\s*[-–]\s*(\d{1,2}:\d{2})\s*([AP]M)?", re.IGNORECASE)
 TIME_SINGLE_RE = re.compile(r"(\d{1,2}:\d{2})\s*([AP]M)", re.IGNORECASE)
@@ -105,27 +184,47 @@ def find_time_for_component(component: str, text: str, window: int = 200) -> str
             return f"{ts.group(1)} {ts.group(2).upper()}"
     return ""
 
-@dataclass
-class ParseResult:
-    dues: List[DueItem]
-    weights: List[WeightItem]
-    total_weight: float
-    weight_ok: bool
-    warnings: List[str]
-    method: str
-    component_dates: Optional[Dict[str, str]] = None  # component -> date or NO_DATE_STR
-    component_multi_dates: Optional[Dict[str, List[str]]] = None  # component -> [date1, date2, ...] when multiple deadlines
-    component_multi_items: Optional[Dict[str, List[Tuple[str, str]]]] = None  # component -> [(label, date), ...] when we have "Label: Date" structure
-    component_times: Optional[Dict[str, str]] = None  # component -> time string (e.g. "7:00-8:30 PM")
+class ParseResult(_Record):
+    """One technique's output. Mutable: enrich_component_dates fills the component_* maps afterwards."""
+    __slots__ = ("dues", "weights", "total_weight", "weight_ok", "warnings", "method",
+                 "component_dates", "component_multi_dates", "component_multi_items", "component_times", "plan")
+
+    def __init__(self, dues: List[DueItem], weights: List[WeightItem], total_weight: float, weight_ok: bool,
+                 warnings: List[str], method: str,
+                 component_dates: Optional[Dict[str, str]] = None,
+                 component_multi_dates: Optional[Dict[str, List[str]]] = None,
+                 component_multi_items: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+                 component_times: Optional[Dict[str, str]] = None,
+                 plan: Optional[Dict] = None):
+        self.dues = dues
+        self.weights = weights
+        self.total_weight = total_weight
+        self.weight_ok = weight_ok
+        self.warnings = warnings
+        self.method = method
+        self.component_dates = component_dates  # component -> date or NO_DATE_STR
+        self.component_multi_dates = component_multi_dates  # component -> [date1, date2, ...] when multiple deadlines
+        self.component_multi_items = component_multi_items  # component -> [(label, date), ...] when we have "Label: Date" structure
+        self.component_times = component_times  # component -> time string (e.g. "7:00-8:30 PM")
+        self.plan = plan  # techniques tried, in order, with estimated/actual ms (set by _run_techniques)
+
+    def to_dict(self) -> Dict:
+        """JSON-ready dict (dues/weights as dicts); the component_* maps are shared, not copied."""
+        d = super().to_dict()
+        d["dues"] = [x.to_dict() for x in self.dues]
+        d["weights"] = [x.to_dict() for x in self.weights]
+        return d
 
 # -----------------------------
 # PDF extraction (grab entire PDF first)
 # -----------------------------
 
 def extract_full_pdf(pdf_path: str) -> Tuple[str, List[str]]:
-    """Extract full PDF content. Returns (full_text, pages_text)."""
+    """Extract full PDF content. Returns (full_text, pages_text). Raises ScannedPdfError for scans (no text layer)."""
     pages_text: List[str] = []
+    import pdfplumber  # lazy: only PDF parsing pays for it
     with pdfplumber.open(pdf_path) as pdf:
+        check_text_layer(pdf.pages[:PROBE_PAGES])
         for p in pdf.pages:
             pages_text.append(p.extract_text() or "")
     full_text = "\n".join(pages_text)
@@ -136,24 +235,20 @@ def extract_full_pdf(pdf_path: str) -> Tuple[str, List[str]]:
 # -----------------------------
 
 def normalize_component(name: str) -> str:
-    n = re.sub(r"\s+", " ", name.strip(), flags=re.IGNORECASE)
+    n = WHITESPACE_RE.sub(" ", name.strip())
     n = n.replace("Exam", "Exam").title()
     # Preserve Roman numerals (II, III, IV, etc.) - title() turns "II" into "Ii"
-    n = re.sub(r"\bIi\b", "II", n)
-    n = re.sub(r"\bIii\b", "III", n)
-    n = re.sub(r"\bIv\b", "IV", n)
-    return n
+    return ROMAN_TITLE_RE.sub(lambda m: m.group(0).upper(), n)
 
 def _search_pattern_for_component(component: str) -> re.Pattern:
     """Build flexible regex to find component in text. Handles Quiz/Quiz 1, Final Exam, Assignments, etc."""
-    comp = re.sub(r"\s+", " ", component.strip())
     # Use first significant word as anchor; allow optional number (Quiz 1, Midterm 2)
-    parts = [p for p in comp.split() if not p.isdigit()]
+    parts = [p for p in component.split() if not p.isdigit()]
     if not parts:
-        return re.compile(r"$^")
+        return NEVER_MATCH_RE
     # Match "Quiz" or "Quiz 1", "Final" or "Final Exam", "Assignment" or "Assignments"
     first = re.escape(parts[0])
-    return re.compile(rf"\b{first}\w*(?:\s+\d+)?\b", re.IGNORECASE)
+    return compiled_pattern(rf"\b{first}\w*(?:\s+\d+)?\b", re.IGNORECASE)
 
 def find_date_for_component(component: str, text: str, window: int = 150) -> str:
     """
@@ -168,10 +263,10 @@ def find_date_for_component(component: str, text: str, window: int = 150) -> str
         after = section[m.end() : m.end() + window]
         after_lower = after.lower()
         # No date if explicitly says Registrar scheduled, TBA, etc.
-        if re.search(r"registrar\s+scheduled|tba|to\s+be\s+announced|date\s+tba", after_lower):
+        if NO_DATE_CONTEXT_RE.search(after_lower):
             return NO_DATE_STR  # explicit no-date
         # If 'after' looks like grading table (weight %), don't use 'before' - date could be wrong component
-        if re.search(r"\d+\s*%", after[:60]):
+        if WEIGHT_MARK_RE.search(after[:60]):
             before = ""
         else:
             before = section[max(0, m.start() - window) : m.start()]
@@ -181,7 +276,7 @@ def find_date_for_component(component: str, text: str, window: int = 150) -> str
             date_m = DATE_RE.search(snippet) or DATE_OPTIONAL_YEAR_RE.search(snippet)
             if date_m:
                 date_str = date_m.group(0).strip()
-                if not re.search(r"\d{4}", date_str):
+                if not YEAR_RE.search(date_str):
                     date_str = date_str + ", 2026"
                 ctx = snippet[: date_m.start() + 80].lower()
                 if "scheduled" in ctx or "due" in ctx or "date" in ctx:
@@ -195,16 +290,12 @@ def find_date_for_component(component: str, text: str, window: int = 150) -> str
 def _normalize_date_for_dedup(d: str) -> str:
     """Normalize 'Jan 22, 2026' and 'January 22, 2026' to same form for deduplication."""
     d = d.strip()
-    if not re.search(r"\d{4}", d):
+    if not YEAR_RE.search(d):
         d = d + ", 2026"
     # Expand short months for consistent dedup
-    months = {"jan": "January", "feb": "February", "mar": "March", "apr": "April", "may": "May",
-              "jun": "June", "jul": "July", "aug": "August", "sep": "September", "oct": "October",
-              "nov": "November", "dec": "December"}
-    for short, long in months.items():
-        if re.match(rf"\b{short}\b", d, re.I):
-            d = re.sub(rf"\b{short}\b", long, d, count=1, flags=re.I)
-            break
+    m = SHORT_MONTH_RE.match(d)
+    if m:
+        d = LONG_MONTHS[m.group(1).lower()] + d[m.end():]
     return d
 
 # "Label: Date" pattern - e.g. "Intro quiz: January 22", "Module 0: January 22"
@@ -218,6 +309,8 @@ LABEL_DATE_RE = re.compile(
 FINAL_PROJECT_PROPOSAL_RE = re.compile(r"proposal\s+will\s+be\s+due.{0,60}?(" + MONTHS + r"\s+\d{1,2}(?:,?\s*\d{4})?)", re.IGNORECASE)
 FINAL_PROJECT_DEMO_RE = re.compile(r"demo\b.{0,120}?(" + MONTHS + r"\s+\d{1,2}(?:,?\s*\d{4})?)\s*\(L(\d+)\)", re.IGNORECASE)
 FINAL_PROJECT_REPORT_RE = re.compile(r"report\s+will\s+be\s+due.{0,60}?(" + MONTHS + r"\s+\d{1,2}(?:,?\s*\d{4})?)", re.IGNORECASE)
+# "April 10 (L01)" - a demo date for one lab section
+DEMO_DATE_LAB_RE = re.compile(rf"({MONTHS}\s+\d{{1,2}}(?:,?\s*\d{{4}})?)\s*\(L(\d+)\)", re.IGNORECASE)
 
 def find_multi_items_final_project(text: str) -> List[Tuple[str, str]]:
     """
@@ -230,7 +323,7 @@ def find_multi_items_final_project(text: str) -> List[Tuple[str, str]]:
     # Proposal
     for m in FINAL_PROJECT_PROPOSAL_RE.finditer(section):
         d = m.group(1).strip()
-        if not re.search(r"\d{4}", d):
+        if not YEAR_RE.search(d):
             d = d + ", 2026"
         key = ("Proposal", d)
         if key not in seen:
@@ -240,19 +333,18 @@ def find_multi_items_final_project(text: str) -> List[Tuple[str, str]]:
     for m in FINAL_PROJECT_DEMO_RE.finditer(section):
         d = m.group(1).strip()
         lab = m.group(2).strip()
-        if not re.search(r"\d{4}", d):
+        if not YEAR_RE.search(d):
             d = d + ", 2026"
         key = (f"Demo (L{lab})", d)
         if key not in seen:
             seen.add(key)
             items.append((f"Demo (L{lab})", d))
     # Also find "April 10 (L01)" when "or Friday, April 10 (L01)" appears after first demo match
-    demo_date_lab_re = re.compile(rf"({MONTHS}\s+\d{{1,2}}(?:,?\s*\d{{4}})?)\s*\(L(\d+)\)", re.IGNORECASE)
-    for m in demo_date_lab_re.finditer(section):
+    for m in DEMO_DATE_LAB_RE.finditer(section):
         if "demo" in section[max(0, m.start() - 150) : m.start()].lower():
             d = m.group(1).strip()
             lab = m.group(2).strip()
-            if not re.search(r"\d{4}", d):
+            if not YEAR_RE.search(d):
                 d = d + ", 2026"
             key = (f"Demo (L{lab})", d)
             if key not in seen:
@@ -261,7 +353,7 @@ def find_multi_items_final_project(text: str) -> List[Tuple[str, str]]:
     # Report
     for m in FINAL_PROJECT_REPORT_RE.finditer(section):
         d = m.group(1).strip()
-        if not re.search(r"\d{4}", d):
+        if not YEAR_RE.search(d):
             d = d + ", 2026"
         key = ("Report", d)
         if key not in seen:
@@ -279,11 +371,11 @@ def find_multi_items_label_date(component: str, text: str, window: int = 500) ->
     seen: set[Tuple[str, str]] = set()
     for m in pat.finditer(text):
         snippet = text[m.end() : m.end() + window]
-        if re.search(r"registrar\s+scheduled|tba|to\s+be\s+announced", snippet.lower()):
+        if NO_DATE_CONTEXT_RE.search(snippet.lower()):
             continue
-        if re.search(r"\d+\s*%", snippet[:80]):
+        if WEIGHT_MARK_RE.search(snippet[:80]):
             continue
-        stop = re.search(r"\n(?:Individual\s+Assignments|Team\s+Activities|Team\s+Grades)\b", snippet, re.I)
+        stop = SECTION_STOP_RE.search(snippet)
         if stop:
             snippet = snippet[: stop.start()]
         for line in snippet.split("\n"):
@@ -294,7 +386,7 @@ def find_multi_items_label_date(component: str, text: str, window: int = 500) ->
             if lm:
                 label = lm.group(1).strip()
                 date_str = lm.group(2).strip()
-                if not re.search(r"\d{4}", date_str):
+                if not YEAR_RE.search(date_str):
                     date_str = date_str + ", 2026"
                 key = (label.lower(), date_str)
                 if key not in seen:
@@ -312,6 +404,25 @@ _SECTION_BOUNDARIES = re.compile(
     re.IGNORECASE
 )
 
+# Section anchors per component family, tried in order ("The X" before a bare mention)
+def _anchors(*patterns: str) -> Tuple[re.Pattern, ...]:
+    return tuple(re.compile(p, re.IGNORECASE) for p in patterns)
+
+FINAL_EXAM_ANCHORS = _anchors(r"\bthe\s+final\s+exam\b", r"\bfinal\s+exam\b")
+FINAL_PROJECT_ANCHORS = _anchors(r"\bthe\s+final\s+project\b", r"\bfinal\s+project\b")
+MIDTERM_II_ANCHORS = _anchors(r"\bmidterm\s+test\s+ii\b", r"\bmidterm\s+ii\b")
+MIDTERM_ANCHORS = _anchors(r"\bthe\s+midterm\b", r"\bmidterm\s+test\s+i\b", r"\bmidterm\b")
+QUIZ_ANCHORS = _anchors(r"\b\d+\s+quizzes?\s+held\b", r"\bquizzes?\b")
+LAB_ASSIGNMENT_ANCHORS = _anchors(r"\b(?:individual\s+)?lab\s+assignments?\b", r"\blab\s+assignments?\b")
+ASSIGNMENT_ANCHORS = _anchors(r"\bthe\s+assignments\b", r"\bdue\s+date\s+for\s+each\s+assignment\b", r"\bassignments?\b")
+
+def _first_search(patterns: Tuple[re.Pattern, ...], text: str) -> Optional[re.Match]:
+    for pat in patterns:
+        m = pat.search(text)
+        if m:
+            return m
+    return None
+
 def _get_section_for_component(text: str, component: str, max_chars: int = 800) -> str:
     """
     Get the text section that discusses this component. Stops at the next section boundary
@@ -322,40 +433,19 @@ def _get_section_for_component(text: str, component: str, max_chars: int = 800)
     # Use more specific patterns; prefer "The X" to skip intro mentions like "one final project"
     if "final exam" in comp_lower or comp_lower == "final exam":
         # Prefer "The final exam" (paragraph start)
-        m = re.search(r"\bthe\s+final\s+exam\b", text, re.IGNORECASE)
-        if not m:
-            m = re.search(r"\bfinal\s+exam\b", text, re.IGNORECASE)
+        m = _first_search(FINAL_EXAM_ANCHORS, text)
     elif "final project" in comp_lower or (comp_lower == "project" and "final" in text.lower()[:500]):
-        m = re.search(r"\bthe\s+final\s+project\b", text, re.IGNORECASE)
-        if not m:
-            m = re.search(r"\bfinal\s+project\b", text, re.IGNORECASE)
+        m = _first_search(FINAL_PROJECT_ANCHORS, text)
     elif "midterm" in comp_lower:
-        m = None
         # Prefer "Midterm Test II" for Midterm II, "Midterm Test I" for Midterm I
-        if "ii" in comp_lower or "2" in comp_lower:
-            m = re.search(r"\bmidterm\s+test\s+ii\b", text, re.IGNORECASE)
-            if not m:
-                m = re.search(r"\bmidterm\s+ii\b", text, re.IGNORECASE)
-        if not m:
-            m = re.search(r"\bthe\s+midterm\b", text, re.IGNORECASE)
-        if not m:
-            m = re.search(r"\bmidterm\s+test\s+i\b", text, re.IGNORECASE)
-        if not m:
-            m = re.search(r"\bmidterm\b", text, re.IGNORECASE)
+        second = "ii" in comp_lower or "2" in comp_lower
+        m = _first_search(MIDTERM_II_ANCHORS + MIDTERM_ANCHORS if second else MIDTERM_ANCHORS, text)
     elif "quiz" in comp_lower:
-        m = re.search(r"\b\d+\s+quizzes?\s+held\b", text, re.IGNORECASE)
-        if not m:
-            m = re.search(r"\bquizzes?\b", text, re.IGNORECASE)
+        m = _first_search(QUIZ_ANCHORS, text)
     elif "lab" in comp_lower and "assignment" in comp_lower:
-        m = re.search(r"\b(?:individual\s+)?lab\s+assignments?\b", text, re.IGNORECASE)
-        if not m:
-            m = re.search(r"\blab\s+assignments?\b", text, re.IGNORECASE)
+        m = _first_search(LAB_ASSIGNMENT_ANCHORS, text)
     elif "assignment" in comp_lower:
-        m = re.search(r"\bthe\s+assignments\b", text, re.IGNORECASE)
-        if not m:
-            m = re.search(r"\bdue\s+date\s+for\s+each\s+assignment\b", text, re.IGNORECASE)
-        if not m:
-            m = re.search(r"\bassignments?\b", text, re.IGNORECASE)
+        m = _first_search(ASSIGNMENT_ANCHORS, text)
     else:
         pat = _search_pattern_for_component(component)
         m = pat.search(text)
@@ -381,30 +471,30 @@ def find_multi_dates_for_component(component: str, text: str, window: int = 400)
     seen_norm: set[str] = set()
     for m in pat.finditer(section):
         snippet = section[m.end() : m.end() + window]
-        if re.search(r"registrar\s+scheduled|tba|to\s+be\s+announced", snippet.lower()):
+        if NO_DATE_CONTEXT_RE.search(snippet.lower()):
             continue
-        if re.search(r"\d+\s*%", snippet[:80]):
+        if WEIGHT_MARK_RE.search(snippet[:80]):
             continue
-        stop = re.search(r"\n(?:Individual\s+Assignments|Team\s+Activities|Team\s+Grades)\b", snippet, re.I)
+        stop = SECTION_STOP_RE.search(snippet)
         if stop:
             snippet = snippet[: stop.start()]
         for date_m in DATE_OPTIONAL_YEAR_RE.finditer(snippet):
             d = date_m.group(0).strip()
-            if not re.search(r"\d{4}", d):
+            if not YEAR_RE.search(d):
                 d = d + ", 2026"
-            if re.search(r"between\s+" + re.escape(d), snippet, re.I) or re.search(r"open\s+between", snippet[:date_m.start() + 50], re.I):
+            if (compiled_pattern(r"between\s+" + re.escape(d), re.IGNORECASE).search(snippet)
+                    or OPEN_BETWEEN_RE.search(snippet[:date_m.start() + 50])):
                 continue
             norm = _normalize_date_for_dedup(d)
             if norm not in seen_norm:
                 seen_norm.add(norm)
                 all_dates.append(d)
         # Expand "Feb 2 and 4" -> Feb 2, Feb 4 (day-only after "and")
-        and_day_re = re.compile(rf"({MONTHS}\s+)(\d{{1,2}})\s+and\s+(\d{{1,2}})", re.IGNORECASE)
-        for am in and_day_re.finditer(snippet):
+        for am in AND_DAY_RE.finditer(snippet):
             month_part, day1, day2 = am.group(1), am.group(2), am.group(3)
             for day in (day1, day2):
                 d = f"{month_part}{day}".strip()
-                if not re.search(r"\d{4}", d):
+                if not YEAR_RE.search(d):
                     d = d + ", 2026"
                 norm = _normalize_date_for_dedup(d)
                 if norm not in seen_norm:
@@ -432,7 +522,7 @@ def enrich_component_dates(result: ParseResult, full_text: str) -> None:
         if single != NO_DATE_STR:
             dates[comp] = single
         else:
-            if not re.match(r"^(?:Assignment\s*#\d+|#\d+\s+)", comp, re.I):
+            if not NUMBERED_COMPONENT_RE.match(comp):
                 # Try Final Project structure (Proposal, Demo L02, Demo L01, Report)
                 if "project" in comp.lower() and "final" in comp.lower():
                     label_items = find_multi_items_final_project(full_text)
@@ -467,6 +557,9 @@ def enrich_component_dates(result: ParseResult, full_text: str) -> None:
 
 DEFAULT_TIME = "11:59 PM"
 
+COMPONENT_NUMBER_RE = re.compile(r"#?(\d+)")  # "Assignment #1" -> 1, "#1 Case Proposal" -> 1
+HASH_PREFIX_RE = re.compile(r"^#\d+\s+")
+
 def _parse_date_for_sort(s: str) -> Tuple[int, int, int]:
     """Parse date string to (year, month, day) for sorting. Returns (9999, 12, 31) for invalid/TBD."""
     if not s or s == NO_DATE_STR or s.upper() == "TBD":
@@ -518,7 +611,7 @@ def build_unified_items(result: ParseResult) -> List[dict]:
         raw = wi.raw
 
         # Extract number from component (e.g. "Assignment #1" -> 1, "#1 Case Proposal" -> 1)
-        num_match = re.search(r"#?(\d+)", comp)
+        num_match = COMPONENT_NUMBER_RE.search(comp)
         comp_num = num_match.group(1) if num_match else None
 
         # Find matching dues (Assignment 1,2,3... or Lab 1,2...)
@@ -536,7 +629,7 @@ def build_unified_items(result: ParseResult) -> List[dict]:
                 if n == 1:
                     comp_name = comp
                     if comp.startswith("#") and ("case" in d.kind.lower() or "video" in d.kind.lower() or "reflection" in d.kind.lower()):
-                        comp_name = "Team " + re.sub(r"^#\d+\s+", "", comp)
+                        comp_name = "Team " + HASH_PREFIX_RE.sub("", comp)
                 else:
                     comp_name = f"{d.kind} #{d.number} ({d.number}/{n})"
                 items.append({
@@ -618,7 +711,7 @@ def build_unified_items(result: ParseResult) -> List[dict]:
 
     return items
 
-def dedupe_weights(weights: List[WeightItem]) -> List[WeightItem]:
+def dedupe_weights(weights: Iterable[WeightItem]) -> List[WeightItem]:
     """Remove exact (component, weight) duplicates."""
     seen: set[Tuple[str, float]] = set()
     out: List[WeightItem] = []
@@ -629,9 +722,9 @@ def dedupe_weights(weights: List[WeightItem]) -> List[WeightItem]:
             out.append(wi)
     return out
 
-def merge_weights_by_component(weight_lists: List[List[WeightItem]]) -> List[WeightItem]:
-    """Merge weights from multiple techniques. Same component -> keep best."""
-    by_comp: Dict[str, WeightItem] = {}
+def merge_weights_by_component(weights: Iterable[WeightItem]) -> List[WeightItem]:
+    """Merge weights from multiple techniques (consumed lazily). Same component -> keep best."""
+    by_comp: Dict[str, Tuple[int, WeightItem]] = {}
 
     def score_item(item: WeightItem) -> int:
         """Higher = more reliable. Prefer '68% Quiz 1' over 'Quiz 1 (60%)'."""
@@ -641,17 +734,16 @@ def merge_weights_by_component(weight_lists: List[List[WeightItem]]) -> List[Wei
         if w_str in r and "%" in r:
             score += 1
         # Prefer "X% Component" (weight first) - usually clearer
-        if re.match(rf"^\s*{re.escape(w_str)}\s*%", r):
+        if r.startswith(w_str) and r[len(w_str):].lstrip().startswith("%"):
             score += 2
         return score
 
-    for wi in (w for lst in weight_lists for w in lst):
+    for wi in weights:
         key = wi.component.lower()
-        if key not in by_comp:
-            by_comp[key] = wi
-        elif score_item(wi) > score_item(by_comp[key]):
-            by_comp[key] = wi
-    return list(by_comp.values())
+        score = score_item(wi)
+        if key not in by_comp or score > by_comp[key][0]:
+            by_comp[key] = (score, wi)
+    return [wi for _, wi in by_comp.values()]
 
 def validate_total(weights: List[WeightItem], tol: float = 1.5) -> Tuple[float, bool]:
     """Check if weights sum to 100%. tol=1.5 allows for rounding in PDFs."""
@@ -685,14 +777,12 @@ def _parse_dues_strict(pages_text: List[str]) -> List[DueItem]:
             dues.append(DueItem(kind=kind.title(), number=num, due_date_raw=date_raw, due_time_raw=time_raw, page=i + 1))
     return dues
 
-def _parse_weights_strict(pages_text: List[str]) -> List[WeightItem]:
-    weights: List[WeightItem] = []
+def _parse_weights_strict(pages_text: List[str]) -> Iterator[WeightItem]:
     for i, txt in enumerate(pages_text):
         for m in WEIGHT_RE.finditer(txt):
             comp = normalize_component(m.group(1))
             w = float(m.group(2))
-            weights.append(WeightItem(component=comp, weight=w, page=i + 1, raw=m.group(0).strip()))
-    return weights
+            yield WeightItem(component=comp, weight=w, page=i + 1, raw=m.group(0).strip())
 
 def technique_1_strict_regex(pdf_path: str, full_text: str, pages_text: List[str]) -> ParseResult:
     dues = _parse_dues_strict(pages_text)
@@ -730,7 +820,7 @@ def _parse_dues_assignment_list(pages_text: List[str]) -> List[DueItem]:
         # Limit to first 10 dates (avoid grabbing dates from next section)
         dates = list(dict.fromkeys(dates))[:10]
         for i, d in enumerate(dates):
-            if not re.search(r"\d{4}", d):
+            if not YEAR_RE.search(d):
                 d = d + ", 2026"
             page = 1
             for pi, pt in enumerate(pages_text):
@@ -768,7 +858,7 @@ def _parse_dues_hash(pages_text: List[str]) -> List[DueItem]:
             if not kind or not num or not date_raw:
                 continue
             # Add year if missing (e.g. "January 29" -> "January 29, 2026")
-            if not re.search(r"\d{4}", date_raw):
+            if not YEAR_RE.search(date_raw):
                 date_raw = date_raw + ", 2026"
             key = (kind.lower(), num, date_raw)
             if key not in seen:
@@ -819,17 +909,19 @@ def _parse_dues_loose(pages_text: List[str]) -> List[DueItem]:
             dues.append(d)
     return dues
 
+NO_QUIZ_RE = re.compile(r"\bno\b.{0,30}(?:timed[- ]?)?quiz")
+NO_EXAM_RE = re.compile(r"\bno\b.{0,30}exam")
+
 def _reject_false_positive_weight(raw: str, comp: str) -> bool:
     """Reject matches like '40%). There will be no timed-quizzes' - 'no' negates the component."""
     r = raw.lower()
-    if "quiz" in comp.lower() and re.search(r"\bno\b.{0,30}(?:timed[- ]?)?quiz", r):
+    if "quiz" in comp.lower() and NO_QUIZ_RE.search(r):
         return True
-    if "exam" in comp.lower() and re.search(r"\bno\b.{0,30}exam", r):
+    if "exam" in comp.lower() and NO_EXAM_RE.search(r):
         return True
     return False
 
-def _parse_weights_loose(pages_text: List[str]) -> List[WeightItem]:
-    weights: List[WeightItem] = []
+def _parse_weights_loose(pages_text: List[str]) -> Iterator[WeightItem]:
     for i, txt in enumerate(pages_text):
         for m in WEIGHT_LOOSE_RE.finditer(txt):
             if m.group(1):  # % first: "30% - Assignments"
@@ -839,12 +931,10 @@ def _parse_weights_loose(pages_text: List[str]) -> List[WeightItem]:
                 comp = normalize_component(m.group(3) or "")
                 w = float(m.group(4) or "0")
             if comp and 0 < w <= 100 and not _reject_false_positive_weight(m.group(0).strip(), comp):
-                weights.append(WeightItem(component=comp, weight=w, page=i + 1, raw=m.group(0).strip()))
-    return weights
+                yield WeightItem(component=comp, weight=w, page=i + 1, raw=m.group(0).strip())
 
-def _parse_weights_near(pages_text: List[str]) -> List[WeightItem]:
+def _parse_weights_near(pages_text: List[str]) -> Iterator[WeightItem]:
     """Catch X% within 50 chars of component keywords (odd layouts)."""
-    weights: List[WeightItem] = []
     comp_map = {"assignments": "Assignments", "assignment": "Assignment", "labs": "Labs", "lab": "Lab",
                 "quiz": "Quiz", "quizzes": "Quizzes", "midterm": "Midterm", "final exam": "Final Exam",
                 "project": "Project", "participation": "Participation", "attendance": "Attendance", "reports": "Reports",
@@ -861,8 +951,7 @@ def _parse_weights_near(pages_text: List[str]) -> List[WeightItem]:
                     comp = v
                     break
             if comp and 0 < w <= 100 and not _reject_false_positive_weight(raw_str, comp):
-                weights.append(WeightItem(component=comp, weight=w, page=i + 1, raw=raw_str))
-    return weights
+                yield WeightItem(component=comp, weight=w, page=i + 1, raw=raw_str)
 
 def technique_2_loose_regex(pdf_path: str, full_text: str, pages_text: List[str]) -> ParseResult:
     dues = _parse_dues_loose(pages_text)
@@ -888,55 +977,77 @@ def technique_2_loose_regex(pdf_path: str, full_text: str, pages_text: List[str]
 # Technique 3: Table extraction
 # -----------------------------
 
+CELL_WEIGHT_RE = re.compile(r"(\d{1,3}(?:\.\d+)?)\s*%")
+# "Midterm (30%)" or "30% - Midterm" inside one cell
+CELL_COMPONENT_WEIGHT_RE = re.compile(
+    r"\b(Quiz(?:\s*\d+)?|Final\s*Exam|Midterm(?:\s*\d+)?|Project|Assignments?|Labs?|Participation|Attendance|Reports?)\s*[\(\[]?\s*(\d{1,3}(?:\.\d+)?)\s*%\s*[\)\]]?|(\d{1,3}(?:\.\d+)?)\s*%\s*(?:[-–—]\s*)?(Quiz(?:\s*\d+)?|Final\s*Exam|Midterm(?:\s*\d+)?|Project|Assignments?|Labs?|Participation|Attendance|Reports?)\b",
+    re.IGNORECASE
+)
+CELL_KEYWORD_RE = re.compile(r"(?:quiz|exam|midterm|final|project|assignment|lab|participation|attendance|report)", re.IGNORECASE)
+CELL_PERCENT_RE = re.compile(r"\b(\d{1,3}(?:\.\d+)?)\s*%\b")
+
+# Tables of the last few PDFs: the structured pass, the cell fallback and technique 4 all read the same
+# tables, so one parse of an outline opens the PDF for tables once instead of up to four times
+PDF_TABLES_CACHE_SIZE = 4
+
+@lru_cache(maxsize=PDF_TABLES_CACHE_SIZE)
+def _extract_pdf_tables(pdf_path: str, size: int, mtime_ns: int, profile: str) -> Tuple[Tuple[int, list], ...]:
+    import pdfplumber  # lazy: only PDF parsing pays for it
+    with pdfplumber.open(pdf_path) as pdf:
+        return tuple((page_num, table) for page_num, page in enumerate(pdf.pages)
+                     for table in extract_page_tables(page, profile))
+
+def pdf_tables(pdf_path: str) -> Tuple[Tuple[int, list], ...]:
+    """(page index, table) for every table in the PDF under this deployment's PDF_TABLE_PROFILE."""
+    st = os.stat(pdf_path)  # size/mtime in the key: upload temp paths get reused
+    return _extract_pdf_tables(pdf_path, st.st_size, st.st_mtime_ns, table_profile())
+
 def _parse_weights_from_structured_tables(pdf_path: str) -> List[WeightItem]:
     """Parse tables with 'Component' and 'Weight' columns (e.g. grading scheme tables)."""
     weights: List[WeightItem] = []
-    component_keywords = ("quiz", "exam", "midterm", "final", "project", "assignment", "lab", "participation", "attendance", "report", "progress", "checks", "case", "proposal", "video", "lesson", "reflection", "team")
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages):
-            tables = page.extract_tables()
-            for table in tables or []:
-                rows = [r for r in (table or []) if r]
-                if len(rows) < 2:
-                    continue
-                header = [str(c or "").lower().strip() for c in rows[0]]
-                # Find weight column (has "weight" or "%" in header, or last column with %)
-                weight_col = -1
-                comp_col = 0
-                for i, h in enumerate(header):
-                    if "weight" in h or "%" in h:
+    component_keywords = COMPONENT_KEYWORDS
+    for page_num, table in pdf_tables(pdf_path):
+        rows = [r for r in (table or []) if r]
+        if len(rows) < 2:
+            continue
+        header = [str(c or "").lower().strip() for c in rows[0]]
+        # Find weight column (has "weight" or "%" in header, or last column with %)
+        weight_col = -1
+        comp_col = 0
+        for i, h in enumerate(header):
+            if "weight" in h or "%" in h:
+                weight_col = i
+                break
+        if weight_col < 0:
+            # No explicit weight header - find column with % values
+            for row in rows[1:]:
+                for i, cell in enumerate(row or []):
+                    if WEIGHT_MARK_RE.search(str(cell or "")):
                         weight_col = i
                         break
-                if weight_col < 0:
-                    # No explicit weight header - find column with % values
-                    for row in rows[1:]:
-                        for i, cell in enumerate(row or []):
-                            if re.search(r"\d+\s*%", str(cell or "")):
-                                weight_col = i
-                                break
-                        if weight_col >= 0:
-                            break
-                if weight_col < 0:
-                    continue
-                # Parse data rows
-                for row in rows[1:]:
-                    cells = [str(c or "").strip() for c in (row or [])]
-                    if len(cells) <= max(comp_col, weight_col):
-                        continue
-                    comp_cell = cells[comp_col]
-                    weight_cell = cells[weight_col] if weight_col < len(cells) else ""
-                    if not comp_cell or not any(kw in comp_cell.lower() for kw in component_keywords):
-                        continue
-                    m = re.search(r"(\d{1,3}(?:\.\d+)?)\s*%", weight_cell)
-                    if m:
-                        w = float(m.group(1))
-                        if 0 < w <= 100:
-                            weights.append(WeightItem(
-                                component=normalize_component(comp_cell),
-                                weight=w,
-                                page=page_num + 1,
-                                raw=f"{comp_cell} {weight_cell}"[:80]
-                            ))
+                if weight_col >= 0:
+                    break
+        if weight_col < 0:
+            continue
+        # Parse data rows
+        for row in rows[1:]:
+            cells = [str(c or "").strip() for c in (row or [])]
+            if len(cells) <= max(comp_col, weight_col):
+                continue
+            comp_cell = cells[comp_col]
+            weight_cell = cells[weight_col] if weight_col < len(cells) else ""
+            if not comp_cell or not any(kw in comp_cell.lower() for kw in component_keywords):
+                continue
+            m = CELL_WEIGHT_RE.search(weight_cell)
+            if m:
+                w = float(m.group(1))
+                if 0 < w <= 100:
+                    weights.append(WeightItem(
+                        component=normalize_component(comp_cell),
+                        weight=w,
+                        page=page_num + 1,
+                        raw=f"{comp_cell} {weight_cell}"[:80]
+                    ))
     return weights
 
 def _parse_weights_from_tables(pdf_path: str) -> List[WeightItem]:
@@ -945,35 +1056,28 @@ def _parse_weights_from_tables(pdf_path: str) -> List[WeightItem]:
     if weights:
         return weights
     # Fallback: scan cells for "Component X%" or "X% Component"
-    component_keywords = ("quiz", "exam", "midterm", "final", "project", "assignment", "lab", "participation", "attendance", "report")
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages):
-            tables = page.extract_tables()
-            for table in tables or []:
-                for row in table or []:
-                    row_cells = [str(c or "").strip() for c in (row or [])]
-                    for cell_str in row_cells:
-                        for m in re.finditer(
-                            r"\b(Quiz(?:\s*\d+)?|Final\s*Exam|Midterm(?:\s*\d+)?|Project|Assignments?|Labs?|Participation|Attendance|Reports?)\s*[\(\[]?\s*(\d{1,3}(?:\.\d+)?)\s*%\s*[\)\]]?|(\d{1,3}(?:\.\d+)?)\s*%\s*(?:[-–—]\s*)?(Quiz(?:\s*\d+)?|Final\s*Exam|Midterm(?:\s*\d+)?|Project|Assignments?|Labs?|Participation|Attendance|Reports?)\b",
-                            cell_str,
-                            re.IGNORECASE
-                        ):
-                            if m.group(1):
-                                comp, w = normalize_component(m.group(1)), float(m.group(2))
-                            else:
-                                w, comp = float(m.group(3)), normalize_component(m.group(4) or "")
-                            if comp and 0 < w <= 100:
-                                weights.append(WeightItem(component=comp, weight=w, page=page_num + 1, raw=cell_str[:80]))
-                        if not re.search(r"(?:quiz|exam|midterm|final|project|assignment|lab|participation|attendance|report)", cell_str, re.I):
-                            for m in re.finditer(r"\b(\d{1,3}(?:\.\d+)?)\s*%\b", cell_str):
-                                w = float(m.group(1))
-                                if 0 < w <= 100:
-                                    comp = "Component"
-                                    for neighbor in row_cells:
-                                        if neighbor != cell_str and any(kw in neighbor.lower() for kw in component_keywords):
-                                            comp = normalize_component(neighbor)
-                                            break
-                                    weights.append(WeightItem(component=comp, weight=w, page=page_num + 1, raw=cell_str[:80]))
+    component_keywords = CORE_COMPONENT_KEYWORDS
+    for page_num, table in pdf_tables(pdf_path):
+        for row in table or []:
+            row_cells = [str(c or "").strip() for c in (row or [])]
+            for cell_str in row_cells:
+                for m in CELL_COMPONENT_WEIGHT_RE.finditer(cell_str):
+                    if m.group(1):
+                        comp, w = normalize_component(m.group(1)), float(m.group(2))
+                    else:
+                        w, comp = float(m.group(3)), normalize_component(m.group(4) or "")
+                    if comp and 0 < w <= 100:
+                        weights.append(WeightItem(component=comp, weight=w, page=page_num + 1, raw=cell_str[:80]))
+                if not CELL_KEYWORD_RE.search(cell_str):
+                    for m in CELL_PERCENT_RE.finditer(cell_str):
+                        w = float(m.group(1))
+                        if 0 < w <= 100:
+                            comp = "Component"
+                            for neighbor in row_cells:
+                                if neighbor != cell_str and any(kw in neighbor.lower() for kw in component_keywords):
+                                    comp = normalize_component(neighbor)
+                                    break
+                            weights.append(WeightItem(component=comp, weight=w, page=page_num + 1, raw=cell_str[:80]))
     return weights
 
 def technique_3_tables(pdf_path: str, full_text: str, pages_text: List[str]) -> ParseResult:
@@ -1002,13 +1106,14 @@ def technique_3_tables(pdf_path: str, full_text: str, pages_text: List[str]) ->
 
 def technique_4_merge(pdf_path: str, full_text: str, pages_text: List[str]) -> ParseResult:
     """Run all extractors and merge weights. Same component -> keep best match."""
-    all_weights: List[List[WeightItem]] = [
+    # Candidates stream into the merge; only the best item per component is kept
+    candidates = chain(
         _parse_weights_strict(pages_text),
         _parse_weights_loose(pages_text),
         _parse_weights_near(pages_text),
         _parse_weights_from_tables(pdf_path),
-    ]
-    merged = merge_weights_by_component(all_weights)
+    )
+    merged = merge_weights_by_component(candidates)
     weights = dedupe_weights(merged)
     total, ok = validate_total(weights)
     dues = _parse_dues_loose(pages_text)
@@ -1031,50 +1136,227 @@ def technique_4_merge(pdf_path: str, full_text: str, pages_text: List[str]) -> P
     )
 
 # -----------------------------
-# Main entry: try techniques until results found
+# Technique registry: declared cost + observed success, ordered per outline
 # -----------------------------
 
-def parse_outline(pdf_path: str) -> ParseResult:
+# Which priors/stats apply to an outline: regex techniques can only find weights when the text has
+# "N%" near a component keyword; scanned or table-only grading schemes need the table techniques
+SIGNAL_TEXT_WEIGHTS = "text_weights"
+SIGNAL_NO_TEXT_WEIGHTS = "no_text_weights"
+# Declared priors count as this many observed runs, so a few unusual outlines don't flip the order
+PRIOR_RUNS = 5.0
+
+@dataclass
+class Technique:
+    """A registered technique: fn(pdf_path, full_text, pages_text) -> ParseResult."""
+    name: str
+    fn: Callable[..., ParseResult]
+    cost_ms_per_page: float          # declared estimate, blended with observed timings
+    prior_success: Dict[str, float]  # signal -> chance the result's weights sum to 100
+    needs_pdf: bool = False
+
+class TechniqueStats(_Record):
+    """Observed runs of one technique under one signal."""
+    __slots__ = ("runs", "successes", "ms", "pages")
+
+    def __init__(self, runs: int = 0, successes: int = 0, ms: float = 0.0, pages: int = 0):
+        self.runs = runs
+        self.successes = successes
+        self.ms = ms
+        self.pages = pages
+
+TECHNIQUES: Dict[str, Technique] = {}
+_stats: Dict[Tuple[str, str], TechniqueStats] = {}
+_stats_lock = threading.Lock()
+_history_loaded = False
+
+def register_technique(name: str, fn: Callable[..., ParseResult], cost_ms_per_page: float,
+                       prior_success: Dict[str, float], needs_pdf: bool = False) -> Technique:
+    tech = Technique(name, fn, cost_ms_per_page, prior_success, needs_pdf)
+    TECHNIQUES[name] = tech
+    return tech
+
+register_technique("technique_1_strict_regex", technique_1_strict_regex, 0.1,
+                   {SIGNAL_TEXT_WEIGHTS: 0.4, SIGNAL_NO_TEXT_WEIGHTS: 0.02})
+register_technique("technique_2_loose_regex", technique_2_loose_regex, 0.3,
+                   {SIGNAL_TEXT_WEIGHTS: 0.5, SIGNAL_NO_TEXT_WEIGHTS: 0.02})
+# Table techniques parse only pages with ruling lines (~70 ms each, ~1 ms for the others) and share
+# the tables through pdf_tables; PDF_TABLE_PROFILE=full/text parse every page, which observed runs pick up
+register_technique("technique_3_tables", technique_3_tables, 20.0,
+                   {SIGNAL_TEXT_WEIGHTS: 0.5, SIGNAL_NO_TEXT_WEIGHTS: 0.5}, needs_pdf=True)
+register_technique("technique_4_merge", technique_4_merge, 20.0,
+                   {SIGNAL_TEXT_WEIGHTS: 0.6, SIGNAL_NO_TEXT_WEIGHTS: 0.4}, needs_pdf=True)
+
+def text_signal(full_text: str) -> str:
+    return SIGNAL_TEXT_WEIGHTS if WEIGHT_NEAR_RE.search(full_text) else SIGNAL_NO_TEXT_WEIGHTS
+
+def load_technique_stats(path: str) -> None:
+    """Add runs saved by save_technique_stats (e.g. from a parse_batch.py run) to this process's stats."""
+    with open(path, encoding="utf-8") as f:
+        saved = json.load(f)
+    with _stats_lock:
+        for signal, by_name in saved.items():
+            for name, fields in by_name.items():
+                s = _stats.setdefault((signal, name), TechniqueStats())
+                s.runs += fields["runs"]
+                s.successes += fields["successes"]
+                s.ms += fields["ms"]
+                s.pages += fields["pages"]
+
+def save_technique_stats(path: str) -> None:
+    with _stats_lock:
+        out: Dict[str, Dict] = {}
+        for (signal, name), s in _stats.items():
+            out.setdefault(signal, {})[name] = {**s.to_dict(), "ms": round(s.ms, 1)}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(out, f, indent=2, sort_keys=True)
+
+def _load_history() -> None:
+    """Seed stats once per process from OUTLINE_TECHNIQUE_STATS, if set."""
+    global _history_loaded
+    if _history_loaded:
+        return
+    _history_loaded = True
+    path = os.getenv("OUTLINE_TECHNIQUE_STATS")
+    if path:
+        try:
+            load_technique_stats(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring OUTLINE_TECHNIQUE_STATS %s: %s", path, e)
+
+def record_technique_run(signal: str, name: str, ms: float, pages: int, ok: bool) -> None:
+    with _stats_lock:
+        s = _stats.setdefault((signal, name), TechniqueStats())
+        s.runs += 1
+        s.successes += ok
+        s.ms += ms
+        s.pages += pages
+
+def _estimate(tech: Technique, signal: str, pages: int) -> Tuple[float, float]:
+    """(expected ms, success probability): declared prior blended with observed runs."""
+    s = _stats.get((signal, tech.name)) or TechniqueStats()
+    p = (s.successes + tech.prior_success.get(signal, 0.5) * PRIOR_RUNS) / (s.runs + PRIOR_RUNS)
+    ms_per_page = (s.ms + tech.cost_ms_per_page * PRIOR_RUNS) / (s.pages + PRIOR_RUNS)
+    return ms_per_page * max(pages, 1), p
+
+def plan_techniques(full_text: str, pages: int, has_pdf: bool) -> Tuple[str, List[Tuple[Technique, float]]]:
     """
-    Workflow:
-      1. Grab entire PDF first (full text + per-page)
-      2. Find coursework, dates, weights; add weights to 100
-      3. If not good enough, try next technique
-      4. Repeat until results found or all techniques exhausted
+    (signal, [(technique, expected ms)]) for this outline. Applicable techniques are ordered by
+    expected cost per success, so cheap regex runs before table extraction unless history says
+    regex rarely works for outlines like this one.
     """
-    full_text, pages_text = extract_full_pdf(pdf_path)
+    _load_history()
+    signal = text_signal(full_text)
+    ranked = []
+    for tech in TECHNIQUES.values():
+        if tech.needs_pdf and not has_pdf:
+            continue
+        ms, p = _estimate(tech, signal, pages)
+        ranked.append((ms / max(p, 0.01), tech, ms))
+    ranked.sort(key=lambda x: x[0])
+    return signal, [(tech, ms) for _, tech, ms in ranked]
+
+def technique_stats() -> Dict[str, Dict[str, Dict]]:
+    """signal -> technique -> runs, successes, estimated success rate and ms/page."""
+    out: Dict[str, Dict[str, Dict]] = {}
+    for signal in (SIGNAL_TEXT_WEIGHTS, SIGNAL_NO_TEXT_WEIGHTS):
+        for tech in TECHNIQUES.values():
+            s = _stats.get((signal, tech.name)) or TechniqueStats()
+            ms_per_page, p = _estimate(tech, signal, 1)
+            out.setdefault(signal, {})[tech.name] = {
+                "runs": s.runs, "successes": s.successes,
+                "success_rate": round(p, 3), "ms_per_page": round(ms_per_page, 2),
+            }
+    return out
 
-    # Try table extraction first (most reliable for grading schemes)
-    techniques: List[Callable[..., ParseResult]] = [
-        technique_3_tables,
-        technique_1_strict_regex,
-        technique_2_loose_regex,
-        technique_4_merge,
-    ]
+# -----------------------------
+# Main entry: try techniques until results found
+# -----------------------------
 
+def _run_techniques(signal: str, plan: List[Tuple[Technique, float]], pdf_path: Optional[str],
+                    full_text: str, pages_text: List[str], record_stats: bool = True) -> ParseResult:
+    """
+    First technique in the plan whose weights sum to 100, else the best-scoring one; dates enriched
+    from full_text. With record_stats every run updates the technique stats; result.plan records
+    what ran and its cost.
+    """
+    start = time.perf_counter()
+    ran: List[Dict] = []
     best: Optional[ParseResult] = None
-    for tech in techniques:
+    chosen: Optional[ParseResult] = None
+    for tech, estimated_ms in plan:
+        t0 = time.perf_counter()
         try:
-            r = tech(pdf_path, full_text, pages_text)
+            r = tech.fn(pdf_path, full_text, pages_text)
         except Exception:
-            continue
+            r = None
+        ms = (time.perf_counter() - t0) * 1000
         # Success: weights sum to 100 and we have data
-        if r.weight_ok and (r.dues or r.weights):
-            enrich_component_dates(r, full_text)
-            return r
+        ok = r is not None and r.weight_ok and bool(r.dues or r.weights)
+        if record_stats:
+            record_technique_run(signal, tech.name, ms, len(pages_text), ok)
+        ran.append({"technique": tech.name, "estimated_ms": round(estimated_ms, 1), "ms": round(ms, 1),
+                    "ok": ok, "error": r is None})
+        if ok:
+            chosen = r
+            break
         # Track best so far
-        if best is None or result_score(r) > result_score(best):
+        if r is not None and (best is None or result_score(r) > result_score(best)):
             best = r
 
-    if best is not None:
-        enrich_component_dates(best, full_text)
-        return best
-    return ParseResult(
-        dues=[],
-        weights=[],
-        total_weight=0.0,
-        weight_ok=False,
-        warnings=["All techniques exhausted. No coursework/dates/weights found."],
-        method="exhausted",
-        component_dates={},
-    )
+    result = chosen or best
+    if result is not None:
+        enrich_component_dates(result, full_text)
+    else:
+        result = ParseResult(
+            dues=[],
+            weights=[],
+            total_weight=0.0,
+            weight_ok=False,
+            warnings=["All techniques exhausted. No coursework/dates/weights found."],
+            method="exhausted",
+            component_dates={},
+        )
+    result.plan = {
+        "signal": signal,
+        "pages": len(pages_text),
+        "order": [tech.name for tech, _ in plan],
+        "ran": ran,
+        "total_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+    return result
+
+def parse_outline(pdf_path: str) -> ParseResult:
+    """
+    Workflow:
+      1. Grab entire PDF first (full text + per-page)
+      2. Find coursework, dates, weights; add weights to 100
+      3. If not good enough, try next technique (cheapest expected cost per success first)
+      4. Repeat until results found or all techniques exhausted
+    """
+    full_text, pages_text = extract_full_pdf(pdf_path)
+    signal, plan = plan_techniques(full_text, len(pages_text), has_pdf=True)
+    return _run_techniques(signal, plan, pdf_path, full_text, pages_text)
+
+def parse_outline_text(text: str, record_stats: bool = True) -> ParseResult:
+    """
+    Same workflow on already-extracted text (pasted outlines, single sections): regex techniques only.
+    Pass record_stats=False for anything that is not a whole outline (sections never sum to 100%),
+    so it does not skew the technique success rates.
+    """
+    signal, plan = plan_techniques(text, 1, has_pdf=False)
+    return _run_techniques(signal, plan, None, text, [text], record_stats)
+
+TEXT_OUTLINE_EXTENSIONS = (".txt", ".md")
+
+def parse_outline_file(path: str) -> ParseResult:
+    """parse_outline for PDFs; extracted text through parse_outline_text for .docx and plain-text files."""
+    ext = path.lower().rsplit(".", 1)[-1] if "." in path else ""
+    if ext == "pdf":
+        return parse_outline(path)
+    if ext == "docx":
+        from .docx_extract import extract_docx_text
+        with open(path, "rb") as f:
+            return parse_outline_text(extract_docx_text(f))
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return parse_outline_text(f.read())
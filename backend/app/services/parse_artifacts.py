@@ -0,0 +1,181 @@
+# parse_artifacts.py - Per-course outline parse artifacts: section-level re-parse and item-level diffs
+import hashlib
+import json
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from psycopg2.extras import Json
+
+from .gpt_client import parse_outline_with_gpt, reparse_changed_sections
+from .outline_parser import DATE_OPTIONAL_YEAR_RE, ParseResult, parse_outline_text
+from .prompt_filter import PERCENT_RE, is_relevant, split_sections
+
+# Bump when the artifact layout changes; older artifacts are treated as missing (full re-parse)
+ARTIFACT_VERSION = 1
+# Fall back to a full parse when more than this share of the grading-relevant sections changed
+MAX_PARTIAL_SHARE = 0.5
+# Item fields compared by the diff (explanations are free text and change on every GPT run)
+DIFF_FIELDS = ("date", "percent", "included")
+
+class ParseArtifactError(Exception):
+    """Invalid outline save/re-parse request."""
+
+def split_outline_sections(text: str) -> List[str]:
+    """Outline split at heading lines (same sections the prompt filter uses)."""
+    return ["\n".join(lines) for lines in split_sections(text)]
+
+def _section_hash(section: str) -> str:
+    # Whitespace-insensitive so re-wrapping or re-pasting a section doesn't count as an edit
+    return hashlib.sha1(" ".join(section.split()).encode("utf-8")).hexdigest()[:16]
+
+def compact_parse_result(r: ParseResult) -> Dict:
+    """Regex-parser output without page numbers/raw matches: what an edit must change to matter."""
+    return {
+        "weights": [[w.component, w.weight] for w in r.weights],
+        "dues": [[d.kind, d.number, d.due_date_raw, d.due_time_raw] for d in r.dues],
+        "component_dates": r.component_dates or {},
+        "component_multi_dates": r.component_multi_dates or {},
+        "component_multi_items": {k: [list(p) for p in v] for k, v in (r.component_multi_items or {}).items()},
+    }
+
+def section_signature(section: str) -> Optional[Dict]:
+    """Weights/dates a section contributes, or None for sections that hold no graded items."""
+    if not is_relevant(section):
+        return None
+    signals = sorted(" ".join(m.lower().split()) for m in PERCENT_RE.findall(section) + DATE_OPTIONAL_YEAR_RE.findall(section))
+    return {"signals": signals, "parse": compact_parse_result(parse_outline_text(section, record_stats=False))}
+
+def _signature_key(sig: Dict) -> str:
+    return json.dumps(sig, sort_keys=True)
+
+def build_artifact(text: str, answers: List[str], items: List[Dict],
+                   known: Optional[Dict[str, Optional[Dict]]] = None) -> Dict:
+    """Artifact for an outline; `known` maps section hash -> signature to skip re-parsing unchanged sections."""
+    known = known or {}
+    sections = []
+    for section in split_outline_sections(text):
+        h = _section_hash(section)
+        sections.append({"h": h, "sig": known[h] if h in known else section_signature(section)})
+    return {
+        "v": ARTIFACT_VERSION,
+        "answers": answers,
+        "sections": sections,
+        "items": items,
+        # Artifact parses are bookkeeping, not outline parses: keep them out of the technique stats
+        "parse": compact_parse_result(parse_outline_text(text, record_stats=False)),
+    }
+
+def _norm(field: str, value) -> str:
+    s = " ".join(str(value if value is not None else "").lower().split())
+    return s.replace("%", "").strip() if field == "percent" else s
+
+def diff_items(old: List[Dict], new: List[Dict]) -> Dict:
+    """Item-level diff matched by normalized name (in order for repeated names)."""
+    remaining: Dict[str, List[Dict]] = defaultdict(list)
+    for it in old:
+        remaining[_norm("name", it.get("name"))].append(it)
+    added, changed, unchanged = [], [], 0
+    for it in new:
+        bucket = remaining.get(_norm("name", it.get("name")))
+        if not bucket:
+            added.append(it)
+            continue
+        before = bucket.pop(0)
+        fields = [f for f in DIFF_FIELDS if _norm(f, before.get(f)) != _norm(f, it.get(f))]
+        if fields:
+            changed.append({
+                "name": it.get("name"),
+                "fields": fields,
+                "before": {f: before.get(f) for f in fields},
+                "after": {f: it.get(f) for f in fields},
+            })
+        else:
+            unchanged += 1
+    removed = [it for bucket in remaining.values() for it in bucket]
+    return {"added": added, "removed": removed, "changed": changed, "unchanged": unchanged}
+
+def reparse_outline(previous: Optional[Dict], text: str, answers: List[str], user_id: str,
+                    force_full: bool = False) -> Tuple[Dict, Dict]:
+    """
+    Re-parse an edited outline against the stored artifact. Returns (response, new artifact).
+    Modes: "unchanged" (same sections), "reused" (edits touch no weights/dates), "partial" (only the
+    edited sections go to GPT with the current items), "full" (no usable artifact, answers changed,
+    or too much changed).
+    """
+    start = time.perf_counter()
+    sections = split_outline_sections(text)
+    hashes = [_section_hash(s) for s in sections]
+    artifact = previous["artifact"] if previous else None
+    if artifact and artifact.get("v") != ARTIFACT_VERSION:
+        artifact = None
+
+    old_items: List[Dict] = artifact["items"] if artifact else []
+    known: Dict[str, Optional[Dict]] = {}
+    mode, reparsed, added, removed = "full", 0, [], []
+    items: Optional[List[Dict]] = None
+    if artifact and not force_full and (artifact.get("answers") or []) == answers:
+        known = {s["h"]: s["sig"] for s in artifact["sections"]}
+        new_hashes = set(hashes)
+        added = [i for i, h in enumerate(hashes) if h not in known]
+        removed = [j for j, s in enumerate(artifact["sections"]) if s["h"] not in new_hashes]
+        for i in added:
+            known[hashes[i]] = section_signature(sections[i])
+        new_sigs = [known[hashes[i]] for i in added if known[hashes[i]] is not None]
+        old_sigs = [artifact["sections"][j]["sig"] for j in removed if artifact["sections"][j]["sig"] is not None]
+        relevant = sum(1 for h in hashes if known[h] is not None) or 1
+        if not added and not removed:
+            mode, items = "unchanged", old_items
+        elif sorted(map(_signature_key, new_sigs)) == sorted(map(_signature_key, old_sigs)):
+            mode, items = "reused", old_items
+        elif max(len(new_sigs), len(old_sigs)) / relevant <= MAX_PARTIAL_SHARE:
+            old_sections = split_outline_sections(previous["outline_text"])
+            removed_text = "\n".join(old_sections[j] for j in removed
+                                     if j < len(old_sections) and artifact["sections"][j]["sig"] is not None)
+            changed_text = "\n".join(sections[i] for i in added if known[hashes[i]] is not None)
+            result = reparse_changed_sections(old_items, removed_text, changed_text, answers, user_id)
+            if result.data:
+                # Only added sections go to GPT; an edited section is one added + one removed
+                mode, items, reparsed = "partial", result.data, len(new_sigs)
+
+    if items is None:
+        mode = "full"
+        reparsed = sum(1 for s in sections if is_relevant(s))
+        items = parse_outline_with_gpt(text, answers, user_id).data
+
+    new_artifact = build_artifact(text, answers, items, known)
+    response = {
+        "items": items,
+        "diff": diff_items(old_items, items),
+        "mode": mode,
+        "sections": {"total": len(sections), "added": len(added), "removed": len(removed), "reparsed": reparsed},
+        "timings": {"total_ms": int((time.perf_counter() - start) * 1000)},
+    }
+    return response, new_artifact
+
+def load_artifact(cur, course_id: int, user_id: str) -> Optional[Dict]:
+    cur.execute(
+        "SELECT outline_text, artifact, updated_at FROM course_parse_artifacts WHERE course_id = %s AND user_id = %s",
+        (course_id, user_id)
+    )
+    return cur.fetchone()
+
+def save_artifact(cur, course_id: int, user_id: str, outline_text: str, artifact: Dict) -> None:
+    cur.execute(
+        "INSERT INTO course_parse_artifacts (course_id, user_id, outline_text, artifact) VALUES (%s, %s, %s, %s) "
+        "ON CONFLICT (course_id) DO UPDATE SET outline_text = EXCLUDED.outline_text, "
+        "artifact = EXCLUDED.artifact, updated_at = NOW()",
+        (course_id, user_id, outline_text, Json(artifact, dumps=lambda o: json.dumps(o, separators=(",", ":"))))
+    )
+
+def check_outline_payload(outline: Dict) -> Tuple[str, List[str], List[Dict]]:
+    """(text, answers, items) from {"text", "answers"?, "items"?}; raises ParseArtifactError."""
+    if not isinstance(outline, dict) or not isinstance(outline.get("text"), str) or not outline["text"].strip():
+        raise ParseArtifactError("outline needs non-empty text")
+    answers = outline.get("answers") or []
+    items = outline.get("items") or []
+    if not isinstance(answers, list) or not all(isinstance(a, str) for a in answers):
+        raise ParseArtifactError("answers must be a list of strings")
+    if not isinstance(items, list) or not all(isinstance(it, dict) for it in items):
+        raise ParseArtifactError("items must be a list of objects")
+    return outline["text"], answers, items
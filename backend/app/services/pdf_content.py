@@ -0,0 +1,94 @@
+# pdf_content.py - Raw content-stream scanner shared by the table pre-check and the scanned-PDF probe (no layout analysis)
+import re
+from typing import Iterator, List, Optional, Tuple
+
+MAX_FORM_DEPTH = 4  # nested form XObjects followed; deeper ones are reported as "opaque"
+
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+# One content-stream token per match; strings, inline images and comments are matched whole so their
+# bytes can't look like operators. Other delimiters ([ ] << >>) are skipped.
+_TOKEN_RE = re.compile(rb"""
+    (?P<str>\((?:\\.|[^\\()]|\((?:\\.|[^\\()])*\))*\))
+  | (?P<hex><[0-9A-Fa-f\s]*>)
+  | (?P<inline>\bBI\b.*?\bID\b.*?\bEI\b)
+  | %[^\r\n]*
+  | (?P<name>/[^\s/\[\]()<>{}%]*)
+  | (?P<num>[+-]?(?:\d+\.?\d*|\.\d+))
+  | (?P<op>[A-Za-z'"][A-Za-z0-9'"*]*)
+""", re.VERBOSE | re.DOTALL)
+_HEX_DIGIT_RE = re.compile(rb"[0-9A-Fa-f]")
+_TEXT_OPS = frozenset((b"Tj", b"TJ", b"'", b'"'))
+
+def mult(m, n):
+    """m x n for PDF matrices [a b c d e f] (m applied first)."""
+    a, b, c, d, e, f = m
+    A, B, C, D, E, F = n
+    return (a * A + b * C, a * B + b * D, c * A + d * C, c * B + d * D, e * A + f * C + E, e * B + f * D + F)
+
+def area(ctm) -> float:
+    # Images (and forms) are drawn into the unit square, so their area is the CTM's determinant
+    return abs(ctm[0] * ctm[3] - ctm[1] * ctm[2])
+
+def page_content(page) -> Tuple[bytes, object]:
+    """(concatenated content streams, resources) of a pdfplumber page."""
+    from pdfminer.pdftypes import resolve1  # lazy, like pdfplumber itself
+    page_obj = page.page_obj
+    return b"\n".join(resolve1(s).get_data() for s in page_obj.contents), page_obj.resources
+
+def walk_content(data: bytes, resources, ctm=IDENTITY, max_bytes: Optional[int] = None,
+                 depth: int = 0) -> Iterator[Tuple[str, object, tuple]]:
+    """
+    One content stream's operators in order, following form XObjects (their own Resources, else the
+    caller's, per PDF reference 4.9.1). Yields (event, value, ctm):
+      ("op", b"re", ctm)     every operator, after q/Q/cm have updated ctm
+      ("text", n, ctm)       a text-showing operator and the number of string bytes it shows
+      ("image", None, ctm)   an inline image or image XObject, drawn into the unit square under ctm
+      ("opaque", name, ctm)  an XObject that is not followed: a form past MAX_FORM_DEPTH or another subtype
+    Undefined XObjects draw nothing and yield nothing. max_bytes truncates each stream scanned.
+    Callers stop early by breaking out of the loop.
+    """
+    from pdfminer.pdftypes import resolve1
+    if max_bytes is not None:
+        data = data[:max_bytes]
+    stack: List = []
+    operands: List = []
+    text = 0
+    for m in _TOKEN_RE.finditer(data):
+        kind = m.lastgroup
+        if kind == "num":
+            operands.append(float(m.group()))
+        elif kind == "name":
+            operands.append(m.group()[1:])
+        elif kind == "str":
+            text += len(m.group()) - 2
+        elif kind == "hex":
+            text += len(_HEX_DIGIT_RE.findall(m.group())) // 2
+        elif kind == "inline":
+            yield "image", None, ctm
+        elif kind == "op":
+            op = m.group()
+            if op in _TEXT_OPS:
+                yield "text", text, ctm
+            elif op == b"cm" and len(operands) >= 6:
+                ctm = mult(tuple(operands[-6:]), ctm)
+            elif op == b"q":
+                stack.append(ctm)
+            elif op == b"Q" and stack:
+                ctm = stack.pop()
+            elif op == b"Do" and operands and isinstance(operands[-1], bytes):
+                name = operands[-1]
+                xobjects = resolve1((resources or {}).get("XObject")) or {}
+                xobj = resolve1(xobjects.get(name.decode("latin-1")))
+                subtype = getattr(xobj.get("Subtype"), "name", None) if xobj is not None else None
+                if subtype == "Image":
+                    yield "image", None, ctm
+                elif subtype == "Form" and depth < MAX_FORM_DEPTH:
+                    matrix = tuple(float(x) for x in resolve1(xobj.get("Matrix")) or IDENTITY)
+                    yield from walk_content(xobj.get_data(), resolve1(xobj.get("Resources")) or resources,
+                                            mult(matrix, ctm), max_bytes, depth + 1)
+                elif xobj is not None:
+                    yield "opaque", name, ctm
+            yield "op", op, ctm
+            operands = []
+            text = 0
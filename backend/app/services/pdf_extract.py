@@ -0,0 +1,34 @@
+# pdf_extract.py - pdfplumber text + table extraction for uploaded outlines
+import mmap
+from typing import BinaryIO
+
+from .pdf_probe import check_text_layer
+from .pdf_tables import extract_page_tables, table_profile
+
+MAX_OUTLINE_PAGES = 6  # Only extract first N pages from PDFs; rest is ignored
+
+def extract_pdf_text(stream: BinaryIO, max_pages: int = MAX_OUTLINE_PAGES) -> str:
+    """
+    Text of the first max_pages pages, with tables (grading schemes, schedules) appended as "[Table]" blocks.
+    Raises ScannedPdfError, before any layout analysis, when none of those pages has a text layer.
+    """
+    import pdfplumber  # imported on first use to keep startup fast
+    page_chunks = []
+    profile = table_profile()
+    with pdfplumber.open(stream) as pdf:
+        pages = pdf.pages[:max_pages]
+        check_text_layer(pages)
+        for p in pages:
+            chunk = p.extract_text() or ""
+            for table in extract_page_tables(p, profile):
+                if table:
+                    rows = [" | ".join(str(c or "").strip() for c in row) for row in table if any(c for c in row)]
+                    if rows:
+                        chunk += "\n[Table]\n" + "\n".join(rows) + "\n"
+            page_chunks.append(chunk)
+    return "\n".join(page_chunks)
+
+def extract_pdf_file(path: str, max_pages: int = MAX_OUTLINE_PAGES) -> str:
+    """extract_pdf_text over an mmap of the file, so pages are read from the page cache, not copied."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return extract_pdf_text(mapped, max_pages)
@@ -0,0 +1,87 @@
+# pdf_probe.py - Text/scanned/mixed check of a PDF's first pages from their content streams (no layout analysis)
+from typing import Dict
+
+from .pdf_content import area, page_content, walk_content
+
+PROBE_PAGES = 6            # pages checked by the outline parser (extract_pdf_text checks the pages it reads)
+MIN_PAGE_CHARS = 20        # shown-text bytes for a page to count as having a text layer
+MIN_IMAGE_COVERAGE = 0.5   # share of an untexted page drawn by images for it to count as a scan
+MAX_PROBE_BYTES = 256 * 1024  # content scanned per page; a longer stream without text is left to the extractor
+
+SCANNED_PDF_MESSAGE = ("This PDF has no selectable text on its first pages (it looks scanned). "
+                       "Paste the outline text instead, or upload a text PDF or Word file.")
+BLANK_PDF_MESSAGE = ("This PDF's first pages are blank (no text or images). "
+                     "Check that you uploaded the right file, or paste the outline text instead.")
+
+class ScannedPdfError(Exception):
+    """
+    The probed pages have no text layer, so extraction would return nothing. code is "scanned_pdf"
+    for image scans and "blank_pdf" when the pages draw nothing at all.
+    """
+    def __init__(self, probe: Dict):
+        blank = probe.get("kind") == "blank"
+        super().__init__(BLANK_PDF_MESSAGE if blank else SCANNED_PDF_MESSAGE)
+        self.code = "blank_pdf" if blank else "scanned_pdf"
+        self.probe = probe
+
+def _scan(data: bytes, resources) -> Dict:
+    """Shown-text bytes and image area of a page's content; stops once the page has text."""
+    totals = {"chars": 0, "image_area": 0.0}
+    for event, value, ctm in walk_content(data, resources, max_bytes=MAX_PROBE_BYTES):
+        if event == "text":
+            totals["chars"] += value
+            if totals["chars"] >= MIN_PAGE_CHARS:
+                break
+        elif event == "image":
+            totals["image_area"] += area(ctm)
+    return totals
+
+def probe_page(page) -> Dict:
+    """
+    {"chars", "image_coverage", "kind"} for a pdfplumber page. kind is "text", "image" (drawn mostly by
+    images, with at most a few stray characters), "blank", or "unknown" (unreadable or too long to scan).
+    """
+    totals = {"chars": 0, "image_area": 0.0}
+    try:
+        data, resources = page_content(page)
+        totals = _scan(data, resources)
+        x0, y0, x1, y1 = page.page_obj.mediabox
+        coverage = min(1.0, totals["image_area"] / (abs(x1 - x0) * abs(y1 - y0) or 1))
+    except Exception:
+        coverage, data = 0.0, None
+    if totals["chars"] >= MIN_PAGE_CHARS:
+        kind = "text"
+    elif data is None or len(data) > MAX_PROBE_BYTES:
+        kind = "unknown"  # left to the full extractor
+    elif coverage >= MIN_IMAGE_COVERAGE:
+        kind = "image"
+    elif totals["chars"]:
+        kind = "text"
+    else:
+        kind = "blank"
+    return {"chars": totals["chars"], "image_coverage": round(coverage, 2), "kind": kind}
+
+def probe_pages(pages) -> Dict:
+    """
+    Classify pdfplumber pages (normally the first few) as a document: "text" (no page is an image
+    scan), "mixed" (text pages and scanned pages), "scanned" (no page has a text layer) or "blank"
+    (every page draws nothing).
+    """
+    results = [probe_page(p) for p in pages]
+    kinds = {r["kind"] for r in results}
+    if kinds == {"blank"}:
+        kind = "blank"
+    elif not kinds & {"text", "unknown"}:
+        kind = "scanned"
+    elif "image" in kinds:
+        kind = "mixed"
+    else:
+        kind = "text"
+    return {"kind": kind, "pages": results}
+
+def check_text_layer(pages) -> Dict:
+    """probe_pages, raising ScannedPdfError for "scanned" and "blank" documents before any layout analysis runs."""
+    probe = probe_pages(pages)
+    if probe["kind"] in ("scanned", "blank"):
+        raise ScannedPdfError(probe)
+    return probe
@@ -0,0 +1,54 @@
+# pdf_tables.py - Per-page table-detection strategy: skip pages that draw no ruling lines before pdfplumber parses them
+import os
+from typing import Dict, List, Optional
+
+from .pdf_content import page_content, walk_content
+
+# Profiles (PDF_TABLE_PROFILE):
+#   "full"  - pdfplumber's default settings on every page (previous behaviour; the parity baseline)
+#   "lines" - the same ruling-line settings, but pages whose content stream draws no lines, rects or
+#             curves are skipped without being parsed (they cannot produce a table under "lines")
+#   "text"  - "lines", plus whitespace-aligned columns on unruled pages that contain a "%"
+TABLE_PROFILES = ("full", "lines", "text")
+DEFAULT_TABLE_PROFILE = "lines"
+LINES_SETTINGS = {"vertical_strategy": "lines", "horizontal_strategy": "lines"}
+TEXT_SETTINGS = {"vertical_strategy": "text", "horizontal_strategy": "text"}
+# Path operators that become pdfplumber edges: l (line), re (rect), c/v/y (curves)
+_EDGE_OPS = frozenset((b"l", b"re", b"c", b"v", b"y"))
+
+def table_profile() -> str:
+    """This deployment's profile from PDF_TABLE_PROFILE; unknown names fall back to the default."""
+    profile = os.getenv("PDF_TABLE_PROFILE", DEFAULT_TABLE_PROFILE).strip().lower()
+    return profile if profile in TABLE_PROFILES else DEFAULT_TABLE_PROFILE
+
+def _draws_edges(data: bytes, resources) -> bool:
+    # XObjects the scanner does not follow (too deeply nested forms, unknown subtypes) count as ruled
+    for event, value, _ in walk_content(data, resources):
+        if event == "opaque" or (event == "op" and value in _EDGE_OPS):
+            return True
+    return False
+
+def page_has_rulings(page) -> bool:
+    """
+    Cheap check on the page's raw content stream (no layout analysis): False only when the page draws
+    no lines, rects or curves, directly or through form XObjects. Errors count as ruled.
+    """
+    try:
+        return _draws_edges(*page_content(page))
+    except Exception:
+        return True
+
+def page_table_settings(page, profile: str) -> Optional[Dict]:
+    """pdfplumber table settings for this page under the profile, or None to skip the page."""
+    if profile == "full" or page_has_rulings(page):
+        return LINES_SETTINGS
+    if profile == "text" and any(c["text"] == "%" for c in page.chars):
+        return TEXT_SETTINGS
+    return None
+
+def extract_page_tables(page, profile: Optional[str] = None) -> List[List[List[Optional[str]]]]:
+    """page.extract_tables() with the strategy the profile picks for this page ([] for skipped pages)."""
+    settings = page_table_settings(page, profile or table_profile())
+    if settings is None:
+        return []
+    return page.extract_tables(settings) or []
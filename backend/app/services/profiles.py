@@ -0,0 +1,31 @@
+# profiles.py - Cached profile lookups with ETags
+import hashlib
+import json
+from typing import Dict, Optional, Tuple
+
+from .ttl_cache import TTLCache
+
+# Explicit projection: only what the frontend reads (Layout/App/AdminDashboard check is_admin)
+PROFILE_COLUMNS = "id, user_id, is_admin, created_at"
+
+# (user_id,) -> (etag, profile); admin edits/deletes invalidate, the TTL bounds cross-worker staleness
+profile_cache = TTLCache("PROFILE_CACHE_TTL", 60)
+
+def fetch_profile(cur, user_id: str) -> Optional[Dict]:
+    cur.execute(f"SELECT {PROFILE_COLUMNS} FROM profiles WHERE user_id = %s", (user_id,))
+    return cur.fetchone()
+
+def profile_etag(profile: Dict) -> str:
+    body = json.dumps(profile, default=str, sort_keys=True)
+    return hashlib.sha1(body.encode("utf-8")).hexdigest()
+
+def cached_profile(user_id: str) -> Optional[Tuple[str, Dict]]:
+    return profile_cache.get((user_id,))
+
+def cache_profile(user_id: str, profile: Dict) -> Tuple[str, Dict]:
+    entry = (profile_etag(profile), profile)
+    profile_cache.put((user_id,), entry)
+    return entry
+
+def invalidate_profile(user_id) -> None:
+    profile_cache.invalidate(str(user_id))
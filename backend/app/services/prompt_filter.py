@@ -0,0 +1,108 @@
+# prompt_filter.py - Trims course outline text down to grading-relevant sections before GPT calls
+import os
+import re
+from dataclasses import dataclass
+from typing import List
+
+from .outline_parser import COMPONENT_KEYWORDS, DATE_OPTIONAL_YEAR_RE, _SECTION_BOUNDARIES
+
+# Outlines shorter than this are sent as-is (nothing worth trimming)
+MIN_FILTER_CHARS = 2000
+# Minimum share of dates/weights the filtered text must keep, else send the full outline
+MIN_CONFIDENCE = 0.8
+# Skip filtering when it would save less than this share of tokens
+MIN_SAVINGS = 0.1
+
+PERCENT_RE = re.compile(r"\d{1,3}(?:\.\d+)?\s*%")
+
+# Headings of sections that never hold graded items (policies, contacts, boilerplate)
+BOILERPLATE_HEADING_RE = re.compile(
+    r"^\W*(?:office\s+hours|instructor(?:\s+information)?|contact(?:\s+information)?|teaching\s+assistants?|"
+    r"academic\s+(?:integrity|misconduct|accommodations?|honesty)|plagiarism|accessibility|"
+    r"student\s+(?:accommodations?|support|wellness|services)|accommodations?|wellness|mental\s+health|"
+    r"land\s+acknowledg\w*|copyright|privacy|freedom\s+of\s+information|emergency\s+evacuation|"
+    r"safewalk|ombuds\w*|textbooks?|required\s+(?:materials|readings?)|course\s+description|"
+    r"learning\s+(?:outcomes|objectives)|recording\s+of\s+lectures|internet\s+and\s+electronic)",
+    re.IGNORECASE
+)
+
+# Extra keywords that mark schedule/section info the clarifying questions depend on
+SCHEDULE_KEYWORDS = ("section", "lecture", "tutorial", "schedule", "week", "due", "deadline", "grade", "weight", "drop", "best")
+
+@dataclass
+class PromptFilterResult:
+    text: str
+    tokens_before: int
+    tokens_after: int
+    confidence: float
+    filtered: bool  # False when the full text was kept
+    reason: str
+
+def estimate_tokens(text: str) -> int:
+    """Rough GPT token estimate (~4 chars per token for English text)."""
+    return (len(text) + 3) // 4
+
+def _is_heading(line: str) -> bool:
+    """Short standalone lines that start a new outline section."""
+    s = line.strip()
+    if not s or len(s) > 80:
+        return False
+    if s.startswith("[Table]") or BOILERPLATE_HEADING_RE.match(s) or _SECTION_BOUNDARIES.match(s):
+        return True
+    if s.endswith(":"):
+        return True
+    letters = [c for c in s if c.isalpha()]
+    return len(letters) >= 4 and all(c.isupper() for c in letters)
+
+def split_sections(text: str) -> List[List[str]]:
+    """Split text into sections, each starting at a heading line."""
+    sections: List[List[str]] = [[]]
+    for line in text.split("\n"):
+        if _is_heading(line) and sections[-1]:
+            sections.append([])
+        sections[-1].append(line)
+    return sections
+
+def _signals(text: str) -> int:
+    """Count of weight and date mentions (what the parse prompt needs to see)."""
+    return len(PERCENT_RE.findall(text)) + len(DATE_OPTIONAL_YEAR_RE.findall(text))
+
+def is_relevant(section_text: str) -> bool:
+    """Whether a section likely holds graded items (a weight, a date, or a component plus schedule words)."""
+    lower = section_text.lower()
+    if PERCENT_RE.search(section_text):
+        return True
+    if BOILERPLATE_HEADING_RE.match(section_text.lstrip()):
+        return False
+    if DATE_OPTIONAL_YEAR_RE.search(section_text):
+        return True
+    return any(kw in lower for kw in COMPONENT_KEYWORDS) and any(kw in lower for kw in SCHEDULE_KEYWORDS)
+
+def filter_outline_for_prompt(text: str) -> PromptFilterResult:
+    """
+    Keep only outline sections likely to hold assessments, weights and dates.
+    Falls back to the full text when the filter would drop weight/date mentions
+    (low confidence) or would barely save anything.
+    """
+    tokens_before = estimate_tokens(text)
+
+    def full(reason: str, confidence: float = 1.0) -> PromptFilterResult:
+        return PromptFilterResult(text, tokens_before, tokens_before, confidence, False, reason)
+
+    if os.getenv("PROMPT_FILTER", "1") == "0":
+        return full("disabled")
+    if len(text) < MIN_FILTER_CHARS:
+        return full("short outline")
+    total_signals = _signals(text)
+    if not PERCENT_RE.search(text):
+        return full("no weights found", 0.0)
+
+    kept = ["\n".join(lines) for lines in split_sections(text) if is_relevant("\n".join(lines))]
+    filtered = "\n".join(kept)
+    confidence = _signals(filtered) / total_signals if total_signals else 0.0
+    if confidence < MIN_CONFIDENCE:
+        return full("low confidence", confidence)
+    tokens_after = estimate_tokens(filtered)
+    if tokens_after > tokens_before * (1 - MIN_SAVINGS):
+        return full("negligible savings", confidence)
+    return PromptFilterResult(filtered, tokens_before, tokens_after, confidence, True, "filtered")
@@ -0,0 +1,147 @@
+# todos.py - Paginated to-do queries, bulk operations and archiving of old completed items
+import base64
+import json
+import os
+import threading
+import time
+from datetime import date
+from typing import Dict, Optional
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_BULK_TODOS = 500
+STATUSES = ("open", "completed", "all", "archived")
+
+_COLUMNS = "id, title, due_date, completed, completed_at"
+
+class TodoError(Exception):
+    """Invalid to-do request (bad cursor, status or bulk payload)."""
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+# --- Keyset cursors: opaque base64 of the last row's (due_date, id) ---
+
+def encode_cursor(row: Dict) -> str:
+    due = row["due_date"]
+    key = [due.isoformat() if isinstance(due, date) else due, row["id"]]
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        due, todo_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return (date.fromisoformat(due) if due else None, int(todo_id))
+    except (ValueError, TypeError):
+        raise TodoError("Invalid cursor")
+
+def list_todos(cur, user_id: str, status: str = "open", cursor: Optional[str] = None,
+               limit: int = DEFAULT_PAGE_SIZE) -> Dict:
+    """
+    One page ordered by (due_date NULLS LAST, id). The keyset condition continues after the
+    cursor row, so every page is an index range scan no matter how many to-dos exist.
+    """
+    if status not in STATUSES:
+        raise TodoError(f"status must be one of {', '.join(STATUSES)}")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    table = "todos_archive" if status == "archived" else "todos"
+    where = ["user_id = %(user_id)s"]
+    params: Dict = {"user_id": user_id, "limit": limit + 1}
+    if status == "open":
+        where.append("completed = FALSE")
+    elif status == "completed":
+        where.append("completed = TRUE")
+    if cursor:
+        due, todo_id = decode_cursor(cursor)
+        params.update(due=due, id=todo_id)
+        if due is None:
+            # Past the dated items: only undated ones with a larger id remain
+            where.append("due_date IS NULL AND id > %(id)s")
+        else:
+            where.append("((due_date, id) > (%(due)s, %(id)s) OR due_date IS NULL)")
+    cur.execute(
+        f"SELECT {_COLUMNS} FROM {table} WHERE {' AND '.join(where)} "
+        f"ORDER BY due_date NULLS LAST, id LIMIT %(limit)s",
+        params
+    )
+    rows = cur.fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": rows,
+        "next_cursor": encode_cursor(rows[-1]) if has_more else None,
+    }
+
+def add_todo(cur, user_id: str, title: str, due_date: Optional[str]) -> Dict:
+    if not title or not title.strip():
+        raise TodoError("title is required")
+    cur.execute(
+        f"INSERT INTO todos (user_id, title, due_date) VALUES (%s, %s, %s) RETURNING {_COLUMNS}",
+        (user_id, title.strip(), due_date or None)
+    )
+    return cur.fetchone()
+
+def bulk_update_todos(cur, user_id: str, payload: Dict) -> Dict:
+    """Apply {"complete": [ids], "reopen": [ids], "delete": [ids]} in the caller's transaction."""
+    ops = {k: payload.get(k) or [] for k in ("complete", "reopen", "delete")}
+    for name, ids in ops.items():
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            raise TodoError(f"{name} must be a list of to-do ids")
+    if sum(len(ids) for ids in ops.values()) > MAX_BULK_TODOS:
+        raise TodoError(f"At most {MAX_BULK_TODOS} to-dos per request")
+    counts = {}
+    for name, completed in (("complete", True), ("reopen", False)):
+        counts[name] = 0
+        if ops[name]:
+            cur.execute(
+                "UPDATE todos SET completed = %s WHERE user_id = %s AND id = ANY(%s) AND completed <> %s",
+                (completed, user_id, ops[name], completed)
+            )
+            counts[name] = cur.rowcount
+    counts["delete"] = 0
+    if ops["delete"]:
+        cur.execute("DELETE FROM todos WHERE user_id = %s AND id = ANY(%s)", (user_id, ops["delete"]))
+        counts["delete"] = cur.rowcount
+    return counts
+
+# --- Archiving ---
+
+def archive_completed_todos(cur, user_id: Optional[str] = None, older_than_days: Optional[int] = None) -> int:
+    """
+    Move to-dos completed more than `older_than_days` (TODO_ARCHIVE_AFTER_DAYS, default 30)
+    ago into todos_archive in one statement. All users when user_id is None. An archive row with the
+    same id (e.g. left by a restore) is overwritten, so a deleted to-do is never lost.
+    """
+    days = older_than_days if older_than_days is not None else _env_int("TODO_ARCHIVE_AFTER_DAYS", 30)
+    user_filter = "AND user_id = %(user_id)s" if user_id else ""
+    cur.execute(f"""
+        WITH moved AS (
+            DELETE FROM todos
+            WHERE completed = TRUE AND completed_at < NOW() - make_interval(days => %(days)s) {user_filter}
+            RETURNING id, user_id, title, due_date, completed, inserted_at, completed_at
+        )
+        INSERT INTO todos_archive (id, user_id, title, due_date, completed, inserted_at, completed_at)
+        SELECT id, user_id, title, due_date, completed, inserted_at, completed_at FROM moved
+        ON CONFLICT (id) DO UPDATE SET
+            user_id = EXCLUDED.user_id, title = EXCLUDED.title, due_date = EXCLUDED.due_date,
+            completed = EXCLUDED.completed, inserted_at = EXCLUDED.inserted_at,
+            completed_at = EXCLUDED.completed_at, archived_at = NOW()
+    """, {"days": days, "user_id": user_id})
+    return cur.rowcount
+
+_last_archived: Dict[str, float] = {}
+_archive_lock = threading.Lock()
+
+def archive_due(user_id: str) -> bool:
+    """True at most once per TODO_ARCHIVE_INTERVAL seconds (default 6h) per user and process."""
+    interval = _env_int("TODO_ARCHIVE_INTERVAL", 6 * 3600)
+    now = time.monotonic()
+    with _archive_lock:
+        last = _last_archived.get(user_id)
+        if last is not None and now - last < interval:
+            return False
+        _last_archived[user_id] = now
+        return True
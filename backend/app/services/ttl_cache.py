@@ -0,0 +1,43 @@
+# ttl_cache.py - Small thread-safe per-process cache with expiry, keyed by tuples starting with a user id
+import os
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional
+
+class TTLCache:
+    """
+    Entries expire after the number of seconds in env var `ttl_env` (or `default_ttl`).
+    Keys are tuples whose first element is the user id, so invalidate(user_id) clears
+    every entry of that user.
+    """
+    def __init__(self, ttl_env: str, default_ttl: float):
+        self._ttl_env = ttl_env
+        self._default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, tuple] = {}
+
+    def _ttl(self) -> float:
+        try:
+            return float(os.getenv(self._ttl_env, self._default_ttl))
+        except ValueError:
+            return self._default_ttl
+
+    def get(self, key: tuple) -> Optional[Any]:
+        with self._lock:
+            hit = self._entries.get(key)
+        if hit and hit[0] > time.monotonic():
+            return hit[1]
+        return None
+
+    def put(self, key: tuple, value: Any) -> None:
+        now = time.monotonic()
+        with self._lock:
+            # Drop expired entries so the cache only holds recently active users
+            for k in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+                del self._entries[k]
+            self._entries[key] = (now + self._ttl(), value)
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            for k in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[k]
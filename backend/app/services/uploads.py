@@ -0,0 +1,110 @@
+# uploads.py - Bounded outline uploads: size cap, spool-to-disk threshold, magic-byte checks, mmap reads
+import io
+import mmap
+import os
+from contextlib import contextmanager
+from tempfile import SpooledTemporaryFile
+from typing import Iterator, Optional
+
+from flask import Request
+
+# Whole-request cap (MAX_UPLOAD_MB); larger bodies get 413 before they are read
+DEFAULT_MAX_UPLOAD_MB = 20
+# File parts above this many KB are spooled to a temp file instead of memory (UPLOAD_SPOOL_KB)
+DEFAULT_UPLOAD_SPOOL_KB = 512
+
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+SNIFF_BYTES = 8
+
+class UploadError(Exception):
+    """Upload rejected before parsing (empty, wrong type, or not what its extension claims)."""
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+def max_upload_bytes() -> int:
+    return int(_env_float("MAX_UPLOAD_MB", DEFAULT_MAX_UPLOAD_MB) * 1024 * 1024)
+
+def spool_threshold_bytes() -> int:
+    return int(_env_float("UPLOAD_SPOOL_KB", DEFAULT_UPLOAD_SPOOL_KB) * 1024)
+
+class UploadSpool(SpooledTemporaryFile):
+    """SpooledTemporaryFile that records when it spilled to disk (the stdlib only tracks it privately)."""
+    rolled_over = False
+
+    def rollover(self):
+        super().rollover()
+        self.rolled_over = True
+
+class UploadRequest(Request):
+    """Request whose file parts stay in memory only up to UPLOAD_SPOOL_KB, then spill to a temp file."""
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return UploadSpool(max_size=spool_threshold_bytes(), mode="rb+")
+
+def sniff_kind(stream) -> Optional[str]:
+    """'pdf', 'docx', 'doc' or None from the first bytes of the stream (position is restored)."""
+    pos = stream.tell()
+    head = stream.read(SNIFF_BYTES)
+    stream.seek(pos)
+    if not head:
+        raise UploadError("Uploaded file is empty")
+    if head.startswith(PDF_MAGIC):
+        return "pdf"
+    if head.startswith(ZIP_MAGIC):
+        return "docx"
+    if head.startswith(OLE_MAGIC):
+        return "doc"
+    return None
+
+def check_outline_file(file, ext: str) -> str:
+    """Kind of an uploaded outline document; raises UploadError unless it really is a PDF or DOCX."""
+    kind = sniff_kind(file.stream)
+    if kind == "doc" or ext == "doc":
+        raise UploadError("Legacy .doc files are not supported; save the outline as .docx or PDF", 415)
+    if ext not in ("pdf", "docx"):
+        raise UploadError("Unsupported file type", 415)
+    if kind != ext:
+        raise UploadError(f"File content is not a valid {ext.upper()}", 415)
+    return kind
+
+def read_text_upload(file) -> str:
+    """Decode a plain-text outline upload; binary documents belong on /api/extract-outline."""
+    if sniff_kind(file.stream) is not None:
+        raise UploadError("PDF and Word files must be sent to /api/extract-outline", 415)
+    try:
+        return file.stream.read().decode("utf-8")
+    except UnicodeDecodeError:
+        raise UploadError("File is not UTF-8 text")
+
+@contextmanager
+def mapped_upload(file) -> Iterator:
+    """
+    Seekable view of an upload without copying it: the stream itself while it is in memory, or an
+    mmap of the spooled temp file so parsers page it in instead of holding it in the heap.
+    """
+    stream = file.stream
+    # fileno() would roll an in-memory spool over to disk just to map it
+    in_memory = isinstance(stream, io.BytesIO) or (isinstance(stream, UploadSpool) and not stream.rolled_over)
+    if not in_memory:
+        try:
+            stream.fileno()
+        except (AttributeError, io.UnsupportedOperation):  # other in-memory streams are read as they are
+            in_memory = True
+    if in_memory:
+        stream.seek(0)
+        yield stream
+        return
+    stream.flush()
+    mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        yield mapped
+    finally:
+        mapped.close()
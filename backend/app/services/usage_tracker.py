@@ -0,0 +1,189 @@
+# usage_tracker.py - Local GPT token/latency accounting and budget enforcement
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "gpt_usage.sqlite3")
+ANONYMOUS_USER = "anonymous"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS gpt_usage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    user_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    latency_ms INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'ok'
+);
+CREATE INDEX IF NOT EXISTS gpt_usage_ts ON gpt_usage (ts);
+CREATE INDEX IF NOT EXISTS gpt_usage_user_ts ON gpt_usage (user_id, ts);
+"""
+
+_lock = threading.Lock()
+_initialized_paths: set = set()
+
+class BudgetExceeded(Exception):
+    """Raised before a GPT call when a token budget is used up."""
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def _env_int(name: str, default: int = 0) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+def _db_path() -> str:
+    return os.getenv("GPT_USAGE_DB", DEFAULT_DB_PATH)
+
+def _connect() -> sqlite3.Connection:
+    path = _db_path()
+    conn = sqlite3.connect(path, timeout=5)
+    conn.row_factory = sqlite3.Row
+    if path not in _initialized_paths:
+        with _lock:
+            conn.executescript(_SCHEMA)
+            _initialized_paths.add(path)
+    return conn
+
+@contextmanager
+def _db():
+    """Connection that commits on success and is always closed."""
+    conn = _connect()
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+@contextmanager
+def _write_txn():
+    """BEGIN IMMEDIATE transaction: takes the write lock up front, so a budget check and its
+    reservation are atomic across threads and worker processes. Commits on success."""
+    conn = _connect()
+    conn.isolation_level = None  # explicit BEGIN/COMMIT below
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+def _start_of_day(now: float) -> float:
+    lt = time.localtime(now)
+    return time.mktime((lt.tm_year, lt.tm_mon, lt.tm_mday, 0, 0, 0, 0, 0, -1))
+
+def _tokens_since(conn: sqlite3.Connection, since: float, user_id: Optional[str] = None) -> int:
+    if user_id is None:
+        row = conn.execute("SELECT COALESCE(SUM(prompt_tokens + completion_tokens), 0) AS t FROM gpt_usage WHERE ts >= ?", (since,)).fetchone()
+    else:
+        row = conn.execute("SELECT COALESCE(SUM(prompt_tokens + completion_tokens), 0) AS t FROM gpt_usage WHERE user_id = ? AND ts >= ?", (user_id, since)).fetchone()
+    return row["t"]
+
+def check_budget(user_id: Optional[str], estimated_tokens: int) -> Optional[int]:
+    """
+    Admit or reject a GPT call before it is made.
+    GPT_USER_DAILY_TOKEN_BUDGET: per user per calendar day (0 = unlimited) - sheds with BudgetExceeded.
+    GPT_GLOBAL_TOKENS_PER_MINUTE: all users, sliding 60s window (0 = unlimited) - queues for up to
+    GPT_BUDGET_QUEUE_SECONDS waiting for the window to drain, then sheds.
+    An admitted call reserves estimated_tokens in a 'pending' row in the same transaction as the
+    check, so concurrent requests see each other's spend. Returns the row id to pass to record_usage
+    (None when no budget is set).
+    """
+    user_id = user_id or ANONYMOUS_USER
+    daily = _env_int("GPT_USER_DAILY_TOKEN_BUDGET")
+    per_minute = _env_int("GPT_GLOBAL_TOKENS_PER_MINUTE")
+    if not daily and not per_minute:
+        return None
+    deadline = time.time() + _env_int("GPT_BUDGET_QUEUE_SECONDS")
+    while True:
+        # One short write transaction per attempt; the lock is not held while queueing
+        with _write_txn() as conn:
+            now = time.time()
+            if daily:
+                used = _tokens_since(conn, _start_of_day(now), user_id)
+                if used + estimated_tokens > daily:
+                    retry_after = int(_start_of_day(now) + 86400 - now) + 1
+                    raise BudgetExceeded(f"Daily GPT token budget reached ({used}/{daily} tokens)", retry_after)
+            used = _tokens_since(conn, now - 60) if per_minute else 0
+            if not per_minute or used + estimated_tokens <= per_minute:
+                cur = conn.execute(
+                    "INSERT INTO gpt_usage (ts, user_id, kind, model, prompt_tokens, status) VALUES (?, ?, '', '', ?, 'pending')",
+                    (now, user_id, estimated_tokens)
+                )
+                return cur.lastrowid
+        if time.time() >= deadline:
+            raise BudgetExceeded(f"GPT is busy ({used}/{per_minute} tokens in the last minute)", 60)
+        time.sleep(1)
+
+def record_usage(user_id: Optional[str], kind: str, model: str, prompt_tokens: int,
+                 completion_tokens: int, latency_ms: int, status: str = "ok",
+                 reservation: Optional[int] = None) -> None:
+    """
+    Persist one GPT call, settling its check_budget reservation (estimate -> actual tokens) if it
+    has one. Never raises - accounting must not break parsing.
+    """
+    row = (time.time(), user_id or ANONYMOUS_USER, kind, model, prompt_tokens, completion_tokens, latency_ms, status)
+    try:
+        with _db() as conn:
+            if reservation is not None:
+                updated = conn.execute(
+                    "UPDATE gpt_usage SET ts = ?, user_id = ?, kind = ?, model = ?, prompt_tokens = ?, "
+                    "completion_tokens = ?, latency_ms = ?, status = ? WHERE id = ?",
+                    row + (reservation,)
+                ).rowcount
+                if updated:
+                    return
+            conn.execute(
+                "INSERT INTO gpt_usage (ts, user_id, kind, model, prompt_tokens, completion_tokens, latency_ms, status) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                row
+            )
+    except sqlite3.Error as e:
+        print(f"DEBUG: failed to record GPT usage: {e}")
+
+def usage_summary(days: int = 7, user_id: Optional[str] = None, recent: int = 50) -> dict:
+    """Totals, per-user and per-day breakdowns, and the most recent calls for the admin dashboard."""
+    since = time.time() - days * 86400
+    where = "ts >= ?"
+    params: list = [since]
+    if user_id:
+        where += " AND user_id = ?"
+        params.append(user_id)
+    sums = ("COUNT(*) AS requests, COALESCE(SUM(prompt_tokens), 0) AS prompt_tokens, "
+            "COALESCE(SUM(completion_tokens), 0) AS completion_tokens, "
+            "COALESCE(ROUND(AVG(latency_ms)), 0) AS avg_latency_ms")
+    with _db() as conn:
+        totals = dict(conn.execute(f"SELECT {sums} FROM gpt_usage WHERE {where}", params).fetchone())
+        by_user = [dict(r) for r in conn.execute(
+            f"SELECT user_id, {sums} FROM gpt_usage WHERE {where} GROUP BY user_id ORDER BY SUM(prompt_tokens + completion_tokens) DESC", params)]
+        by_day = [dict(r) for r in conn.execute(
+            f"SELECT date(ts, 'unixepoch', 'localtime') AS day, {sums} FROM gpt_usage WHERE {where} GROUP BY day ORDER BY day", params)]
+        by_kind = [dict(r) for r in conn.execute(
+            f"SELECT kind, {sums} FROM gpt_usage WHERE {where} GROUP BY kind ORDER BY kind", params)]
+        recent_rows = [dict(r) for r in conn.execute(
+            f"SELECT ts, user_id, kind, model, prompt_tokens, completion_tokens, latency_ms, status "
+            f"FROM gpt_usage WHERE {where} ORDER BY ts DESC LIMIT ?", params + [recent])]
+    return {
+        "days": days,
+        "totals": totals,
+        "by_user": by_user,
+        "by_day": by_day,
+        "by_kind": by_kind,
+        "recent": recent_rows,
+        "budgets": {
+            "user_daily_tokens": _env_int("GPT_USER_DAILY_TOKEN_BUDGET"),
+            "global_tokens_per_minute": _env_int("GPT_GLOBAL_TOKENS_PER_MINUTE"),
+        },
+    }
@@ -0,0 +1,125 @@
+# bench_parse_records.py - Memory and time of the slotted parser records vs the previous plain dataclasses
+#
+# Usage (from backend/):  python -m benchmarks.bench_parse_records [--items 100000] [--outlines 2000] [--repeat 3]
+import argparse
+import gc
+import os
+import pickle
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from itertools import chain
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.outline_parser import (  # noqa: E402
+    DueItem, WeightItem, _parse_weights_loose, _parse_weights_near, _parse_weights_strict,
+    merge_weights_by_component, parse_outline_text,
+)
+
+@dataclass
+class LegacyDueItem:
+    kind: str
+    number: str
+    due_date_raw: str
+    due_time_raw: str
+    page: int
+
+@dataclass
+class LegacyWeightItem:
+    component: str
+    weight: float
+    page: int
+    raw: str
+
+COMPONENTS = ["Assignments", "Quizzes", "Midterm", "Final Exam", "Project", "Labs", "Participation"]
+MONTHS = ["January", "February", "March", "April", "September", "October", "November"]
+
+def build_outline(rng: random.Random) -> str:
+    """Synthetic outline: grading scheme summing to 100, assignment due lines, a midterm date and filler."""
+    comps = rng.sample(COMPONENTS, rng.randint(3, 6))
+    cuts = sorted(rng.sample(range(5, 100, 5), len(comps) - 1))
+    weights = [b - a for a, b in zip([0] + cuts, cuts + [100])]
+    lines = ["Course Outline", "", "Grading Scheme"]
+    lines += [f"{c} {w}%" if rng.random() < 0.5 else f"{w}% {c}" for c, w in zip(comps, weights)]
+    lines += ["", "Assignments"]
+    for n in range(1, rng.randint(2, 6)):
+        lines.append(f"Assignment {n}: Due {rng.choice(MONTHS)} {rng.randint(1, 28)}, 2026 11:59 PM")
+    lines += ["", f"The Midterm is scheduled for {rng.choice(MONTHS)} {rng.randint(1, 28)}, 2026 7:00-8:30 PM."]
+    lines += ["Late submissions lose 10% per day. Office hours are posted weekly."] * rng.randint(5, 40)
+    return "\n".join(lines)
+
+def fresh(s: str) -> str:
+    # A new string object each time, as the regex matches produce for every outline
+    return "".join(list(s))
+
+def make_records(weight_cls, due_cls, n: int):
+    rng = random.Random(0)
+    out = []
+    for i in range(n):
+        comp = rng.choice(COMPONENTS)
+        out.append(weight_cls(component=fresh(comp), weight=float(rng.randint(5, 40)), page=1, raw=f"{comp} 20%"))
+        out.append(due_cls(kind=fresh("Assignment"), number=str(i % 9), due_date_raw="March 15, 2026",
+                           due_time_raw="", page=1))
+    return out
+
+def measure(fn, repeat: int):
+    """(best wall time in ms, retained KB after the call, peak KB during it, result)."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+        del out
+    gc.collect()
+    tracemalloc.start()
+    out = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, current / 1024, peak / 1024, out
+
+def bench_records(n: int, repeat: int) -> None:
+    print(f"records: {n} weight + {n} due items")
+    print(f"{'':>10} | {'build ms':>9} {'retained KB':>11} | {'serialize ms':>12} {'peak KB':>9}")
+    for label, w_cls, d_cls, to_dict in [
+        ("dataclass", LegacyWeightItem, LegacyDueItem, asdict),
+        ("slotted", WeightItem, DueItem, lambda r: r.to_dict()),
+    ]:
+        build_ms, kept_kb, _, records = measure(lambda: make_records(w_cls, d_cls, n), repeat)
+        ser_ms, _, ser_kb, _ = measure(lambda: [to_dict(r) for r in records], repeat)
+        print(f"{label:>10} | {build_ms:>9.1f} {kept_kb:>11.0f} | {ser_ms:>12.1f} {ser_kb:>9.0f}")
+
+def bench_batch(outlines, repeat: int) -> None:
+    print(f"\nbatch: {len(outlines)} outlines")
+    parse_ms, kept_kb, peak_kb, results = measure(lambda: [parse_outline_text(t) for t in outlines], repeat)
+    pickled = sum(len(pickle.dumps(r, pickle.HIGHEST_PROTOCOL)) for r in results)
+    print(f"  parse_outline_text: {parse_ms:.0f} ms ({parse_ms / len(outlines):.2f} ms/outline), "
+          f"results {kept_kb:.0f} KB, peak {peak_kb:.0f} KB, pickled {pickled / 1024:.0f} KB")
+
+    pages = [[t] for t in outlines]
+    # Candidate weights for the merge technique: materialized per-extractor lists vs one streamed chain
+    materialized = lambda: [merge_weights_by_component(chain.from_iterable(
+        [list(_parse_weights_strict(p)), list(_parse_weights_loose(p)), list(_parse_weights_near(p))])) for p in pages]
+    streamed = lambda: [merge_weights_by_component(chain(
+        _parse_weights_strict(p), _parse_weights_loose(p), _parse_weights_near(p))) for p in pages]
+    for label, fn in [("lists", materialized), ("generators", streamed)]:
+        ms, _, peak_kb, merged = measure(fn, repeat)
+        print(f"  merge candidates ({label:>10}): {ms:.0f} ms, peak {peak_kb:.0f} KB, "
+              f"{sum(len(m) for m in merged)} merged weights")
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark outline parser record types")
+    ap.add_argument("--items", type=int, default=100000)
+    ap.add_argument("--outlines", type=int, default=2000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    bench_records(args.items, args.repeat)
+    rng = random.Random(1)
+    bench_batch([build_outline(rng) for _ in range(args.outlines)], args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# bench_pdf_tables.py - Table extraction time and accuracy per PDF_TABLE_PROFILE, against the previous every-page pass
+#
+# Usage (from backend/):  python -m benchmarks.bench_pdf_tables [--outlines 20] [--pages 6] [--dir outlines/]
+#
+# Without --dir, writes a synthetic corpus: grading schemes as ruled tables, unruled columns or prose,
+# on outlines whose other pages are text with the odd ruled schedule.
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.services.outline_parser as outline_parser  # noqa: E402
+from app.services.pdf_extract import extract_pdf_file  # noqa: E402
+from app.services.pdf_probe import ScannedPdfError  # noqa: E402
+from app.services.pdf_tables import TABLE_PROFILES, page_has_rulings  # noqa: E402
+
+COMPONENTS = ["Assignments", "Quizzes", "Midterm", "Final Exam", "Project", "Labs", "Participation"]
+LAYOUTS = ("ruled", "unruled", "prose")
+FILLER = "Office hours are posted weekly on the course page; late work loses a share of its marks per day."
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def write_pdf(path: str, pages: List[Tuple[List[Tuple[float, float, str]], List[Tuple[float, float, float, float]]]]) -> None:
+    """Minimal PDF: per page, (x, y, text) runs in Helvetica and (x0, y0, x1, y1) stroked lines."""
+    objs = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for texts, lines in pages:
+        ops = [f"BT /F1 10 Tf 1 0 0 1 {x:.1f} {y:.1f} Tm ({_escape(t)}) Tj ET" for x, y, t in texts]
+        ops += [f"{x0:.1f} {y0:.1f} m {x1:.1f} {y1:.1f} l S" for x0, y0, x1, y1 in lines]
+        content = "\n".join(ops).encode("latin-1")
+        objs.append(f"<< /Length {len(content)} >>\nstream\n{content.decode('latin-1')}\nendstream")
+        objs.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                    f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objs)} 0 R >>")
+        kids.append(f"{len(objs)} 0 R")
+    objs[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, body in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += f"{n} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+
+def _table(rows: List[List[str]], top: float, ruled: bool):
+    """Text runs (and grid lines when ruled) for a two-column table starting at y=top."""
+    cols, row_h = [72, 300, 420], 18
+    texts = [(cols[i] + 4, top - row_h * r - 13, cell) for r, row in enumerate(rows) for i, cell in enumerate(row)]
+    lines = []
+    if ruled:
+        bottom = top - row_h * len(rows)
+        lines += [(cols[0], top - row_h * r, cols[-1], top - row_h * r) for r in range(len(rows) + 1)]
+        lines += [(x, top, x, bottom) for x in cols]
+    return texts, lines
+
+def _prose(top: float, n: int):
+    return [(72, top - 14 * i, FILLER) for i in range(n)], []
+
+def build_outline(rng: random.Random, n_pages: int) -> Tuple[list, Dict[str, float], str]:
+    """(pages, expected weights, grading layout) for one synthetic outline."""
+    comps = rng.sample(COMPONENTS, rng.randint(3, 6))
+    cuts = sorted(rng.sample(range(5, 100, 5), len(comps) - 1))
+    expected = {c: float(b - a) for c, a, b in zip(comps, [0] + cuts, cuts + [100])}
+    layout = rng.choice(LAYOUTS)
+    pages = []
+    for n in range(n_pages):
+        texts, lines = _prose(740, 40)
+        if n == 0:
+            texts = [(72, 740, "Course Outline"), (72, 710, "Grading Scheme")]
+            if layout == "prose":
+                texts += [(72, 690 - 14 * i, f"{c} is worth {int(w)}% of the final grade.") for i, (c, w) in enumerate(expected.items())]
+            else:
+                t, lines = _table([["Component", "Weight"]] + [[c, f"{int(w)}%"] for c, w in expected.items()],
+                                  690, layout == "ruled")
+                texts += t
+        elif n == n_pages - 1 and rng.random() < 0.5:
+            # Ruled weekly schedule without weights
+            texts, lines = _table([["Week", "Topic"]] + [[f"Week {i}", f"Topic {i}"] for i in range(1, 13)], 740, True)
+        pages.append((texts, lines))
+    return pages, expected, layout
+
+def synthetic_corpus(directory: str, outlines: int, n_pages: int) -> List[Tuple[str, Optional[Dict], str]]:
+    rng = random.Random(0)
+    corpus = []
+    for i in range(outlines):
+        pages, expected, layout = build_outline(rng, n_pages)
+        path = os.path.join(directory, f"outline-{i:03d}.pdf")
+        write_pdf(path, pages)
+        corpus.append((path, expected, layout))
+    return corpus
+
+def scan_corpus(directory: str) -> List[Tuple[str, Optional[Dict], str]]:
+    return [(os.path.join(root, name), None, "-") for root, _, files in sorted(os.walk(directory))
+            for name in sorted(files) if name.lower().endswith(".pdf")]
+
+# extract_pdf_file result for PDFs the scanned-PDF probe rejects (real corpora have some)
+SCANNED = "scanned"
+
+def uncached_full_tables(pdf_path: str):
+    """The previous pass: default settings on every page, a fresh pdfplumber open per call."""
+    return outline_parser._extract_pdf_tables.__wrapped__(pdf_path, 0, 0, "full")
+
+def table_weights(path: str) -> List[Tuple[str, float]]:
+    return [(w.component, w.weight) for w in outline_parser.dedupe_weights(outline_parser._parse_weights_from_tables(path))]
+
+def run_profile(corpus, profile: Optional[str]) -> Dict:
+    """Times and results for one profile (None = the previous uncached every-page code)."""
+    os.environ["PDF_TABLE_PROFILE"] = profile or "full"
+    original = outline_parser.pdf_tables
+    if profile is None:
+        outline_parser.pdf_tables = uncached_full_tables
+    try:
+        tables, weights, extracted = {}, {}, {}
+        table_s = parse_s = extract_s = 0.0
+        for path, _, _ in corpus:
+            outline_parser._extract_pdf_tables.cache_clear()
+            start = time.perf_counter()
+            tables[path] = list(outline_parser.pdf_tables(path))
+            table_s += time.perf_counter() - start
+            outline_parser._extract_pdf_tables.cache_clear()
+            # What one PDF parse spends on tables when techniques 3 and 4 both run
+            start = time.perf_counter()
+            weights[path] = table_weights(path)
+            outline_parser.technique_4_merge(path, "", [])
+            parse_s += time.perf_counter() - start
+            start = time.perf_counter()
+            try:
+                extracted[path] = extract_pdf_file(path)
+            except ScannedPdfError:
+                extracted[path] = SCANNED  # rejected by the probe, as the upload endpoint would
+            extract_s += time.perf_counter() - start
+    finally:
+        outline_parser.pdf_tables = original
+    return {"tables": tables, "weights": weights, "extracted": extracted,
+            "table_ms": table_s * 1000, "parse_ms": parse_s * 1000, "extract_ms": extract_s * 1000}
+
+def exact_share(corpus, weights: Dict[str, List], layout: Optional[str] = None) -> Optional[float]:
+    scored = [(dict(weights[p]), e) for p, e, lay in corpus if e and (layout is None or lay == layout)]
+    if not scored:
+        return None
+    return sum(got == exp for got, exp in scored) / len(scored)
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark table-detection profiles")
+    ap.add_argument("--outlines", type=int, default=20)
+    ap.add_argument("--pages", type=int, default=6)
+    ap.add_argument("--dir", help="directory of real outline PDFs instead of the synthetic corpus")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = scan_corpus(args.dir) if args.dir else synthetic_corpus(tmp, args.outlines, args.pages)
+        import pdfplumber
+        n_pages = ruled = 0
+        for path, _, _ in corpus:
+            with pdfplumber.open(path) as pdf:
+                n_pages += len(pdf.pages)
+                ruled += sum(page_has_rulings(p) for p in pdf.pages)
+        print(f"{len(corpus)} PDFs, {n_pages} pages, {ruled} with ruling lines")
+
+        baseline = run_profile(corpus, None)
+        scanned = sum(text is SCANNED for text in baseline["extracted"].values())
+        if scanned:
+            print(f"{scanned} scanned PDFs (no text layer) counted as \"{SCANNED}\" in the extract column")
+        rows = [("previous", baseline)] + [(p, run_profile(corpus, p)) for p in TABLE_PROFILES]
+        print(f"{'profile':>9} | {'tables ms':>9} {'t3+t4 ms':>9} {'extract ms':>10} | "
+              f"{'same tables':>11} {'same weights':>12} {'same text':>9} | exact scheme: {'all':>4} {'ruled':>6} {'unruled':>7}")
+        for label, r in rows:
+            same = lambda key: sum(r[key][p] == baseline[key][p] for p, _, _ in corpus) / len(corpus)
+            acc = [exact_share(corpus, r["weights"], lay) for lay in (None, "ruled", "unruled")]
+            acc_cols = " ".join(f"{a:>{w}.0%}" if a is not None else f"{'-':>{w}}" for a, w in zip(acc, (4, 6, 7)))
+            print(f"{label:>9} | {r['table_ms']:>9.0f} {r['parse_ms']:>9.0f} {r['extract_ms']:>10.0f} | "
+                  f"{same('tables'):>11.0%} {same('weights'):>12.0%} {same('extracted'):>9.0%} | {'':>13} {acc_cols}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# bench_pre_process.py - Benchmark pre_process_outline against the previous multi-pass version
+#
+# Usage (from backend/):  python -m benchmarks.bench_pre_process [--size-kb 300] [--repeat 5] [--parity-cases 20000]
+#
+# Exits non-zero when the output differs from the legacy version on any parity case.
+import argparse
+import datetime
+import os
+import random
+import re
+import sys
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.gpt_client import pre_process_outline  # noqa: E402
+
+def legacy_pre_process_outline(text: str) -> str:
+    """Previous implementation: two searches, three full-document re.sub passes."""
+    year = str(datetime.date.today().year)
+    m = re.search(r'Assignments.*?due on\s+([^\.]+)', text, flags=re.IGNORECASE)
+    if m:
+        dates = re.split(r',\s*| and ', m.group(1))
+        items = []
+        for i, d in enumerate(dates, start=1):
+            d = d.strip()
+            if not re.search(r'\d{4}', d):
+                d = f"{d} {year}"
+            items.append(f"Assignment {i}, {d},")
+        text = "\n".join(items) + "\n" + text
+    m2 = re.search(r'Quizzes.*?weeks of\s+([^\.]+)', text, flags=re.IGNORECASE)
+    if m2:
+        dates = re.split(r',\s*| and ', m2.group(1))
+        items = []
+        for i, d in enumerate(dates, start=1):
+            d = d.strip()
+            if not re.search(r'\d{4}', d):
+                d = f"{d} {year}"
+            items.append(f"Quiz {i}, {d},")
+        text = "\n".join(items) + "\n" + text
+    text = re.sub(
+        r'([A-Z][^\n]+?)\s+is scheduled for\s+'
+        r'(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{1,2})(?!\s*\d{4})',
+        lambda m: f"{m.group(1)} — {m.group(2)} {m.group(3)} {year}",
+        text
+    )
+    text = re.sub(
+        r'\b(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{1,2})(?!\s*\d{4})\b',
+        rf'\1 \2 {year}',
+        text
+    )
+    def _add_year_to_label_date(match):
+        prefix, month, day = match.group(1), match.group(2), match.group(3)
+        return f"{prefix}{month} {day} {year}"
+    text = re.sub(
+        r'^([^:\n]+:\s*)(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{1,2})(?!\s*\d{4})\b',
+        _add_year_to_label_date,
+        text,
+        flags=re.MULTILINE
+    )
+    return text
+
+SAMPLE_OUTLINE = """\
+COURSE OUTLINE - ENGG 201
+Instructor office hours: Mondays 2-3pm, ICT 544.
+Assignments are due on February 1, February 14 and March 3.
+Quizzes are in Lab during the weeks of January 27, February 3, February 10 and March 17.
+The Midterm is scheduled for March 5 in the evening.
+Final Grade Determination
+Assignments 20%
+Quizzes 15%
+Midterm 25%
+Final Exam 40% (Registrar scheduled)
+Course Progress Checks
+Intro quiz: January 22
+Module 0: January 22
+Module 2: February 12, 2026
+Academic integrity: Students are expected to uphold standards of honesty. See the calendar.
+"""
+
+# A long single line (e.g. a PDF pasted without line breaks)
+LONG_LINE = ("Students Should Review The Academic Accommodation Policy Before January 10 " * 40).strip() + "\n"
+
+# Scheduled-phrase lines without a date; once made every region scan run to the end of the text
+SCHEDULED_NO_DATE = "Lab is scheduled for TBA in room 5\n"
+
+# Cases that once diverged from the legacy output
+REGRESSION_CASES = [
+    # the year sits past the end of the "is scheduled for" line region
+    "Project is scheduled for June 30 and July 2, \n\n\n\n   is scheduled for March 5 2025",
+    "The FinalMay 1" + " " * 40 + "is scheduled for March 5   \n" + " " * 40 + "2025May 1",
+    # no date after the phrase: each region scan must stop near the line, not at the end of the document
+    SCHEDULED_NO_DATE * 50 + "Exam: June 30",
+]
+
+# Pieces the parity fuzzer glues together: dates with and without a following year, the
+# "is scheduled for" phrase, label prefixes and whitespace runs that wrap lines. The
+# Assignments/Quizzes list headers are left to SAMPLE_OUTLINE: the legacy version also
+# searched its own prepended assignment lines for a quiz list.
+PARITY_FRAGMENTS = [
+    "June 30", "July 2", "March 5", "May 1", "December 12", " 2025", "2025", ", ", " and ", ". ", "x",
+    "Project", " Midterm ", "The Final", "Exam: ", "is scheduled for", "is scheduled for " * 3, SCHEDULED_NO_DATE,
+    " ", "   ", " " * 40, "\t", "\n", "\n\n\n\n",
+]
+
+def parity_corpus(cases: int, seed: int = 0):
+    """The sample outline, the regression cases, then `cases` seeded random fragment strings."""
+    yield SAMPLE_OUTLINE
+    yield from REGRESSION_CASES
+    rng = random.Random(seed)
+    for _ in range(cases):
+        yield "".join(rng.choice(PARITY_FRAGMENTS) for _ in range(rng.randint(1, 14)))
+
+def parity_mismatches(cases: int) -> list:
+    """Inputs whose output differs from the legacy implementation."""
+    return [text for text in parity_corpus(cases) if pre_process_outline(text) != legacy_pre_process_outline(text)]
+
+def build_input(size_kb: int) -> str:
+    """Repeat realistic outline text (plus pathological long lines and dateless schedule lines) up to ~size_kb."""
+    target = size_kb * 1024
+    parts = []
+    total = 0
+    i = 0
+    while total < target:
+        chunk = (LONG_LINE, SCHEDULED_NO_DATE * 20, SAMPLE_OUTLINE, SAMPLE_OUTLINE)[i % 4]
+        parts.append(chunk)
+        total += len(chunk)
+        i += 1
+    return "".join(parts)
+
+def time_fn(fn, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--size-kb", type=int, nargs="+", default=[100, 300, 600])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--parity-cases", type=int, default=20000, help="Random inputs checked against the legacy output")
+    args = ap.parse_args()
+
+    mismatches = parity_mismatches(args.parity_cases)
+    if mismatches:
+        for text in mismatches[:5]:
+            print(f"MISMATCH: {text!r}\n  current: {pre_process_outline(text)!r}\n  legacy:  {legacy_pre_process_outline(text)!r}")
+        sys.exit(f"FAIL: {len(mismatches)} inputs differ from the legacy implementation")
+    print(f"parity: {args.parity_cases + 1 + len(REGRESSION_CASES)} inputs match the legacy implementation")
+
+    print(f"{'size':>8} {'legacy (ms)':>12} {'current (ms)':>13} {'speedup':>8}")
+    for kb in args.size_kb:
+        text = build_input(kb)
+        legacy = time_fn(legacy_pre_process_outline, text, args.repeat)
+        current = time_fn(pre_process_outline, text, args.repeat)
+        print(f"{kb:>6}KB {legacy * 1000:>12.2f} {current * 1000:>13.2f} {legacy / current:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
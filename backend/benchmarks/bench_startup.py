@@ -0,0 +1,92 @@
+# bench_startup.py - Cold-start profile: per-module import time and an app-creation time budget
+#
+# Usage (from backend/):  python -m benchmarks.bench_startup [--budget-ms 500] [--repeat 5] [--top 15]
+#
+# Each run is a fresh interpreter so nothing is cached between samples. Exits non-zero when the
+# median startup exceeds the budget or a lazily-loaded dependency is imported at startup, so it
+# can gate a deploy without needing a database, API key or network.
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy dependencies that must only load on first use
+LAZY_MODULES = ("openai", "pdfplumber", "docx")
+
+STARTUP_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import run
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(f"{elapsed_ms:.1f}")
+print(",".join(m for m in %r if m in sys.modules))
+""" % (LAZY_MODULES,)
+
+def _run(args, extra_env=None):
+    env = dict(os.environ, OPENAI_API_KEY=os.getenv("OPENAI_API_KEY", "sk-startup-check"),
+               SUPABASE_JWT_SECRET=os.getenv("SUPABASE_JWT_SECRET", "startup-check"),
+               CALENDAR_FEED_SECRET=os.getenv("CALENDAR_FEED_SECRET", "startup-check"), **(extra_env or {}))
+    return subprocess.run([sys.executable, *args], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+
+def measure_startup():
+    """(milliseconds to import run.py and create the app, eagerly imported lazy modules)."""
+    out = _run(["-c", STARTUP_SNIPPET]).stdout.splitlines()
+    return float(out[0]), [m for m in out[1].split(",") if m]
+
+def import_profile():
+    """Self import time per third-party package and per backend module, from `python -X importtime`."""
+    err = _run(["-X", "importtime", "-c", "import run"]).stderr
+    totals = {}
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        try:
+            self_us = int(self_us)
+        except ValueError:  # header row
+            continue
+        name = name.strip()
+        # Our own modules are listed individually, dependencies rolled up by package
+        key = name if name == "run" or name.split(".")[0] == "app" else name.split(".")[0]
+        totals[key] = totals.get(key, 0) + self_us
+    return sorted(totals.items(), key=lambda kv: kv[1], reverse=True)
+
+def main():
+    ap = argparse.ArgumentParser(description="Profile backend cold start")
+    ap.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", "500")),
+                    help="Fail if the median startup is slower than this")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--top", type=int, default=15, help="Packages to list in the import profile")
+    args = ap.parse_args()
+
+    profile = import_profile()
+    print(f"{'module/package':<32} {'import ms':>10}")
+    for name, us in profile[:args.top]:
+        print(f"{name:<32} {us / 1000:>10.1f}")
+    print(f"{'total':<32} {sum(us for _, us in profile) / 1000:>10.1f}")
+
+    samples, eager = [], []
+    for _ in range(args.repeat):
+        ms, loaded = measure_startup()
+        samples.append(ms)
+        eager = loaded
+    median = statistics.median(samples)
+    print(f"\napp startup: median {median:.1f} ms, min {min(samples):.1f} ms over {args.repeat} runs "
+          f"(budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if eager:
+        print(f"FAIL: imported at startup but should load lazily: {', '.join(eager)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"FAIL: startup exceeds budget by {median - args.budget_ms:.1f} ms")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# gunicorn.conf.py - Production serving profiles (picked up automatically by `gunicorn run:app`)
+#
+# The API has two kinds of endpoints that want different worker models:
+#   io  - GPT parse endpoints and database reads. Requests spend their time waiting on
+#         OpenAI/Postgres, so a few processes with many threads (or gevent) serve them.
+#   cpu - /api/extract-outline. pdfplumber holds the GIL and its memory grows with each
+#         document, so it gets one sync worker per core, recycled every few hundred requests.
+#   all - both on one port, for platforms that run a single web process (Railway/Heroku).
+#
+# Run one gunicorn per pool and route /api/extract-outline to the cpu pool (deploy/nginx.conf):
+#   SERVING_POOL=io  gunicorn run:app
+#   SERVING_POOL=cpu gunicorn run:app
+import multiprocessing
+import os
+
+POOL = os.getenv("SERVING_POOL", "all")
+CPUS = multiprocessing.cpu_count()
+
+PROFILES = {
+    "io": {
+        "port": 5001,
+        "worker_class": "gthread",
+        "workers": 2,
+        "threads": 16,
+        # GPT calls plus GPT_BUDGET_QUEUE_SECONDS of queueing
+        "timeout": 180,
+        "max_requests": 2000,
+        "warm": ("openai",),
+    },
+    "cpu": {
+        "port": 5002,
+        "worker_class": "sync",
+        "workers": CPUS,
+        "threads": 1,
+        "timeout": 60,
+        # pdfplumber keeps page caches alive; recycle before they add up
+        "max_requests": 200,
+        "warm": ("pdfplumber",),
+    },
+    "all": {
+        "port": 5001,
+        "worker_class": "gthread",
+        "workers": max(2, CPUS),
+        "threads": 8,
+        "timeout": 180,
+        "max_requests": 500,
+        "warm": ("openai", "pdfplumber"),
+    },
+}
+
+if POOL not in PROFILES:
+    raise RuntimeError(f"SERVING_POOL must be one of {', '.join(PROFILES)} (got {POOL!r})")
+_profile = PROFILES[POOL]
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+wsgi_app = "run:app"
+bind = os.getenv("SERVING_BIND", f"0.0.0.0:{os.getenv('PORT', _profile['port'])}")
+worker_class = os.getenv("SERVING_WORKER_CLASS", _profile["worker_class"])
+workers = _env_int("SERVING_WORKERS", _profile["workers"])
+threads = _env_int("SERVING_THREADS", _profile["threads"])
+timeout = _env_int("SERVING_TIMEOUT", _profile["timeout"])
+graceful_timeout = 30
+keepalive = 5
+max_requests = _env_int("SERVING_MAX_REQUESTS", _profile["max_requests"])
+# Stagger restarts so workers don't all recycle at once
+max_requests_jitter = max_requests // 10
+# Import the app (OpenAI client, prompts, compiled regexes) once in the master; workers share it copy-on-write
+preload_app = os.getenv("SERVING_PRELOAD", "1") != "0"
+# Heartbeat files on tmpfs so a busy disk can't make the arbiter think workers hung
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+accesslog = "-"
+proc_name = f"studyplanner-{POOL}"
+
+def when_ready(server):
+    """Load the app's lazily-imported dependencies in the master so preloaded workers inherit them."""
+    if not preload_app:
+        return
+    if "openai" in _profile["warm"]:
+        from app.services.gpt_client import get_client
+        get_client()
+    for module in _profile["warm"]:
+        __import__(module)
+
+def post_fork(server, worker):
+    """Give each worker its own DB pool and extraction processes and, under gevent, cooperative psycopg2."""
+    import app as app_module
+    app_module._db_pool = None
+    if POOL in ("cpu", "all"):
+        # Start this web worker's extraction processes now rather than on the first upload
+        from app.services.extraction_pool import extraction_pool
+        pool = extraction_pool()
+        if pool:
+            pool.start()
+    if worker_class == "gevent":
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            server.log.warning("gevent workers without psycogreen: DB queries will block the worker")
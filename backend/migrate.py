@@ -0,0 +1,62 @@
+# migrate.py - Apply versioned SQL migrations from migrations/ to DATABASE_URL
+#
+# Usage (from backend/):
+#   python migrate.py           # apply pending migrations
+#   python migrate.py --status  # list applied / pending versions
+from dotenv import load_dotenv
+load_dotenv()
+import argparse
+import os
+import sys
+import psycopg2
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+def migration_files():
+    """(version, path) for every NNNN_name.sql file, in version order."""
+    out = []
+    for name in sorted(os.listdir(MIGRATIONS_DIR)):
+        if name.endswith(".sql") and name[:4].isdigit():
+            out.append((name[:-4], os.path.join(MIGRATIONS_DIR, name)))
+    return out
+
+def applied_versions(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version TEXT PRIMARY KEY,
+            applied_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+        )
+    """)
+    cur.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cur.fetchall()}
+
+def main():
+    ap = argparse.ArgumentParser(description="Apply versioned SQL migrations")
+    ap.add_argument("--status", action="store_true", help="only list applied/pending migrations")
+    args = ap.parse_args()
+
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    try:
+        with conn, conn.cursor() as cur:
+            done = applied_versions(cur)
+        for version, path in migration_files():
+            if version in done:
+                print(f"  applied  {version}")
+                continue
+            if args.status:
+                print(f"  pending  {version}")
+                continue
+            # One transaction per migration: a failing file leaves no partial state
+            with conn, conn.cursor() as cur:
+                with open(path, encoding="utf-8") as f:
+                    cur.execute(f.read())
+                cur.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+            print(f"  applied  {version} (new)")
+    except psycopg2.Error as e:
+        print(f"Migration failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
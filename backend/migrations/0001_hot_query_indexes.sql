@@ -0,0 +1,46 @@
+-- 0001_hot_query_indexes.sql - Composite and partial indexes for the per-user screens
+-- Every screen filters by user (RLS: auth.uid() = user_id) and a time/course column;
+-- without these the planner falls back to sequential scans of events/todos/courses.
+-- Safe to run multiple times (uses IF NOT EXISTS). Apply with: python migrate.py
+
+-- Home "upcoming deadlines" (fetchUpcomingEvents) and Calendar:
+--   WHERE user_id = ? AND start_time BETWEEN ? AND ? ORDER BY start_time
+CREATE INDEX IF NOT EXISTS events_user_start_time_idx
+    ON events (user_id, start_time);
+
+-- CoursePage: WHERE course_id = ? ORDER BY date
+CREATE INDEX IF NOT EXISTS events_course_date_idx
+    ON events (course_id, date);
+
+-- Grade calculations only read included items: WHERE course_id = ? AND included = TRUE
+CREATE INDEX IF NOT EXISTS events_course_included_idx
+    ON events (course_id, date)
+    INCLUDE (percent, score_received, score_total)
+    WHERE included = TRUE;
+
+-- Upcoming graded deadlines across courses: WHERE user_id = ? AND included = TRUE AND start_time >= ?
+CREATE INDEX IF NOT EXISTS events_user_start_time_included_idx
+    ON events (user_id, start_time)
+    WHERE included = TRUE;
+
+-- TodosPage / Home (fetchTodos): WHERE user_id = ? ORDER BY due_date
+CREATE INDEX IF NOT EXISTS todos_user_due_date_idx
+    ON todos (user_id, due_date);
+
+-- Open to-dos only: WHERE user_id = ? AND completed = FALSE ORDER BY due_date
+CREATE INDEX IF NOT EXISTS todos_user_open_due_date_idx
+    ON todos (user_id, due_date)
+    WHERE completed = FALSE;
+
+-- Home course list: WHERE user_id = ? ORDER BY inserted_at DESC
+CREATE INDEX IF NOT EXISTS courses_user_inserted_at_idx
+    ON courses (user_id, inserted_at DESC);
+
+-- Profile / is_admin lookups: WHERE user_id = ?
+CREATE INDEX IF NOT EXISTS profiles_user_id_idx
+    ON profiles (user_id);
+
+ANALYZE events;
+ANALYZE todos;
+ANALYZE courses;
+ANALYZE profiles;
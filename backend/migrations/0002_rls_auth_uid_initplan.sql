@@ -0,0 +1,39 @@
+-- 0002_rls_auth_uid_initplan.sql - Evaluate auth.uid() once per statement in RLS policies
+-- "auth.uid() = user_id" calls auth.uid() for every row, which also stops the planner from
+-- using the user_id indexes from 0001. "(select auth.uid())" is planned as an InitPlan:
+-- evaluated once, then compared against the index like a constant.
+-- Safe to run multiple times (drops and recreates the same policies).
+
+DROP POLICY IF EXISTS "Users can view own profile" ON profiles;
+DROP POLICY IF EXISTS "Users can update own profile" ON profiles;
+DROP POLICY IF EXISTS "Users can insert own profile" ON profiles;
+CREATE POLICY "Users can view own profile" ON profiles FOR SELECT USING ((select auth.uid()) = user_id);
+CREATE POLICY "Users can update own profile" ON profiles FOR UPDATE USING ((select auth.uid()) = user_id);
+CREATE POLICY "Users can insert own profile" ON profiles FOR INSERT WITH CHECK ((select auth.uid()) = user_id);
+
+DROP POLICY IF EXISTS "Users can view own courses" ON courses;
+DROP POLICY IF EXISTS "Users can insert own courses" ON courses;
+DROP POLICY IF EXISTS "Users can update own courses" ON courses;
+DROP POLICY IF EXISTS "Users can delete own courses" ON courses;
+CREATE POLICY "Users can view own courses" ON courses FOR SELECT USING ((select auth.uid()) = user_id);
+CREATE POLICY "Users can insert own courses" ON courses FOR INSERT WITH CHECK ((select auth.uid()) = user_id);
+CREATE POLICY "Users can update own courses" ON courses FOR UPDATE USING ((select auth.uid()) = user_id);
+CREATE POLICY "Users can delete own courses" ON courses FOR DELETE USING ((select auth.uid()) = user_id);
+
+DROP POLICY IF EXISTS "Users can view own events" ON events;
+DROP POLICY IF EXISTS "Users can insert own events" ON events;
+DROP POLICY IF EXISTS "Users can update own events" ON events;
+DROP POLICY IF EXISTS "Users can delete own events" ON events;
+CREATE POLICY "Users can view own events" ON events FOR SELECT USING ((select auth.uid()) = user_id);
+CREATE POLICY "Users can insert own events" ON events FOR INSERT WITH CHECK ((select auth.uid()) = user_id);
+CREATE POLICY "Users can update own events" ON events FOR UPDATE USING ((select auth.uid()) = user_id);
+CREATE POLICY "Users can delete own events" ON events FOR DELETE USING ((select auth.uid()) = user_id);
+
+DROP POLICY IF EXISTS "Users can view own todos" ON todos;
+DROP POLICY IF EXISTS "Users can insert own todos" ON todos;
+DROP POLICY IF EXISTS "Users can update own todos" ON todos;
+DROP POLICY IF EXISTS "Users can delete own todos" ON todos;
+CREATE POLICY "Users can view own todos" ON todos FOR SELECT USING ((select auth.uid()) = user_id);
+CREATE POLICY "Users can insert own todos" ON todos FOR INSERT WITH CHECK ((select auth.uid()) = user_id);
+CREATE POLICY "Users can update own todos" ON todos FOR UPDATE USING ((select auth.uid()) = user_id);
+CREATE POLICY "Users can delete own todos" ON todos FOR DELETE USING ((select auth.uid()) = user_id);
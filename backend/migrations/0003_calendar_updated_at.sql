@@ -0,0 +1,33 @@
+-- 0003_calendar_updated_at.sql - Modification timestamps for calendar ETags and feed caching
+-- The frontend writes events/courses straight to Supabase, so the backend cannot invalidate
+-- caches on write. Instead /api/calendar derives a version from COUNT(*) + MAX(updated_at)
+-- per user: inserts and edits bump MAX(updated_at), deletes change COUNT(*).
+
+ALTER TABLE events ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE courses ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+UPDATE events SET updated_at = COALESCE(inserted_at, NOW()) WHERE updated_at IS NULL;
+UPDATE courses SET updated_at = COALESCE(inserted_at, NOW()) WHERE updated_at IS NULL;
+
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS events_set_updated_at ON events;
+CREATE TRIGGER events_set_updated_at BEFORE UPDATE ON events
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS courses_set_updated_at ON courses;
+CREATE TRIGGER courses_set_updated_at BEFORE UPDATE ON courses
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+-- Calendar version check: WHERE user_id = ? -> MAX(updated_at) from the index end
+CREATE INDEX IF NOT EXISTS events_user_updated_at_idx
+    ON events (user_id, updated_at);
+CREATE INDEX IF NOT EXISTS courses_user_updated_at_idx
+    ON courses (user_id, updated_at);
+
+ANALYZE events;
+ANALYZE courses;
@@ -0,0 +1,22 @@
+-- 0004_course_grade_summaries.sql - Stored per-course grade totals for the backend grade engine
+-- Totals are updated incrementally when one event's score/included flag changes through
+-- PATCH /api/events/<id>/grade. events_version (COUNT + MAX(updated_at) of the course's
+-- events, see 0003) detects writes made elsewhere; a mismatch triggers a full recompute.
+
+CREATE TABLE IF NOT EXISTS course_grade_summaries (
+    course_id INTEGER PRIMARY KEY REFERENCES courses(id) ON DELETE CASCADE,
+    user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE,
+    earned DOUBLE PRECISION NOT NULL DEFAULT 0,
+    graded_weight DOUBLE PRECISION NOT NULL DEFAULT 0,
+    included_weight DOUBLE PRECISION NOT NULL DEFAULT 0,
+    graded_count INTEGER NOT NULL DEFAULT 0,
+    item_count INTEGER NOT NULL DEFAULT 0,
+    included_by_group JSONB NOT NULL DEFAULT '{}',
+    events_version TEXT,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE course_grade_summaries ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Users can view own grade summaries" ON course_grade_summaries;
+CREATE POLICY "Users can view own grade summaries" ON course_grade_summaries
+    FOR SELECT USING ((select auth.uid()) = user_id);
@@ -0,0 +1,57 @@
+-- 0005_todos_archive.sql - Keyset pagination indexes, completed_at, and a cold archive for old to-dos
+-- The backend todos API pages with (due_date, id) keyset cursors and moves items completed
+-- more than TODO_ARCHIVE_AFTER_DAYS ago into todos_archive, so the hot table only holds
+-- open and recently completed to-dos.
+
+ALTER TABLE todos ADD COLUMN IF NOT EXISTS completed_at TIMESTAMP WITH TIME ZONE;
+UPDATE todos SET completed_at = COALESCE(inserted_at, NOW()) WHERE completed AND completed_at IS NULL;
+
+CREATE OR REPLACE FUNCTION set_todo_completed_at() RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.completed AND (TG_OP = 'INSERT' OR NOT OLD.completed) THEN
+        NEW.completed_at = NOW();
+    ELSIF NOT NEW.completed THEN
+        NEW.completed_at = NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS todos_set_completed_at ON todos;
+CREATE TRIGGER todos_set_completed_at BEFORE INSERT OR UPDATE OF completed ON todos
+    FOR EACH ROW EXECUTE FUNCTION set_todo_completed_at();
+
+-- Keyset pages: WHERE user_id = ? AND (due_date, id) > (?, ?) ORDER BY due_date, id
+-- (supersede the (user_id, due_date) indexes from 0001)
+CREATE INDEX IF NOT EXISTS todos_user_due_date_id_idx
+    ON todos (user_id, due_date, id);
+CREATE INDEX IF NOT EXISTS todos_user_open_due_date_id_idx
+    ON todos (user_id, due_date, id)
+    WHERE completed = FALSE;
+DROP INDEX IF EXISTS todos_user_due_date_idx;
+DROP INDEX IF EXISTS todos_user_open_due_date_idx;
+
+-- Archiver: WHERE completed AND completed_at < ?
+CREATE INDEX IF NOT EXISTS todos_completed_at_idx
+    ON todos (completed_at)
+    WHERE completed = TRUE;
+
+CREATE TABLE IF NOT EXISTS todos_archive (
+    id INTEGER PRIMARY KEY,
+    user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    due_date DATE,
+    completed BOOLEAN DEFAULT TRUE,
+    inserted_at TIMESTAMP WITH TIME ZONE,
+    completed_at TIMESTAMP WITH TIME ZONE,
+    archived_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS todos_archive_user_due_date_id_idx
+    ON todos_archive (user_id, due_date, id);
+
+ALTER TABLE todos_archive ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Users can view own archived todos" ON todos_archive;
+CREATE POLICY "Users can view own archived todos" ON todos_archive
+    FOR SELECT USING ((select auth.uid()) = user_id);
+
+ANALYZE todos;
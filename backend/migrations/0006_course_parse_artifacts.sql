@@ -0,0 +1,17 @@
+-- 0006_course_parse_artifacts.sql - Outline text and parse artifacts stored per course
+-- The artifact (JSONB, TOAST-compressed) holds a hash and a regex-parser signature per outline
+-- section plus the parsed items, so a re-parse after a small edit only re-processes the sections
+-- whose text changed and can return an item-level diff. Written by the backend only.
+
+CREATE TABLE IF NOT EXISTS course_parse_artifacts (
+    course_id INTEGER PRIMARY KEY REFERENCES courses(id) ON DELETE CASCADE,
+    user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE,
+    outline_text TEXT NOT NULL,
+    artifact JSONB NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE course_parse_artifacts ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Users can view own parse artifacts" ON course_parse_artifacts;
+CREATE POLICY "Users can view own parse artifacts" ON course_parse_artifacts
+    FOR SELECT USING ((select auth.uid()) = user_id);
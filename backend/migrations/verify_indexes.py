@@ -0,0 +1,154 @@
+# verify_indexes.py - Check with EXPLAIN that the hot per-user queries use the 0001 indexes
+#
+# Seeds a large synthetic dataset into a scratch schema (copies of courses/events/todos/profiles),
+# applies the index migrations (INDEX_MIGRATIONS) there, runs EXPLAIN on each hot query and checks which index
+# the planner picks. Everything runs in one transaction that is rolled back - nothing is kept.
+#
+# Usage (from backend/):  python migrations/verify_indexes.py [--users 2000]
+from dotenv import load_dotenv
+load_dotenv()
+import argparse
+import json
+import os
+import sys
+import psycopg2
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRATCH = "index_check"
+
+# (description, SQL with %(user_id)s / %(course_id)s, expected index)
+# Migrations whose indexes the hot queries rely on, applied in order to the scratch schema
+INDEX_MIGRATIONS = ("0001_hot_query_indexes.sql", "0005_todos_archive.sql")
+
+HOT_QUERIES = [
+    ("upcoming events (fetchUpcomingEvents)",
+     "SELECT id, name, start_time, end_time FROM events "
+     "WHERE user_id = %(user_id)s AND start_time >= now() AND start_time <= now() + interval '7 days' "
+     "ORDER BY start_time",
+     "events_user_start_time_idx"),
+    ("course events (CoursePage)",
+     "SELECT id, name, date, percent, score_received, score_total, included FROM events "
+     "WHERE course_id = %(course_id)s ORDER BY date",
+     "events_course_date_idx"),
+    ("included course events (grade totals)",
+     "SELECT percent, score_received, score_total FROM events "
+     "WHERE course_id = %(course_id)s AND included = TRUE",
+     "events_course_included_idx"),
+    ("todos by due date (fetchTodos)",
+     "SELECT id, title, due_date, completed FROM todos WHERE user_id = %(user_id)s ORDER BY due_date",
+     "todos_user_due_date_id_idx"),
+    ("open todos",
+     "SELECT id, title, due_date FROM todos WHERE user_id = %(user_id)s AND completed = FALSE "
+     "ORDER BY due_date LIMIT 20",
+     "todos_user_open_due_date_id_idx"),
+    ("open todos, next page (keyset cursor)",
+     "SELECT id, title, due_date FROM todos WHERE user_id = %(user_id)s AND completed = FALSE "
+     "AND (due_date, id) > (CURRENT_DATE, 0) ORDER BY due_date, id LIMIT 50",
+     "todos_user_open_due_date_id_idx"),
+    ("courses (Home)",
+     "SELECT id, title, color, inserted_at FROM courses WHERE user_id = %(user_id)s ORDER BY inserted_at DESC",
+     "courses_user_inserted_at_idx"),
+    ("profile lookup",
+     "SELECT is_admin FROM profiles WHERE user_id = %(user_id)s",
+     "profiles_user_id_idx"),
+]
+
+SEED_SQL = """
+CREATE SCHEMA {s};
+CREATE TABLE {s}.profiles (LIKE public.profiles INCLUDING DEFAULTS);
+CREATE TABLE {s}.courses (LIKE public.courses INCLUDING DEFAULTS);
+CREATE TABLE {s}.events (LIKE public.events INCLUDING DEFAULTS);
+CREATE TABLE {s}.todos (LIKE public.todos INCLUDING DEFAULTS);
+ALTER TABLE {s}.profiles ADD PRIMARY KEY (id);
+ALTER TABLE {s}.courses ADD PRIMARY KEY (id);
+ALTER TABLE {s}.events ADD PRIMARY KEY (id);
+ALTER TABLE {s}.todos ADD PRIMARY KEY (id);
+
+CREATE TEMP TABLE seed_users ON COMMIT DROP AS
+    SELECT g AS n, gen_random_uuid() AS user_id FROM generate_series(1, %(users)s) g;
+
+INSERT INTO {s}.profiles (id, user_id, is_admin)
+    SELECT n, user_id, n = 1 FROM seed_users;
+
+-- 6 courses per user
+INSERT INTO {s}.courses (id, user_id, title, inserted_at)
+    SELECT (u.n - 1) * 6 + c, u.user_id, 'COURSE ' || c, now() - (c || ' days')::interval
+    FROM seed_users u, generate_series(1, 6) c;
+
+-- 30 graded items per course spread over a term, some dropped (included = FALSE)
+INSERT INTO {s}.events (id, course_id, user_id, name, date, start_time, end_time, percent, included)
+    SELECT (co.id - 1) * 30 + e, co.id, co.user_id, 'Item ' || e,
+           (now() + ((e * 4 - 60) || ' days')::interval)::date,
+           now() + ((e * 4 - 60) || ' days')::interval,
+           now() + ((e * 4 - 60) || ' days')::interval + interval '30 minutes',
+           100.0 / 30, e %% 10 <> 0
+    FROM {s}.courses co, generate_series(1, 30) e;
+
+-- 150 to-dos per user, most already completed
+INSERT INTO {s}.todos (id, user_id, title, due_date, completed)
+    SELECT (u.n - 1) * 150 + t, u.user_id, 'Todo ' || t,
+           (now() + ((t - 120) || ' days')::interval)::date, t < 120
+    FROM seed_users u, generate_series(1, 150) t;
+"""
+
+def plan_index_names(plan: dict) -> set:
+    """All index names used anywhere in an EXPLAIN (FORMAT JSON) plan tree."""
+    names = set()
+    if "Index Name" in plan:
+        names.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        names |= plan_index_names(child)
+    return names
+
+def plan_node_types(plan: dict) -> list:
+    types = [plan.get("Node Type")]
+    for child in plan.get("Plans", []):
+        types += plan_node_types(child)
+    return types
+
+def main():
+    ap = argparse.ArgumentParser(description="Verify hot queries use the 0001 indexes")
+    ap.add_argument("--users", type=int, default=2000, help="synthetic users to seed (default 2000)")
+    args = ap.parse_args()
+
+    index_sql = []
+    for name in INDEX_MIGRATIONS:
+        with open(os.path.join(HERE, name), encoding="utf-8") as f:
+            index_sql.append(f.read())
+
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    failures = 0
+    try:
+        with conn.cursor() as cur:
+            print(f"Seeding {args.users} users into scratch schema '{SCRATCH}'...")
+            cur.execute(SEED_SQL.format(s=SCRATCH), {"users": args.users})
+            cur.execute(f"SET LOCAL search_path = {SCRATCH}, public")
+            for sql in index_sql:
+                cur.execute(sql)
+            cur.execute("SELECT user_id FROM profiles ORDER BY id LIMIT 1 OFFSET %s", (args.users // 2,))
+            user_id = cur.fetchone()[0]
+            cur.execute("SELECT id FROM courses WHERE user_id = %s LIMIT 1", (user_id,))
+            course_id = cur.fetchone()[0]
+            params = {"user_id": user_id, "course_id": course_id}
+            for desc, sql, expected in HOT_QUERIES:
+                cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+                plan = cur.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                root = plan[0]["Plan"]
+                used = plan_index_names(root)
+                ok = expected in used
+                failures += not ok
+                status = "OK  " if ok else "FAIL"
+                detail = ", ".join(sorted(used)) or " -> ".join(t for t in plan_node_types(root) if t)
+                print(f"  {status} {desc}: expected {expected}; planner used {detail} (cost {root['Total Cost']:.1f})")
+    finally:
+        conn.rollback()
+        conn.close()
+    if failures:
+        print(f"{failures} hot quer{'y' if failures == 1 else 'ies'} not using the expected index")
+        sys.exit(1)
+    print("All hot queries use their indexes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# parse_batch.py - Re-parse an archive of outlines across all cores, writing one JSON line per file
+#
+# Usage (from backend/):
+#   python parse_batch.py outlines/ -o results.jsonl             # every .pdf/.docx/.txt/.md under outlines/
+#   python parse_batch.py --manifest manifest.jsonl -o results.jsonl --workers 8
+#   python parse_batch.py outlines/ -o results.jsonl --resume    # continue after an interruption
+#   python parse_batch.py outlines/ -o results.jsonl --stats-out technique_stats.json
+#
+# A manifest has one path per line, or JSON lines {"path": ..., "expected": {"Midterm": 30, ...}};
+# files with expected weights are scored for accuracy in the summary.
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.services.extraction_pool import ExtractionError, ExtractionPool
+from app.services.outline_parser import (
+    ParseResult, TEXT_OUTLINE_EXTENSIONS, build_unified_items, record_technique_run, save_technique_stats,
+)
+
+OUTLINE_EXTENSIONS = (".pdf", ".docx") + TEXT_OUTLINE_EXTENSIONS
+PROGRESS_EVERY_SECONDS = 10
+WORKER_MAX_JOBS = 200  # recycle each worker process after this many files
+# Fields kept in memory per file for the summary (full records only go to the JSONL file)
+SUMMARY_FIELDS = ("ok", "seconds", "bytes", "method", "weight_ok", "error", "accuracy", "plan")
+
+def iter_inputs(directory: Optional[str], manifest: Optional[str]) -> Iterator[Tuple[str, Optional[Dict]]]:
+    """(path, expected weights or None) in a stable order."""
+    if manifest:
+        with open(manifest, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith("{"):
+                    entry = json.loads(line)
+                    yield entry["path"], entry.get("expected")
+                else:
+                    yield line, None
+        return
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(OUTLINE_EXTENSIONS):
+                yield os.path.join(root, name), None
+
+def load_done(output: str) -> Dict[str, Dict]:
+    """Records already written (last line per path wins); drops a line cut off by an interruption."""
+    done: Dict[str, Dict] = {}
+    good_bytes = 0
+    with open(output, "rb") as f:
+        for raw in f:
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                break
+            done[record["path"]] = summary_fields(record)
+            good_bytes += len(raw)
+    if good_bytes < os.path.getsize(output):
+        with open(output, "r+b") as f:
+            f.truncate(good_bytes)
+    return done
+
+def summary_fields(record: Dict) -> Dict:
+    return {k: record[k] for k in SUMMARY_FIELDS if k in record}
+
+def score_weights(weights: List[Dict], expected: Dict[str, float]) -> Dict:
+    """Component/weight matches against the expected scheme (names compared case-insensitively)."""
+    parsed = {w["component"].lower(): w["weight"] for w in weights}
+    matched = sum(1 for comp, w in expected.items() if abs(parsed.get(comp.lower(), -1) - float(w)) < 0.01)
+    return {"matched": matched, "expected": len(expected), "parsed": len(parsed),
+            "exact": matched == len(expected) == len(parsed)}
+
+def to_record(path: str, expected: Optional[Dict], result: ParseResult, seconds: float, size: int) -> Dict:
+    d = result.to_dict()
+    record = {
+        "path": path,
+        "ok": True,
+        "seconds": round(seconds, 3),
+        "bytes": size,
+        "method": d["method"],
+        "weight_ok": d["weight_ok"],
+        "total_weight": d["total_weight"],
+        "weights": [{"component": w["component"], "weight": w["weight"]} for w in d["weights"]],
+        "dues": d["dues"],
+        "warnings": d["warnings"],
+        "plan": d["plan"],
+        "items": build_unified_items(result),
+    }
+    if expected:
+        record["accuracy"] = score_weights(record["weights"], expected)
+    return record
+
+def parse_one(pool: ExtractionPool, path: str, expected: Optional[Dict]) -> Dict:
+    start = time.perf_counter()
+    try:
+        size = os.path.getsize(path)
+        result = pool.run("parse_outline_file", path)
+    except (OSError, ExtractionError) as e:
+        record = {"path": path, "ok": False, "seconds": round(time.perf_counter() - start, 3), "error": str(e)}
+        if getattr(e, "code", None):
+            record["code"] = e.code  # e.g. "scanned_pdf": rejected by the text-layer probe, not a parser failure
+        return record
+    return to_record(path, expected, result, time.perf_counter() - start, size)
+
+def print_summary(records: List[Dict], new: int, elapsed: float, new_bytes: int) -> None:
+    """Throughput for this run; failure, timing, method and accuracy stats over the whole output file."""
+    ok = [r for r in records if r["ok"]]
+    failed = [r for r in records if not r["ok"]]
+    print(f"\n{len(records)} files ({new} parsed this run in {elapsed:.1f}s: "
+          f"{new / elapsed if elapsed else 0:.1f} files/s, {new_bytes / 1048576 / elapsed if elapsed else 0:.1f} MB/s)")
+    print(f"  ok       {len(ok)}")
+    print(f"  failed   {len(failed)}")
+    for error, n in Counter(r.get("error") for r in failed).most_common(5):
+        print(f"           {n} x {error}")
+    if ok:
+        times = sorted(r["seconds"] for r in ok)
+        p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+        print(f"  seconds  median {statistics.median(times):.3f}, p95 {p95:.3f}, max {times[-1]:.3f}")
+        print(f"  weights sum to 100: {sum(r['weight_ok'] for r in ok) / len(ok):.1%}")
+        print("  methods  " + ", ".join(f"{m} {n}" for m, n in Counter(r["method"] for r in ok).most_common()))
+        runs: Dict[str, List[Dict]] = {}
+        for r in ok:
+            for run in (r.get("plan") or {}).get("ran", []):
+                runs.setdefault(run["technique"], []).append(run)
+        for name, rs in sorted(runs.items()):
+            print(f"  {name:26} ran {len(rs):>5}, succeeded {sum(x['ok'] for x in rs):>5}, "
+                  f"{sum(x['ms'] for x in rs) / 1000:.1f}s total")
+    scored = [r["accuracy"] for r in ok if "accuracy" in r]
+    if scored:
+        matched = sum(a["matched"] for a in scored)
+        recall = matched / (sum(a["expected"] for a in scored) or 1)
+        precision = matched / (sum(a["parsed"] for a in scored) or 1)
+        exact = sum(a["exact"] for a in scored) / len(scored)
+        print(f"  accuracy ({len(scored)} scored files): weight recall {recall:.1%}, precision {precision:.1%}, "
+              f"exact scheme {exact:.1%}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Batch-parse course outlines to JSONL")
+    ap.add_argument("directory", nargs="?", help="directory scanned recursively for .pdf/.docx/.txt/.md files")
+    ap.add_argument("--manifest", help="file listing paths (or JSON lines with path/expected) instead of a directory")
+    ap.add_argument("-o", "--output", required=True, help="JSONL file, one record per input file")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--resume", action="store_true", help="skip files already in --output and append the rest")
+    ap.add_argument("--retry-failed", action="store_true", help="with --resume, parse previously failed files again")
+    ap.add_argument("--timeout", type=float, default=120, help="wall-clock seconds per file")
+    ap.add_argument("--cpu-seconds", type=int, default=90, help="CPU seconds per file")
+    ap.add_argument("--memory-mb", type=int, default=2048, help="address-space cap per worker process")
+    ap.add_argument("--stats-out", help="write technique cost/success stats from this run for OUTLINE_TECHNIQUE_STATS")
+    args = ap.parse_args()
+    if bool(args.directory) == bool(args.manifest):
+        ap.error("give either a directory or --manifest")
+
+    done: Dict[str, Dict] = {}
+    if os.path.exists(args.output):
+        if not args.resume:
+            ap.error(f"{args.output} exists; pass --resume to continue it")
+        done = load_done(args.output)
+        if args.retry_failed:
+            done = {p: r for p, r in done.items() if r["ok"]}
+    todo = [(p, e) for p, e in iter_inputs(args.directory, args.manifest) if p not in done]
+    print(f"{len(done)} already done, {len(todo)} to parse with {args.workers} workers", file=sys.stderr)
+
+    # Same isolated workers the web app uses: a file that hangs, crashes or blows a limit fails alone
+    pool = ExtractionPool(args.workers, timeout=args.timeout, cpu_seconds=args.cpu_seconds,
+                          memory_mb=args.memory_mb, max_jobs=WORKER_MAX_JOBS, queue_seconds=args.timeout * 2)
+    pool.start()
+    records = dict(done)
+    start = last_report = time.perf_counter()
+    new = new_bytes = 0
+    pending = set()
+    inputs = iter(todo)
+    interrupted = False
+    with open(args.output, "a", encoding="utf-8") as out, ThreadPoolExecutor(args.workers) as threads:
+        while True:
+            # Keep every worker busy without queueing the whole archive as futures
+            while not interrupted and len(pending) < args.workers * 2:
+                nxt = next(inputs, None)
+                if nxt is None:
+                    break
+                pending.add(threads.submit(parse_one, pool, *nxt))
+            if not pending:
+                break
+            try:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            except KeyboardInterrupt:
+                if interrupted:
+                    os._exit(130)  # second Ctrl-C: every finished file is already on disk
+                interrupted = True
+                queued = [f for f in pending if f.cancel()]
+                pending -= set(queued)
+                print(f"\nInterrupted; finishing {len(pending)} files in flight (Ctrl-C again to abort)",
+                      file=sys.stderr)
+                continue
+            for fut in finished:
+                record = fut.result()
+                # Flushed per line, so an interrupted run loses at most the files still in flight
+                out.write(json.dumps(record, separators=(",", ":")) + "\n")
+                out.flush()
+                records[record["path"]] = summary_fields(record)
+                plan = record.get("plan")
+                for run in plan["ran"] if plan else []:
+                    record_technique_run(plan["signal"], run["technique"], run["ms"], plan["pages"], run["ok"])
+                new += 1
+                new_bytes += record.get("bytes", 0)
+            now = time.perf_counter()
+            if now - last_report >= PROGRESS_EVERY_SECONDS:
+                last_report = now
+                print(f"  {new}/{len(todo)} parsed, {new / (now - start):.1f} files/s", file=sys.stderr)
+    pool.stop()
+    if args.stats_out:
+        save_technique_stats(args.stats_out)
+    if interrupted:
+        print("Rerun with --resume to continue", file=sys.stderr)
+    print_summary(list(records.values()), new, time.perf_counter() - start, new_bytes)
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ import { useState, useMemo } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { useAuth } from '../context/AuthContext.jsx'
 import { useTheme } from '../context/ThemeContext.jsx'
-import { supabase } from '../lib/supabaseClient.js'
+import { bulkWriteEvents } from '../services/eventApi.js'
 import { getOptionalGroupToggleable, getComponentBase, getGroupMaxIncluded } from '../lib/gradeUtils.js'
 import toast from 'react-hot-toast'
 import PlannerForm from './PlannerForm.jsx'
@@ -15,13 +15,16 @@ export default function AddPage() {
   const [title, setTitle] = useState('')
   const [outlineText, setOutlineText] = useState('')
   const [parsedItems, setParsedItems] = useState([])
+  // Outline as parsed (before any edits), stored with the course so later edits re-parse incrementally
+  const [parsedOutline, setParsedOutline] = useState(null)
   const [previewMode, setPreviewMode] = useState(false)
   const [saving, setSaving] = useState(false)
   // Max allowed "included" per optional group (N in "best N of M") - captured at parse time
   const [groupMaxIncluded, setGroupMaxIncluded] = useState(() => new Map())
 
   // After GPT parsing, switch to preview mode
-  function handleParsed(items) {
+  function handleParsed(items, answers = []) {
+    setParsedOutline({ text: outlineText, answers, items })
     // Convert any human-readable dates to YYYY-MM-DD format
     const convertedItems = items.map(item => {
       if (item.date && !/^\d{4}-\d{2}-\d{2}$/.test(item.date)) {
@@ -175,20 +178,10 @@ export default function AddPage() {
     }
 
     setSaving(true)
-    // 1) Create the course (store optional_groups for "best N of M" on Course page)
+    // Course (with optional_groups for "best N of M" on Course page) and its events in one transaction
     const color = `hsl(${Math.floor(Math.random()*360)},70%,60%)`
     const optionalGroupsJson = Object.fromEntries(groupMaxIncluded)
-    const { data: courseData, error: courseErr } = await supabase
-      .from('courses')
-      .insert([{ user_id: user.id, title, color, optional_groups: optionalGroupsJson }])
-      .select('id')
-    if (courseErr || !courseData?.length) {
-      toast.error('Failed to save course')
-      setSaving(false)
-      return
-    }
-    const course_id = courseData[0].id
-    // 2) Insert events for the course (allow null date for items without valid date)
+    // Allow null date for items without valid date
     const toInsert = parsedItems.map((item, idx) => {
       const dateStr = (item.date || '').trim()
       const hasValidDate = isValidDate(dateStr)
@@ -208,8 +201,6 @@ export default function AddPage() {
       const percentVal = (item.percent || '').toString().replace(/%/g, '').trim()
       const percentNum = percentVal === '' ? null : parseFloat(percentVal)
       return {
-        course_id,
-        user_id: user.id,
         name: item.name,
         date: dateVal,
         percent: isNaN(percentNum) ? null : percentNum,
@@ -218,15 +209,20 @@ export default function AddPage() {
         end_time: endTime
       }
     })
-    const { error: evErr } = await supabase
-      .from('events')
-      .insert(toInsert)
-    setSaving(false)
-    if (evErr) {
-      console.error('Events insert error:', evErr)
-      toast.error(`Failed to save events: ${evErr.message}`)
+    let course_id
+    try {
+      const result = await bulkWriteEvents({
+        course: { title, color, optional_groups: optionalGroupsJson, outline: parsedOutline },
+        insert: toInsert
+      })
+      course_id = result.course_id
+    } catch (err) {
+      console.error('Course save error:', err)
+      toast.error(`Failed to save course: ${err.message}`)
+      setSaving(false)
       return
     }
+    setSaving(false)
     toast.success('Course saved!')
     navigate(`/courses/${course_id}`)
   }
@@ -2,7 +2,7 @@
 import React, { useEffect, useState } from 'react'
 import { useAuth } from '../context/AuthContext.jsx'
 import { useNavigate } from 'react-router-dom'
-import { API_BASE_URL } from '../lib/apiConfig.js'
+import { API_BASE_URL, authHeaders } from '../lib/apiConfig.js'
 
 export default function AdminDashboard() {
   const { user } = useAuth()
@@ -31,7 +31,7 @@ export default function AdminDashboard() {
   useEffect(() => {
     if (!user) return;
     async function checkAdmin() {
-      const res = await fetch(`${API_BASE_URL}/api/profiles/${user.id}`)
+      const res = await fetch(`${API_BASE_URL}/api/profiles/${user.id}`, { headers: await authHeaders() })
       const profile = await res.json()
       setIsAdmin(profile.is_admin)
       setLoading(false)
@@ -45,9 +45,8 @@ export default function AdminDashboard() {
     if (!user || tab !== 'users' || !isAdmin) return
     setUsersLoading(true)
     setUsersError(null)
-    fetch(`${API_BASE_URL}/api/admin/users`, {
-      headers: { 'X-User-Id': user.id }
-    })
+    authHeaders()
+      .then(headers => fetch(`${API_BASE_URL}/api/admin/users`, { headers }))
       .then(res => res.json())
       .then(data => {
         setUsers(data)
@@ -64,9 +63,8 @@ export default function AdminDashboard() {
     if (!user || tab !== 'courses' || !isAdmin) return
     setCoursesLoading(true)
     setCoursesError(null)
-    fetch(`${API_BASE_URL}/api/admin/courses`, {
-      headers: { 'X-User-Id': user.id }
-    })
+    authHeaders()
+      .then(headers => fetch(`${API_BASE_URL}/api/admin/courses`, { headers }))
       .then(res => res.json())
       .then(data => {
         setCourses(data)
@@ -83,9 +81,8 @@ export default function AdminDashboard() {
     if (!user || tab !== 'analytics' || !isAdmin) return
     setAnalyticsLoading(true)
     setAnalyticsError(null)
-    fetch(`${API_BASE_URL}/api/admin/analytics`, {
-      headers: { 'X-User-Id': user.id }
-    })
+    authHeaders()
+      .then(headers => fetch(`${API_BASE_URL}/api/admin/analytics`, { headers }))
       .then(res => res.json())
       .then(data => {
         setAnalytics(data)
@@ -102,11 +99,11 @@ export default function AdminDashboard() {
     if (!user) return;
     await fetch(`${API_BASE_URL}/api/admin/users/${userId}`, {
       method: 'PATCH',
-      headers: { 'Content-Type': 'application/json', 'X-User-Id': user.id },
+      headers: await authHeaders({ 'Content-Type': 'application/json' }),
       body: JSON.stringify({ is_admin: !current })
     })
     setUsersLoading(true)
-    const res = await fetch(`${API_BASE_URL}/api/admin/users`, { headers: { 'X-User-Id': user.id } })
+    const res = await fetch(`${API_BASE_URL}/api/admin/users`, { headers: await authHeaders() })
     setUsers(await res.json())
     setUsersLoading(false)
   }
@@ -117,10 +114,10 @@ export default function AdminDashboard() {
     if (!window.confirm('Are you sure you want to delete this user?')) return
     await fetch(`${API_BASE_URL}/api/admin/users/${userId}`, {
       method: 'DELETE',
-      headers: { 'X-User-Id': user.id }
+      headers: await authHeaders()
     })
     setUsersLoading(true)
-    const res = await fetch(`${API_BASE_URL}/api/admin/users`, { headers: { 'X-User-Id': user.id } })
+    const res = await fetch(`${API_BASE_URL}/api/admin/users`, { headers: await authHeaders() })
     setUsers(await res.json())
     setUsersLoading(false)
   }
@@ -134,13 +131,13 @@ export default function AdminDashboard() {
     if (!user) return;
     await fetch(`${API_BASE_URL}/api/admin/courses/${courseId}`, {
       method: 'PATCH',
-      headers: { 'Content-Type': 'application/json', 'X-User-Id': user.id },
+      headers: await authHeaders({ 'Content-Type': 'application/json' }),
       body: JSON.stringify({ title: editingCourseTitle })
     })
     setEditingCourseId(null)
     setEditingCourseTitle('')
     setCoursesLoading(true)
-    const res = await fetch(`${API_BASE_URL}/api/admin/courses`, { headers: { 'X-User-Id': user.id } })
+    const res = await fetch(`${API_BASE_URL}/api/admin/courses`, { headers: await authHeaders() })
     setCourses(await res.json())
     setCoursesLoading(false)
   }
@@ -154,10 +151,10 @@ export default function AdminDashboard() {
     if (!window.confirm('Are you sure you want to delete this course?')) return
     await fetch(`${API_BASE_URL}/api/admin/courses/${courseId}`, {
       method: 'DELETE',
-      headers: { 'X-User-Id': user.id }
+      headers: await authHeaders()
     })
     setCoursesLoading(true)
-    const res = await fetch(`${API_BASE_URL}/api/admin/courses`, { headers: { 'X-User-Id': user.id } })
+    const res = await fetch(`${API_BASE_URL}/api/admin/courses`, { headers: await authHeaders() })
     setCourses(await res.json())
     setCoursesLoading(false)
   }
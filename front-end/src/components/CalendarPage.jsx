@@ -2,6 +2,7 @@
 import React, { useState, useEffect } from 'react'
 import { useAuth } from '../context/AuthContext.jsx'
 import { supabase } from '../lib/supabaseClient.js'
+import { fetchCalendarEvents, fetchCalendarFeedUrls } from '../services/eventApi.js'
 import toast from 'react-hot-toast'
 import {
   Calendar as BigCalendar,
@@ -15,6 +16,11 @@ import format from 'date-fns/format'
 import parse from 'date-fns/parse'
 import startOfWeek from 'date-fns/startOfWeek'
 import getDay from 'date-fns/getDay'
+import startOfMonth from 'date-fns/startOfMonth'
+import endOfMonth from 'date-fns/endOfMonth'
+import endOfWeek from 'date-fns/endOfWeek'
+import startOfDay from 'date-fns/startOfDay'
+import addDays from 'date-fns/addDays'
 import enUS from 'date-fns/locale/en-US'
 import EventForm from './EventForm.jsx'
 
@@ -28,6 +34,22 @@ const localizer = dateFnsLocalizer({
 })
 const DnDCalendar = withDragAndDrop(BigCalendar)
 
+// Date range visible for the current view (month grid includes the padding weeks)
+function visibleRange(date, view) {
+  const weekOpts = { weekStartsOn: 1 }
+  if (view === 'month') {
+    return [startOfWeek(startOfMonth(date), weekOpts), addDays(endOfWeek(endOfMonth(date), weekOpts), 1)]
+  }
+  if (view === 'week') {
+    return [startOfWeek(date, weekOpts), addDays(endOfWeek(date, weekOpts), 1)]
+  }
+  if (view === 'day') {
+    return [startOfDay(date), addDays(startOfDay(date), 1)]
+  }
+  // agenda shows 30 days from the current date
+  return [startOfDay(date), addDays(startOfDay(date), 30)]
+}
+
 export default function CalendarPage() {
   const { user } = useAuth()
   const [events, setEvents] = useState([])
@@ -39,30 +61,32 @@ export default function CalendarPage() {
   const [selectedEvent, setSelectedEvent] = useState(null)
   const [showEventModal, setShowEventModal] = useState(false)
 
-  // Fetch events and courses on mount/user change
+  const [rangeStart, rangeEnd] = visibleRange(date, view)
+
+  // Fetch courses on mount/user change
   useEffect(() => {
-    fetchEvents()
     fetchCourses()
   }, [user.id])
 
-  // Fetch all events for the user
+  // Fetch only the visible window whenever the user navigates or switches views
+  useEffect(() => {
+    fetchEvents()
+  }, [user.id, rangeStart.getTime(), rangeEnd.getTime()])
+
+  // Fetch events overlapping the visible range (server resolves titles/colors and sorts)
   async function fetchEvents() {
-    const { data, error } = await supabase
-      .from('events')
-      .select('id, name, start_time, end_time, color, course_id, courses ( title, color )')
-      .eq('user_id', user.id)
-    if (error) return toast.error('Failed to load events')
-    const mapped = data.map(e => ({
-      id: e.id,
-      title: e.courses ? `${e.courses.title}: ${e.name}` : e.name,
-      start: new Date(e.start_time),
-      end: new Date(e.end_time),
-      allDay: false,
-      color: e.courses?.color || e.color || '#6c757d',
-      course_id: e.course_id
-    }))
-    mapped.sort((a, b) => a.start - b.start)
-    setEvents(mapped)
+    let data
+    try {
+      data = await fetchCalendarEvents(rangeStart, rangeEnd)
+    } catch (err) {
+      return toast.error('Failed to load events')
+    }
+    setEvents(data.map(e => ({
+      ...e,
+      start: new Date(e.start),
+      end: new Date(e.end),
+      allDay: false
+    })))
   }
 
   // Fetch all courses for the user
@@ -117,54 +141,28 @@ export default function CalendarPage() {
     toast.success('Duration updated!')
   }
 
-  // Format date for ICS (UTC)
-  function toICSDate(d) {
-    const date = new Date(d)
-    const pad = n => String(n).padStart(2, '0')
-    const y = date.getUTCFullYear()
-    const m = pad(date.getUTCMonth() + 1)
-    const day = pad(date.getUTCDate())
-    const h = pad(date.getUTCHours())
-    const min = pad(date.getUTCMinutes())
-    const s = pad(date.getUTCSeconds())
-    return `${y}${m}${day}T${h}${min}${s}Z`
+  // Download calendar as .ics file (built and cached by the backend)
+  async function handleDownloadCalendar() {
+    try {
+      const { download_url } = await fetchCalendarFeedUrls()
+      const a = document.createElement('a')
+      a.href = download_url
+      a.click()
+      toast.success('Calendar downloaded! Import the .ics file into your calendar app.')
+    } catch (err) {
+      toast.error('Download failed')
+    }
   }
 
-  // Download calendar as .ics file (import into Google/Apple/Outlook)
-  function handleDownloadCalendar() {
-    if (events.length === 0) {
-      toast.error('No events to download')
-      return
+  // Copy the subscription link so calendar apps stay in sync automatically
+  async function handleCopySubscribeLink() {
+    try {
+      const { url } = await fetchCalendarFeedUrls()
+      await navigator.clipboard.writeText(url)
+      toast.success('Subscription link copied! Add it in your calendar app as "From URL".')
+    } catch (err) {
+      toast.error('Could not get subscription link')
     }
-    const lines = [
-      'BEGIN:VCALENDAR',
-      'VERSION:2.0',
-      'PRODID:-//Study Planner//EN',
-      'CALSCALE:GREGORIAN',
-    ]
-    events.forEach((evt, i) => {
-      const start = evt.start instanceof Date ? evt.start : new Date(evt.start)
-      const end = evt.end instanceof Date ? evt.end : new Date(evt.end)
-      const title = (evt.title || 'Event').replace(/\n/g, ' ').replace(/[,;\\]/g, ' ')
-      const uid = `studyplanner-${evt.id}-${i}@studyplanner`
-      lines.push('BEGIN:VEVENT')
-      lines.push(`UID:${uid}`)
-      lines.push(`DTSTAMP:${toICSDate(new Date())}`)
-      lines.push(`DTSTART:${toICSDate(start)}`)
-      lines.push(`DTEND:${toICSDate(end)}`)
-      lines.push(`SUMMARY:${title}`)
-      lines.push('END:VEVENT')
-    })
-    lines.push('END:VCALENDAR')
-    const ics = lines.join('\r\n')
-    const blob = new Blob([ics], { type: 'text/calendar;charset=utf-8' })
-    const url = URL.createObjectURL(blob)
-    const a = document.createElement('a')
-    a.href = url
-    a.download = `study-planner-calendar-${format(new Date(), 'yyyy-MM-dd')}.ics`
-    a.click()
-    URL.revokeObjectURL(url)
-    toast.success('Calendar downloaded! Import the .ics file into your calendar app.')
   }
 
   // Open event creation form for empty slot
@@ -235,14 +233,24 @@ export default function CalendarPage() {
       <div className="card" style={{ maxWidth: 900, margin: '0 auto' }}>
         <div style={{ display: 'flex', alignItems: 'center', justifyContent: 'space-between', flexWrap: 'wrap', gap: 12, marginBottom: 8 }}>
           <h1 className="playful-heading" style={{ margin: 0 }}>Calendar</h1>
-          <button
-            type="button"
-            onClick={handleDownloadCalendar}
-            className="btn-primary"
-            style={{ display: 'flex', alignItems: 'center', gap: 6 }}
-          >
-            <span aria-hidden>📥</span> Download calendar
-          </button>
+          <div style={{ display: 'flex', gap: 8, flexWrap: 'wrap' }}>
+            <button
+              type="button"
+              onClick={handleDownloadCalendar}
+              className="btn-primary"
+              style={{ display: 'flex', alignItems: 'center', gap: 6 }}
+            >
+              <span aria-hidden>📥</span> Download calendar
+            </button>
+            <button
+              type="button"
+              onClick={handleCopySubscribeLink}
+              className="btn-primary"
+              style={{ display: 'flex', alignItems: 'center', gap: 6 }}
+            >
+              <span aria-hidden>🔗</span> Subscribe
+            </button>
+          </div>
         </div>
         <DnDCalendar
           localizer={localizer}
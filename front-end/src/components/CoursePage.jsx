@@ -3,7 +3,11 @@ import { useParams, useNavigate } from 'react-router-dom'
 import { useState, useEffect, useMemo } from 'react'
 import { useAuth } from '../context/AuthContext.jsx'
 import { supabase } from '../lib/supabaseClient.js'
-import { getOptionalGroupToggleable, getComponentBase } from '../lib/gradeUtils.js'
+import { getOptionalGroupToggleable } from '../lib/gradeUtils.js'
+import { fetchCourseGrades, updateEventGrade } from '../services/gradeApi.js'
+import { bulkWriteEvents } from '../services/eventApi.js'
+import { fetchCourseOutline, reparseCourseOutline } from '../services/outlineApi.js'
+import { deleteCourse } from '../services/dashboardApi.js'
 import toast from 'react-hot-toast'
 import {
   Chart as ChartJS,
@@ -39,6 +43,11 @@ export default function CoursePage() {
   const [sortKey, setSortKey] = useState(null)
   const [sortAsc, setSortAsc] = useState(true)
   const [target, setTarget] = useState('')
+  const [grades, setGrades] = useState(null)
+  // Stored outline editor: null until opened; reparse holds the last { items, diff, mode } result
+  const [outline, setOutline] = useState(null)
+  const [reparse, setReparse] = useState(null)
+  const [reparsing, setReparsing] = useState(false)
 
   // Fetch course and events on mount/id change
   useEffect(() => {
@@ -51,7 +60,7 @@ export default function CoursePage() {
     fetchEvents()
   }, [id])
 
-  // Fetch all events for this course
+  // Fetch all events for this course (and the server-side grade summary)
   async function fetchEvents() {
     const { data } = await supabase
       .from('events')
@@ -59,49 +68,26 @@ export default function CoursePage() {
       .eq('course_id', id)
       .order('date', { ascending: true })
     setEvents(data || [])
+    fetchGrades()
   }
 
-  // Grade calculations (only for included items)
-  const totalEarned = useMemo(() => {
-    return events.reduce((sum, e) => {
-      if (e.included !== false && e.score_received != null && e.score_total > 0) {
-        const w = parseFloat(e.percent)
-        return sum + (e.score_received / e.score_total) * w
-      }
-      return sum
-    }, 0)
-  }, [events])
-  const totalWeight = useMemo(() => {
-    return events.reduce((sum, e) => {
-      return e.included !== false && e.score_received != null && e.score_total > 0
-        ? sum + parseFloat(e.percent)
-        : sum
-    }, 0)
-  }, [events])
-  const normalizedGrade = useMemo(() => {
-    return totalWeight > 0 ? (totalEarned / totalWeight) * 100 : 0
-  }, [totalEarned, totalWeight])
+  async function fetchGrades() {
+    try {
+      setGrades(await fetchCourseGrades(id))
+    } catch (err) {
+      toast.error('Failed to load grades')
+    }
+  }
 
-  // Target grade forecasting (only for included items)
-  const W_done = useMemo(
-    () => events.reduce((sum, e) => {
-      return e.included !== false && e.score_received != null && e.score_total > 0
-        ? sum + parseFloat(e.percent)
-        : sum
-    }, 0),
-    [events]
-  )
-  const achieved = useMemo(
-    () => events.reduce((sum, e) => {
-      if (e.included !== false && e.score_received != null && e.score_total > 0) {
-        const w = parseFloat(e.percent)
-        return sum + (e.score_received / e.score_total) * w
-      }
-      return sum
-    }, 0),
-    [events]
-  )
-  const W_rem = Math.max(0, 100 - W_done)
+  // Grade summary (only included items count), computed and stored by the backend
+  const totalEarned = grades?.earned ?? 0
+  const totalWeight = grades?.graded_weight ?? 0
+  const normalizedGrade = grades?.current_grade ?? 0
+
+  // Target grade forecasting
+  const W_done = totalWeight
+  const achieved = totalEarned
+  const W_rem = grades?.remaining_weight ?? 100
   const needed = useMemo(() => {
     if (!target || W_rem <= 0) return null
     return ((Number(target) - achieved) / W_rem) * 100
@@ -169,23 +155,26 @@ export default function CoursePage() {
       return
     }
     setSaving(true)
-    await supabase
-      .from('events')
-      .update({
+    try {
+      await updateEventGrade(eventId, {
         score_received: Number(received),
         score_total: Number(total)
       })
-      .eq('id', eventId)
+    } catch (err) {
+      setSaving(false)
+      return toast.error('Save failed')
+    }
     setSaving(false)
     cancelEdit()
     fetchEvents()
     toast.success('Score saved!')
   }
   async function clearScore(eventId) {
-    await supabase
-      .from('events')
-      .update({ score_received: null, score_total: null })
-      .eq('id', eventId)
+    try {
+      await updateEventGrade(eventId, { score_received: null, score_total: null })
+    } catch (err) {
+      return toast.error('Clear failed')
+    }
     cancelEdit()
     fetchEvents()
     toast.success('Score cleared')
@@ -227,53 +216,22 @@ export default function CoursePage() {
     toast.success('Date saved!')
   }
 
-  // Toggle included status (with "best X of Y" auto-uncheck when exceeding max)
+  // Toggle included status; the backend keeps "best X of Y" groups at X by unchecking
+  // an ungraded (or the lowest-scored) item in the same request
   async function toggleIncluded(eventId, currentStatus) {
-    const optionalGroups = course?.optional_groups || {}
-    const ev = events.find(e => e.id === eventId)
-    if (!ev) return
-
-    const base = getComponentBase(ev.name)
-    const maxAllowed = optionalGroups[base]
-
-    if (currentStatus) {
-      // Unchecking: always allow
-      await supabase.from('events').update({ included: false }).eq('id', eventId)
-      fetchEvents()
-      toast.success('Item excluded from calculations')
-      return
-    }
-
-    // Checking: may need to auto-uncheck another if we'd exceed max
-    if (maxAllowed != null) {
-      const groupEvents = events.filter(e => getComponentBase(e.name) === base)
-      const includedEvents = groupEvents.filter(e => e.included !== false)
-      if (includedEvents.length >= maxAllowed) {
-        // Pick one to uncheck: no score -> random, all have score -> lowest
-        const withScores = includedEvents.filter(e => e.score_received != null && e.score_total > 0)
-        const withoutScores = includedEvents.filter(e => !(e.score_received != null && e.score_total > 0))
-        let toUncheck
-        if (withoutScores.length > 0) {
-          toUncheck = withoutScores[Math.floor(Math.random() * withoutScores.length)]
-        } else {
-          const byPct = [...withScores].sort((a, b) => {
-            const pctA = (a.score_received / a.score_total) * 100
-            const pctB = (b.score_received / b.score_total) * 100
-            return pctA - pctB
-          })
-          const lowest = byPct[0]
-          const sameLowest = withScores.filter(
-            e => Math.abs((e.score_received / e.score_total) * 100 - (lowest.score_received / lowest.score_total) * 100) < 0.01
-          )
-          toUncheck = sameLowest[Math.floor(Math.random() * sameLowest.length)]
-        }
-        await supabase.from('events').update({ included: false }).eq('id', toUncheck.id)
-      }
+    try {
+      const { excluded } = await bulkWriteEvents({
+        update: [{ id: eventId, included: !currentStatus }],
+        rebalance: true
+      })
+      const swapped = excluded.length
+        ? ` (${events.filter(e => excluded.includes(e.id)).map(e => e.name).join(', ')} unchecked)`
+        : ''
+      toast.success(currentStatus ? 'Item excluded from calculations' : `Item included in calculations${swapped}`)
+    } catch (err) {
+      toast.error(err.message || 'Update failed')
     }
-
-    await supabase.from('events').update({ included: true }).eq('id', eventId)
     fetchEvents()
-    toast.success('Item included in calculations')
   }
 
   // Only items in optional groups (e.g. "best N of M") can have checkbox toggled
@@ -283,18 +241,7 @@ export default function CoursePage() {
   )
 
   // Groups with fewer than X included (for warning banner)
-  const underMinGroups = useMemo(() => {
-    const optionalGroups = course?.optional_groups || {}
-    const list = []
-    for (const [base, maxAllowed] of Object.entries(optionalGroups)) {
-      const groupEvents = events.filter(e => getComponentBase(e.name) === base)
-      const includedCount = groupEvents.filter(e => e.included !== false).length
-      if (includedCount < maxAllowed) {
-        list.push({ base, current: includedCount, required: maxAllowed })
-      }
-    }
-    return list
-  }, [events, course?.optional_groups])
+  const underMinGroups = grades?.under_min_groups ?? []
 
   // Sorting helpers
   const sortedEvents = useMemo(() => {
@@ -313,6 +260,30 @@ export default function CoursePage() {
       return 0
     })
   }, [events, sortKey, sortAsc])
+  // Open the outline editor with the text the course was created from (empty if none was stored)
+  async function openOutline() {
+    try {
+      const stored = await fetchCourseOutline(id)
+      setOutline({ text: stored?.outline_text || '', answers: stored?.answers || [] })
+    } catch (err) {
+      toast.error(`Failed to load outline: ${err.message}`)
+    }
+  }
+
+  // Re-parse the edited outline; the backend only re-processes sections that changed
+  async function handleReparse() {
+    if (!outline.text.trim()) return
+    setReparsing(true)
+    try {
+      const result = await reparseCourseOutline(id, outline.text, outline.answers)
+      setReparse(result)
+    } catch (err) {
+      toast.error(`Failed to re-parse outline: ${err.message}`)
+    } finally {
+      setReparsing(false)
+    }
+  }
+
   function handleSort(key) {
     if (sortKey === key) {
       setSortAsc(!sortAsc)
@@ -331,7 +302,7 @@ export default function CoursePage() {
           {course.title}{' '}
           <button
             onClick={async () => {
-              await supabase.from('courses').delete().eq('id', id)
+              await deleteCourse(id)
               navigate('/')
             }}
             className="btn-fun"
@@ -350,7 +321,7 @@ export default function CoursePage() {
         </h3>
         {Object.keys(course?.optional_groups || {}).length > 0 && (
           <p style={{ fontSize: '0.9rem', fontStyle: 'italic', marginTop: '0.5rem', color: 'var(--text-muted)' }}>
-            💡 <strong>Optional groups:</strong> To switch which items are included, uncheck first, then check the other. Otherwise one will be randomly unchecked.
+            💡 <strong>Optional groups:</strong> To switch which items are included, uncheck first, then check the other. Otherwise an ungraded (or your lowest-scored) item will be unchecked.
           </p>
         )}
         {underMinGroups.length > 0 && (
@@ -563,6 +534,51 @@ export default function CoursePage() {
           on the remaining <strong>{W_rem.toFixed(1)}%</strong> of work.
         </p>
       )}
+      {/* Outline: edit and re-parse, showing what changed against the last parse */}
+      <div className="form-group">
+        {outline === null ? (
+          <button onClick={openOutline} className="btn-fun">
+            Edit outline
+          </button>
+        ) : (
+          <>
+            <textarea
+              value={outline.text}
+              onChange={e => setOutline(o => ({ ...o, text: e.target.value }))}
+              className="input-field"
+              rows={10}
+              placeholder="Paste the updated course outline"
+              disabled={reparsing}
+            />
+            <button onClick={handleReparse} className="btn-fun" disabled={reparsing || !outline.text.trim()}>
+              {reparsing ? 'Re-parsing…' : 'Re-parse outline'}
+            </button>
+          </>
+        )}
+        {reparse && (
+          <div style={{ marginTop: '1rem' }}>
+            <p>
+              {reparse.mode === 'unchanged' || reparse.mode === 'reused'
+                ? 'No graded items affected by this edit.'
+                : `Re-parsed ${reparse.sections.reparsed} of ${reparse.sections.total} sections.`}{' '}
+              {reparse.diff.unchanged} unchanged, {reparse.diff.changed.length} changed,{' '}
+              {reparse.diff.added.length} added, {reparse.diff.removed.length} removed.
+            </p>
+            {reparse.diff.changed.map((c, i) => (
+              <div key={`c${i}`}>
+                • <strong>{c.name}</strong>:{' '}
+                {c.fields.map(f => `${f} ${c.before[f] ?? '—'} → ${c.after[f] ?? '—'}`).join(', ')}
+              </div>
+            ))}
+            {reparse.diff.added.map((it, i) => (
+              <div key={`a${i}`}>+ <strong>{it.name}</strong> {it.date || ''} {it.percent || ''}</div>
+            ))}
+            {reparse.diff.removed.map((it, i) => (
+              <div key={`r${i}`}>− <strong>{it.name}</strong> {it.date || ''} {it.percent || ''}</div>
+            ))}
+          </div>
+        )}
+      </div>
     </div>
   )
 }
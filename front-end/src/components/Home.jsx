@@ -2,31 +2,10 @@
 import React, { useState } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { useAuth } from '../context/AuthContext.jsx'
-import { supabase } from '../lib/supabaseClient.js'
 import toast from 'react-hot-toast'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
-import { fetchTodos, toggleTodo } from '../services/todoApi.js'
-import { fetchUpcomingEvents } from '../services/eventApi.js'
-
-// Fetch all courses for the user
-async function fetchCourses(userId) {
-  const { data, error } = await supabase
-    .from('courses')
-    .select('id, title, color, inserted_at')
-    .eq('user_id', userId)
-    .order('inserted_at', { ascending: false })
-  if (error) throw error
-  return data
-}
-// Delete a course by ID
-async function deleteCourse(courseId) {
-  const { error } = await supabase
-    .from('courses')
-    .delete()
-    .eq('id', courseId)
-  if (error) throw error
-  return courseId
-}
+import { toggleTodo } from '../services/todoApi.js'
+import { fetchDashboard, deleteCourse } from '../services/dashboardApi.js'
 
 export default function Home() {
   const { user } = useAuth()
@@ -35,53 +14,47 @@ export default function Home() {
   const [hoverCourse, setHoverCourse] = useState(null)
   const [hoverDelete, setHoverDelete] = useState(null)
 
-  // To-Dos for the user
-  const { data: todos = [] } = useQuery({
-    queryKey: ['todos', user.id],
-    queryFn: () => fetchTodos(user.id),
-    enabled: !!user.id
-  })
-  const toggleMutation = useMutation({
-    mutationFn: ({ id, completed }) => toggleTodo(id, completed),
-    onSuccess: () => qc.invalidateQueries(['todos', user.id])
-  })
-
-  // Upcoming deadlines (events) for the user
-  const {
-    data: upcoming = [],
-    isFetching: loadingUpcoming
-  } = useQuery({
-    queryKey: ['upcoming', user.id],
-    queryFn: () => fetchUpcomingEvents(user.id, 7),
-    enabled: !!user.id
-  })
-
-  // Courses for the user
+  // Courses (with grade summaries), next open to-dos and the coming week's deadlines in one request
   const {
-    data: courses = [],
+    data: dashboard,
     isLoading: loadingC,
     isError: errorC
   } = useQuery({
-    queryKey: ['courses', user.id],
-    queryFn: () => fetchCourses(user.id),
+    queryKey: ['dashboard', user.id],
+    queryFn: () => fetchDashboard(),
     enabled: !!user.id
   })
+  const todos = dashboard?.todos ?? []
+  const upcoming = dashboard?.upcoming ?? []
+  const courses = dashboard?.courses ?? []
+
+  // To-do toggles go through the backend, which clears the cached dashboard
+  const toggleMutation = useMutation({
+    mutationFn: ({ id, completed }) => toggleTodo(id, completed),
+    onSuccess: () => {
+      qc.invalidateQueries({ queryKey: ['dashboard', user.id] })
+      qc.invalidateQueries({ queryKey: ['todos', user.id] })
+    }
+  })
+
   const deleteMutation = useMutation({
     mutationFn: deleteCourse,
     onMutate: async courseId => {
-      await qc.cancelQueries(['courses', user.id])
-      const prev = qc.getQueryData(['courses', user.id])
-      qc.setQueryData(['courses', user.id], old =>
-        old.filter(c => c.id !== courseId)
-      )
+      await qc.cancelQueries(['dashboard', user.id])
+      const prev = qc.getQueryData(['dashboard', user.id])
+      qc.setQueryData(['dashboard', user.id], old => ({
+        ...old,
+        courses: old.courses.filter(c => c.id !== courseId),
+        upcoming: old.upcoming.filter(ev => ev.course_id !== courseId)
+      }))
       return { prev }
     },
     onError: (_err, _vars, ctx) => {
-      qc.setQueryData(['courses', user.id], ctx.prev)
+      qc.setQueryData(['dashboard', user.id], ctx.prev)
       toast.error('Failed to delete course')
     },
     onSuccess: () => toast.success('Course deleted'),
-    onSettled: () => qc.invalidateQueries(['courses', user.id])
+    onSettled: () => qc.invalidateQueries(['dashboard', user.id])
   })
 
   if (loadingC) return <p>Loading courses…</p>
@@ -139,24 +112,22 @@ export default function Home() {
       {/* Upcoming Deadlines */}
       <div className="card" style={{ textAlign: 'left' }}>
         <h2 className="playful-heading">Upcoming Deadlines</h2>
-        {loadingUpcoming ? (
-          <p>Loading deadlines…</p>
-        ) : upcoming.length > 0 ? (
+        {upcoming.length > 0 ? (
           upcoming.map(ev => {
             const dt = new Date(ev.start_time)
             const label = isNaN(dt)
               ? 'Unknown date'
               : dt.toLocaleDateString()
             
-            // Use event's own color if not linked to course, otherwise use course color
-            const eventColor = ev.course_id ? ev.courses?.color : ev.color
-            const eventTitle = ev.course_id ? ev.courses?.title : null
+            // Course color (or the event's own color) is resolved by the backend
+            const eventColor = ev.color
+            const eventTitle = ev.course_id ? ev.course_title : null
             
             return (
               <div
                 key={ev.id}
                 className="todo-card"
-                style={{ borderLeft: `4px solid ${eventColor || '#6c757d'}` }}
+                style={{ borderLeft: `4px solid ${eventColor}` }}
               >
                 <div>
                   {eventTitle ? (
@@ -220,6 +191,11 @@ export default function Home() {
                   <span style={{ color: hoverCourse === c.id ? c.color : undefined }}>
                   {c.title}
                   </span>
+                  {c.grade.graded_weight > 0 && (
+                    <small style={{ display: 'block', fontSize: '0.85rem', fontWeight: 400, color: 'var(--text-muted)' }}>
+                      {c.grade.current_grade.toFixed(1)}% on {c.grade.graded_weight.toFixed(0)}% graded
+                    </small>
+                  )}
                 </button>
                 {/* Delete button (right) */}
                 <button
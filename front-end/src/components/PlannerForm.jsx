@@ -1,6 +1,6 @@
 // PlannerForm.jsx - Handles outline text input and file upload for course parsing
 import { useState } from 'react'
-import { parseOutline, analyzeOutline, parseOutlineWithAnswers } from '../services/outlineApi.js'
+import { analyzeAndParseOutline, parseOutlineWithAnswers } from '../services/outlineApi.js'
 import toast from 'react-hot-toast'
 import axios from 'axios'
 import { API_BASE_URL } from '../lib/apiConfig.js'
@@ -35,7 +35,8 @@ export default function PlannerForm({
       toast.success('Outline extracted from file!')
     } catch (err) {
       console.error(err)
-      toast.error('Failed to extract from file.')
+      // 413/415/422 carry a readable reason (too large, not really a PDF/DOCX, legacy .doc, scanned PDF)
+      toast.error(err.response?.data?.error || 'Failed to extract from file.')
     } finally {
       setLoading(false)
     }
@@ -49,8 +50,8 @@ export default function PlannerForm({
     
     try {
       console.log('Analyzing outline:', outlineText)
-      // First, analyze the outline for questions
-      const analysis = await analyzeOutline(outlineText)
+      // Analyze and parse in one call: returns questions, or the items when none are needed
+      const analysis = await analyzeAndParseOutline(outlineText)
       console.log('Analysis result:', analysis)
       
       if (analysis.status === 'questions') {
@@ -61,11 +62,9 @@ export default function PlannerForm({
         toast.success('Please answer the clarifying questions below')
         if (onQuestions) onQuestions(analysis.questions)
       } else {
-        // Ready to parse directly
-        console.log('No questions needed, parsing directly')
-        const { data } = await parseOutline(outlineText)
+        // No questions needed: items came back with the analysis
         toast.success('Outline parsed!')
-        onParsed(data)
+        onParsed(analysis.items || [], [])
       }
     } catch (err) {
       console.error('Error in handleSubmit:', err)
@@ -86,7 +85,7 @@ export default function PlannerForm({
     try {
       const { data } = await parseOutlineWithAnswers(outlineText, answers)
       toast.success('Outline parsed with your answers!')
-      onParsed(data)
+      onParsed(data, answers)
       setShowQuestions(false)
     } catch (err) {
       console.error(err)
@@ -112,7 +111,7 @@ export default function PlannerForm({
             Upload syllabus (PDF or Word):
             <input
               type="file"
-              accept=".pdf,.doc,.docx"
+              accept=".pdf,.docx"
               onChange={handleFileUpload}
               disabled={loading || disabled}
               className="input-field"
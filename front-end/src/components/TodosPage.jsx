@@ -1,30 +1,54 @@
 // TodosPage.jsx - Full to-do list management for the user
 import React, { useState } from 'react'
 import { useAuth } from '../context/AuthContext.jsx'
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
+import { useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import toast from 'react-hot-toast'
 import {
   fetchTodos,
   addTodo,
   toggleTodo,
-  deleteTodo
+  deleteTodo,
+  bulkUpdateTodos
 } from '../services/todoApi.js'
 
+// Filters offered above the list; completed items older than a month move to "Archived"
+const STATUS_OPTIONS = [
+  { value: 'open', label: 'Open' },
+  { value: 'completed', label: 'Completed' },
+  { value: 'all', label: 'All' },
+  { value: 'archived', label: 'Archived' }
+]
+
 export default function TodosPage() {
   const { user } = useAuth()
   const qc = useQueryClient()
-  // Load all to-dos for the user
-  const { data: todos = [], isLoading } = useQuery({
-    queryKey: ['todos', user.id],
-    queryFn: () => fetchTodos(user.id),
+  const [status, setStatus] = useState('open')
+  // Load to-dos one page at a time (open ones by default)
+  const {
+    data,
+    isLoading,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage
+  } = useInfiniteQuery({
+    queryKey: ['todos', user.id, status],
+    queryFn: ({ pageParam }) => fetchTodos({ status, cursor: pageParam }),
+    initialPageParam: null,
+    getNextPageParam: lastPage => lastPage.next_cursor,
     enabled: !!user.id
   })
+  const todos = data?.pages.flatMap(page => page.items) ?? []
+  const readOnly = status === 'archived'
+  function invalidateTodos() {
+    qc.invalidateQueries({ queryKey: ['todos', user.id] })
+    qc.invalidateQueries({ queryKey: ['dashboard', user.id] })
+  }
   // Add a new to-do
   const addMutation = useMutation({
-    mutationFn: obj => addTodo(user.id, obj),
+    mutationFn: obj => addTodo(obj),
     onSuccess: () => {
       toast.success('To-do added!')
-      qc.invalidateQueries({ queryKey: ['todos', user.id] })
+      invalidateTodos()
       setTitle('')
       setDueDate('')
     },
@@ -35,16 +59,26 @@ export default function TodosPage() {
   // Toggle a to-do's completion
   const toggleMutation = useMutation({
     mutationFn: ({ id, completed }) => toggleTodo(id, completed),
-    onSuccess: () => qc.invalidateQueries({ queryKey: ['todos', user.id] })
+    onSuccess: invalidateTodos
   })
   // Delete a to-do
   const deleteMutation = useMutation({
     mutationFn: id => deleteTodo(id),
     onSuccess: () => {
       toast.success('To-do deleted')
-      qc.invalidateQueries({ queryKey: ['todos', user.id] })
+      invalidateTodos()
     }
   })
+  // Complete or delete everything currently shown in one request
+  const bulkMutation = useMutation({
+    mutationFn: ops => bulkUpdateTodos(ops),
+    onSuccess: (counts) => {
+      const n = counts.complete + counts.delete
+      toast.success(`${n} to-do${n === 1 ? '' : 's'} updated`)
+      invalidateTodos()
+    },
+    onError: (err) => toast.error(err?.message || 'Bulk update failed')
+  })
   const [title, setTitle] = useState('')
   const [dueDate, setDueDate] = useState('')
   // Handle add form submit
@@ -60,7 +94,7 @@ export default function TodosPage() {
   return (
     <div className="container">
       <div className="card" style={{ maxWidth: 600, margin: '0 auto' }}>
-        <h1 className="playful-heading">All To-Dos</h1>
+        <h1 className="playful-heading">To-Dos</h1>
         <form onSubmit={handleAdd} style={{ display: 'flex', gap: '1rem', marginBottom: '1.5rem', flexWrap: 'wrap' }}>
           <input
             type="text"
@@ -81,6 +115,36 @@ export default function TodosPage() {
             Add
           </button>
         </form>
+        <div style={{ display: 'flex', gap: '0.5rem', alignItems: 'center', marginBottom: '1rem', flexWrap: 'wrap' }}>
+          <select
+            value={status}
+            onChange={e => setStatus(e.target.value)}
+            className="input-field"
+            style={{ width: 'auto' }}
+          >
+            {STATUS_OPTIONS.map(o => (
+              <option key={o.value} value={o.value}>{o.label}</option>
+            ))}
+          </select>
+          {status === 'open' && todos.length > 0 && (
+            <button
+              onClick={() => bulkMutation.mutate({ complete: todos.map(t => t.id) })}
+              className="btn-fun"
+              disabled={bulkMutation.isPending}
+            >
+              Complete all shown
+            </button>
+          )}
+          {status === 'completed' && todos.length > 0 && (
+            <button
+              onClick={() => bulkMutation.mutate({ delete: todos.map(t => t.id) })}
+              className="btn-fun"
+              disabled={bulkMutation.isPending}
+            >
+              Delete all shown
+            </button>
+          )}
+        </div>
         <div className="card-list">
           {todos.length > 0 ? (
             todos.map(t => (
@@ -90,25 +154,38 @@ export default function TodosPage() {
                   checked={t.completed}
                   onChange={() => toggleMutation.mutate({ id: t.id, completed: !t.completed })}
                   className="fun-checkbox"
+                  disabled={readOnly}
                 />
                 <div className="todo-card-body" style={{ flex: 1 }}>
                   <span className={t.completed ? 'completed' : ''}>{t.title}</span>
                   <small>{new Date(t.due_date).toLocaleDateString()}</small>
                 </div>
-                <button
-                  onClick={() => deleteMutation.mutate(t.id)}
-                  className="btn-fun"
-                  style={{ padding: '0.4em 1em', fontSize: '1.1em', marginLeft: '0.5em' }}
-                  title="Delete"
-                >
-                  🗑
-                </button>
+                {!readOnly && (
+                  <button
+                    onClick={() => deleteMutation.mutate(t.id)}
+                    className="btn-fun"
+                    style={{ padding: '0.4em 1em', fontSize: '1.1em', marginLeft: '0.5em' }}
+                    title="Delete"
+                  >
+                    🗑
+                  </button>
+                )}
               </div>
             ))
           ) : (
-            <p>No to-dos yet!</p>
+            <p>{status === 'open' ? 'Nothing open — nice work!' : 'No to-dos here yet!'}</p>
           )}
         </div>
+        {hasNextPage && (
+          <button
+            onClick={() => fetchNextPage()}
+            className="btn-fun"
+            style={{ marginTop: '1rem' }}
+            disabled={isFetchingNextPage}
+          >
+            {isFetchingNextPage ? 'Loading…' : 'Load more'}
+          </button>
+        )}
       </div>
     </div>
   )
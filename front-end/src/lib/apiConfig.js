@@ -1,2 +1,11 @@
-// apiConfig.js - Shared API base URL for backend calls
+// apiConfig.js - Shared API base URL and auth headers for backend calls
+import { supabase } from './supabaseClient.js'
+
 export const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:5001'
+
+// The backend verifies the Supabase access token and takes the user id from it
+export async function authHeaders(headers = {}) {
+  const { data: { session } } = await supabase.auth.getSession()
+  if (!session) return headers
+  return { ...headers, Authorization: `Bearer ${session.access_token}` }
+}
@@ -0,0 +1,30 @@
+// dashboardApi.js - Home page data (courses, next to-dos, upcoming deadlines) in one backend call
+import { API_BASE_URL, authHeaders } from '../lib/apiConfig.js'
+
+/**
+ * Fetch the dashboard aggregate for a user.
+ * @param {{ fresh?: boolean }} options  fresh skips the server cache (after a write made outside the backend)
+ * @returns {Promise<{ courses: Array<{ id: number, title: string, color: string, grade: { current_grade: number, graded_weight: number } }>,
+ *   todos: Array<{ id: number, title: string, due_date: string, completed: boolean }>,
+ *   upcoming: Array<{ id: number, name: string, description: string|null, start_time: string, course_id: number|null, course_title: string|null, color: string }> }>}
+ */
+export async function fetchDashboard({ fresh = false } = {}) {
+  // "Upcoming" days start at the user's local midnight, not the server's
+  const params = new URLSearchParams({ tz: Intl.DateTimeFormat().resolvedOptions().timeZone })
+  if (fresh) params.set('fresh', '1')
+  const res = await fetch(`${API_BASE_URL}/api/dashboard?${params}`, {
+    headers: await authHeaders()
+  })
+  if (!res.ok) throw new Error(`HTTP ${res.status}`)
+  return res.json()
+}
+
+// Delete a course by ID (events cascade); also clears the cached dashboard
+export async function deleteCourse(courseId) {
+  const res = await fetch(`${API_BASE_URL}/api/courses/${courseId}`, {
+    method: 'DELETE',
+    headers: await authHeaders()
+  })
+  if (!res.ok) throw new Error(`HTTP ${res.status}`)
+  return courseId
+}
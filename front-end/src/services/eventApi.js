@@ -1,34 +1,50 @@
-// eventApi.js - Event-related API calls for Supabase
-import { supabase } from '../lib/supabaseClient.js'
+// eventApi.js - Event-related API calls (calendar feed, bulk writes) via the backend
+import { API_BASE_URL, authHeaders } from '../lib/apiConfig.js'
 
 /**
- * Fetch events for the given user that are due between today and `daysOut` days from now,
- * including the course’s title & color for styling reminders & calendar entries.
- * @param {string} userId   Supabase auth user ID
- * @param {number} daysOut  Number of days ahead to include (defaults to 7)
- * @returns {Promise<Array<{ id: string, name: string, start_time: string, end_time: string, courses: { title: string, color: string } }>>}
+ * Fetch the events overlapping [start, end) from the backend calendar feed, with the
+ * display title ("COURSE: name") and color already resolved. The response carries an
+ * ETag, so the browser revalidates an unchanged window with a 304 instead of a full reload.
+ * @param {Date} start     Window start (inclusive)
+ * @param {Date} end       Window end (exclusive)
+ * @returns {Promise<Array<{ id: number, title: string, start: string, end: string, color: string, course_id: number|null }>>}
  */
-export async function fetchUpcomingEvents(userId, daysOut = 7) {
-  const today = new Date().toISOString().slice(0, 10)
-  const cutoff = new Date(Date.now() + daysOut * 24 * 60 * 60_000)
-    .toISOString()
-    .slice(0, 10)
-  const { data, error } = await supabase
-    .from('events')
-          .select(`
-        id,
-        name,
-        start_time,
-        end_time,
-        color,
-        course_id,
-        included,
-        courses ( title, color )
-      `)
-    .eq('user_id', userId)
-    .gte('start_time', today)
-    .lte('start_time', cutoff)
-    .order('start_time', { ascending: true })
-  if (error) throw error
-  return data
+export async function fetchCalendarEvents(start, end) {
+  const params = new URLSearchParams({ start: start.toISOString(), end: end.toISOString() })
+  const res = await fetch(`${API_BASE_URL}/api/calendar?${params}`, {
+    headers: await authHeaders()
+  })
+  if (!res.ok) throw new Error(`HTTP ${res.status}`)
+  const json = await res.json()
+  return json.events
+}
+
+/**
+ * Get the signed .ics feed links for the signed-in user (subscribe in Google/Apple/Outlook, or download once).
+ * @returns {Promise<{ url: string, webcal_url: string, download_url: string }>}
+ */
+export async function fetchCalendarFeedUrls() {
+  const res = await fetch(`${API_BASE_URL}/api/calendar/feed-url`, {
+    headers: await authHeaders()
+  })
+  if (!res.ok) throw new Error(`HTTP ${res.status}`)
+  return res.json()
+}
+
+/**
+ * Apply event inserts/updates in one backend transaction (optionally creating the course first).
+ * With `rebalance`, best-N groups that end up over their limit drop an ungraded or lowest-scored item.
+ * @param {{ course?: { title: string, color?: string, optional_groups?: object }, insert?: Array<object>,
+ *   update?: Array<{ id: number }>, rebalance?: boolean }} payload
+ * @returns {Promise<{ course_id: number|null, inserted: number[], updated: number[], excluded: number[] }>}
+ */
+export async function bulkWriteEvents(payload) {
+  const res = await fetch(`${API_BASE_URL}/api/events/bulk`, {
+    method: 'POST',
+    headers: await authHeaders({ 'Content-Type': 'application/json' }),
+    body: JSON.stringify(payload)
+  })
+  const json = await res.json().catch(() => ({}))
+  if (!res.ok) throw new Error(json.error || `HTTP ${res.status}`)
+  return json
 }
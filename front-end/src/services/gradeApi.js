@@ -0,0 +1,35 @@
+// gradeApi.js - Course grade summaries and score updates via the backend grade engine
+import { API_BASE_URL, authHeaders } from '../lib/apiConfig.js'
+
+function jsonHeaders() {
+  return authHeaders({ 'Content-Type': 'application/json' })
+}
+
+/**
+ * Fetch the stored grade summary for a course.
+ * @returns {Promise<{ earned: number, graded_weight: number, remaining_weight: number, current_grade: number,
+ *   projected_grade: number|null, forecasts: Array<{ target: number, required_average: number|null }>,
+ *   under_min_groups: Array<{ base: string, current: number, required: number }> }>}
+ */
+export async function fetchCourseGrades(courseId) {
+  const res = await fetch(`${API_BASE_URL}/api/courses/${courseId}/grades`, {
+    headers: await jsonHeaders()
+  })
+  if (!res.ok) throw new Error(`HTTP ${res.status}`)
+  return res.json()
+}
+
+/**
+ * Update one event's score and/or included flag; the backend adjusts the course totals incrementally.
+ * @param {{ score_received?: number|null, score_total?: number|null, included?: boolean }} fields
+ * @returns {Promise<{ event: object, grades: object }>}
+ */
+export async function updateEventGrade(eventId, fields) {
+  const res = await fetch(`${API_BASE_URL}/api/events/${eventId}/grade`, {
+    method: 'PATCH',
+    headers: await jsonHeaders(),
+    body: JSON.stringify(fields)
+  })
+  if (!res.ok) throw new Error(`HTTP ${res.status}`)
+  return res.json()
+}
@@ -1,10 +1,15 @@
 // outlineApi.js - API call to parse course outline text using backend
-import { API_BASE_URL } from '../lib/apiConfig.js'
+import { API_BASE_URL, authHeaders } from '../lib/apiConfig.js'
 
-export function parseOutline(outlineText) {
+// The access token lets the backend account GPT token usage per user
+function jsonHeaders() {
+  return authHeaders({ 'Content-Type': 'application/json' })
+}
+
+export async function parseOutline(outlineText) {
   return fetch(`${API_BASE_URL}/api/parse-outline`, {
     method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
+    headers: await jsonHeaders(),
     body: JSON.stringify({ outlineText })
   })
     .then(res => {
@@ -14,10 +19,23 @@ export function parseOutline(outlineText) {
     .then(json => ({ data: json }))
 }
 
-export function analyzeOutline(outlineText) {
+// Single round trip: { status: 'questions', questions } or { status: 'ready', items }
+export async function analyzeAndParseOutline(outlineText) {
+  return fetch(`${API_BASE_URL}/api/analyze-and-parse`, {
+    method: 'POST',
+    headers: await jsonHeaders(),
+    body: JSON.stringify({ outlineText })
+  })
+    .then(res => {
+      if (!res.ok) throw new Error(`HTTP ${res.status}`)
+      return res.json()
+    })
+}
+
+export async function analyzeOutline(outlineText) {
   return fetch(`${API_BASE_URL}/api/analyze-outline`, {
     method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
+    headers: await jsonHeaders(),
     body: JSON.stringify({ outlineText })
   })
     .then(res => {
@@ -26,10 +44,10 @@ export function analyzeOutline(outlineText) {
     })
 }
 
-export function parseOutlineWithAnswers(outlineText, answers) {
+export async function parseOutlineWithAnswers(outlineText, answers) {
   return fetch(`${API_BASE_URL}/api/parse-outline-with-answers`, {
     method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
+    headers: await jsonHeaders(),
     body: JSON.stringify({ outlineText, answers })
   })
     .then(res => {
@@ -38,3 +56,27 @@ export function parseOutlineWithAnswers(outlineText, answers) {
     })
     .then(json => ({ data: json }))
 }
+
+// Stored outline for a course: { outline_text, answers, items, updated_at } (404 if none was saved)
+export async function fetchCourseOutline(courseId) {
+  const res = await fetch(`${API_BASE_URL}/api/courses/${courseId}/outline`, {
+    headers: await jsonHeaders()
+  })
+  if (res.status === 404) return null
+  if (!res.ok) throw new Error(`HTTP ${res.status}`)
+  return res.json()
+}
+
+// Re-parse an edited outline; only changed sections go back to GPT.
+// Returns { items, diff: { added, removed, changed, unchanged }, mode, sections, timings }
+export async function reparseCourseOutline(courseId, outlineText, answers = [], full = false) {
+  return fetch(`${API_BASE_URL}/api/courses/${courseId}/outline/reparse`, {
+    method: 'POST',
+    headers: await jsonHeaders(),
+    body: JSON.stringify({ outlineText, answers, full })
+  })
+    .then(res => {
+      if (!res.ok) throw new Error(`HTTP ${res.status}`)
+      return res.json()
+    })
+}
@@ -1,41 +1,46 @@
-// todoApi.js - To-do related API calls for Supabase
-import { supabase } from '../lib/supabaseClient.js'
+// todoApi.js - To-do related API calls via the backend todos service
+import { API_BASE_URL, authHeaders } from '../lib/apiConfig.js'
 
-// Fetch all to-dos for a user
-export async function fetchTodos(userId) {
-  const { data, error } = await supabase
-    .from('todos')
-    .select('id, title, due_date, completed')
-    .eq('user_id', userId)
-    .order('due_date', { ascending: true })
-  if (error) throw error
-  return data
+async function request(path, options = {}) {
+  const res = await fetch(`${API_BASE_URL}${path}`, {
+    ...options,
+    headers: await authHeaders({ 'Content-Type': 'application/json' })
+  })
+  const json = await res.json().catch(() => ({}))
+  if (!res.ok) throw new Error(json.error || `HTTP ${res.status}`)
+  return json
+}
+
+/**
+ * Fetch one page of to-dos ordered by due date.
+ * @param {{ status?: 'open'|'completed'|'all'|'archived', cursor?: string|null, limit?: number }} options
+ * @returns {Promise<{ items: Array<{ id: number, title: string, due_date: string, completed: boolean }>, next_cursor: string|null }>}
+ */
+export function fetchTodos({ status = 'open', cursor = null, limit = 50 } = {}) {
+  const params = new URLSearchParams({ status, limit: String(limit) })
+  if (cursor) params.set('cursor', cursor)
+  return request(`/api/todos?${params}`)
 }
 // Add a new to-do
-export async function addTodo(userId, { title, due_date }) {
-  const { data, error } = await supabase
-    .from('todos')
-    .insert([{ user_id: userId, title, due_date }])
-    .single()
-  if (error) throw error
-  return data
+export function addTodo({ title, due_date }) {
+  return request('/api/todos', {
+    method: 'POST',
+    body: JSON.stringify({ title, due_date })
+  })
+}
+// Complete, reopen and/or delete many to-dos in one request: { complete: [ids], reopen: [ids], delete: [ids] }
+export function bulkUpdateTodos(ops) {
+  return request('/api/todos/bulk', {
+    method: 'POST',
+    body: JSON.stringify(ops)
+  })
 }
 // Toggle a to-do's completion
-export async function toggleTodo(id, completed) {
-  const { data, error } = await supabase
-    .from('todos')
-    .update({ completed })
-    .eq('id', id)
-    .single()
-  if (error) throw error
-  return data
+export function toggleTodo(id, completed) {
+  return bulkUpdateTodos(completed ? { complete: [id] } : { reopen: [id] })
 }
 // Delete a to-do
 export async function deleteTodo(id) {
-  const { error } = await supabase
-    .from('todos')
-    .delete()
-    .eq('id', id)
-  if (error) throw error
+  await bulkUpdateTodos({ delete: [id] })
   return id
 }